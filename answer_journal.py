@@ -0,0 +1,144 @@
+import os
+import re
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+SESSION_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+_DISCARD = object()
+
+
+class AnswerJournal:
+    """Append-only per-session journals, group-committed to disk by a background writer
+
+    append() only enqueues, so it costs microseconds on the UI thread; the writer
+    drains everything queued so far and fsyncs each touched file once per batch.
+    """
+
+    def __init__(self, directory, max_batch=512):
+        self.directory = directory
+        self.max_batch = max_batch
+        self.last_error = None
+        os.makedirs(directory, exist_ok=True)
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="answer-journal-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.flush)
+
+    def _path(self, session_id):
+        if not SESSION_ID_PATTERN.match(session_id):
+            raise ValueError(f"Invalid session id: {session_id!r}")
+        return os.path.join(self.directory, f"{session_id}.jsonl")
+
+    def append(self, session_id, entry_type, **fields):
+        """Queue a journal entry for a session"""
+        fields['type'] = entry_type
+        fields['t'] = time.time()
+        self._queue.put((session_id, fields))
+
+    def discard(self, session_id):
+        """Queue removal of a session's journal once everything before it is written"""
+        self._queue.put((session_id, _DISCARD))
+
+    def flush(self):
+        """Block until every queued entry is on disk"""
+        self._queue.join()
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._commit(batch)
+            except Exception as e:
+                self.last_error = e
+                logger.exception("Failed to write %d journal entries", len(batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _commit(self, batch):
+        """Write a batch, grouping lines per session so each file is fsynced once"""
+        lines = {}
+        for session_id, entry in batch:
+            if entry is _DISCARD:
+                self._write_lines(session_id, lines.pop(session_id, []))
+                try:
+                    os.remove(self._path(session_id))
+                except FileNotFoundError:
+                    pass
+                continue
+            lines.setdefault(session_id, []).append(json.dumps(entry))
+        for session_id, session_lines in lines.items():
+            self._write_lines(session_id, session_lines)
+
+    def _write_lines(self, session_id, session_lines):
+        if not session_lines:
+            return
+        with open(self._path(session_id), 'a') as f:
+            f.write('\n'.join(session_lines) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def expire(self, cutoff):
+        """Delete journals last written before cutoff (epoch seconds); returns how many"""
+        expired = 0
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            return 0
+        for entry in entries:
+            if not (entry.name.endswith('.jsonl') and SESSION_ID_PATTERN.match(entry.name[:-len('.jsonl')])):
+                continue
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    expired += 1
+            except FileNotFoundError:
+                pass
+        return expired
+
+    def exists(self, session_id):
+        """Whether a journal exists for a session"""
+        try:
+            return os.path.exists(self._path(session_id))
+        except ValueError:
+            return False
+
+    def read(self, session_id):
+        """Return every entry journaled for a session, oldest first"""
+        self.flush()
+        entries = []
+        try:
+            with open(self._path(session_id), 'r') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        # A torn final line from a crash mid-write
+                        break
+        except (OSError, ValueError):
+            pass
+        return entries
+
+
+_default_journal = None
+_default_journal_lock = threading.Lock()
+
+def get_answer_journal():
+    """Return the process-wide answer journal configured from the environment"""
+    global _default_journal
+    with _default_journal_lock:
+        if _default_journal is None:
+            _default_journal = AnswerJournal(os.getenv("JOURNAL_DIR", "journals"))
+        return _default_journal
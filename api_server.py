@@ -0,0 +1,365 @@
+"""Headless JSON API for the screening flow.
+
+Serves the same conversation engine, prompts and validators as the Streamlit app
+from a small asyncio HTTP/1.1 server, so other frontends and chat integrations
+can run many interviews per process:
+
+    POST   /sessions              start a session; returns its id and the greeting
+    GET    /sessions/{id}         the current prompt or question
+    POST   /sessions/{id}/input   {"input": "..."}; returns the bot's replies
+    DELETE /sessions/{id}         end the session
+    GET    /metrics               Prometheus metrics
+
+Every step is checkpointed to the session backend, so with the (default) sqlite backend
+any API process (or the Streamlit app, via ?sid=) can continue a session. Steps
+run on the event loop unless they may wait on question generation; those, and
+every read or commit of the session backend, run in worker threads so one slow
+fsync never stalls the other connections.
+
+    python api_server.py --port 8080
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+import environment  # noqa: F401  (loads .env before the modules below read their settings)
+from candidate_store import get_candidate_store
+from engine import ChatMessage, ConversationEngine, Session, candidate_record, get_prompt, message_dict, question_message
+from grading import get_answer_grader
+from llm_client import warm_up
+from metrics import API_REQUEST_SECONDS, registry, start_metrics_exporter
+from session_backend import checkpoint_session, get_session_backend, load_session
+from session_registry import SessionRegistry
+
+logger = logging.getLogger(__name__)
+
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("API_PORT", "8080"))
+
+# Largest request head or body accepted
+API_MAX_BODY_BYTES = int(os.getenv("API_MAX_BODY_BYTES", "65536"))
+
+# Idle keep-alive connections are closed after this long
+API_KEEPALIVE_SECONDS = float(os.getenv("API_KEEPALIVE_SECONDS", "75"))
+
+# Threads for steps waiting on question generation (they only block on a condition)
+API_WAIT_THREADS = int(os.getenv("API_WAIT_THREADS", "256"))
+
+# Messages kept in memory per session; older ones are read back from the session backend
+CHAT_MEMORY_WINDOW = int(os.getenv("CHAT_MEMORY_WINDOW", "50"))
+
+REASONS = {
+    200: 'OK', 201: 'Created', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    409: 'Conflict', 413: 'Payload Too Large', 431: 'Request Header Fields Too Large',
+    500: 'Internal Server Error', 501: 'Not Implemented',
+}
+
+
+class ApiError(Exception):
+    """An error reported to the client with an HTTP status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ScreeningService:
+    """Screening sessions driven through the API, shared by every connection"""
+
+    def __init__(self, engine=None, backend=None):
+        self.engine = engine or ConversationEngine()
+        self.backend = backend or get_session_backend()
+        self.sessions = SessionRegistry(on_evict=self._checkpoint, on_expire=self.backend.expire)
+        self._locks = weakref.WeakValueDictionary()
+        self._loop = None
+
+    def _lock(self, session_id):
+        """Per-session lock, so one session's inputs are applied in order"""
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = self._locks[session_id] = asyncio.Lock()
+        return lock
+
+    def _checkpoint(self, session):
+        if not session.record_saved and not session.evicted and session.has_bot_message:
+            checkpoint_session(session, self.backend)
+
+    async def _checkpoint_locked(self, session):
+        async with self._lock(session.session_id):
+            await asyncio.to_thread(self._checkpoint, session)
+
+    def _track(self, session, stream):
+        """Checkpoint the full question list once generation finishes"""
+        loop = self._loop or asyncio.get_running_loop()
+        self._loop = loop
+        stream.add_done_callback(lambda s: asyncio.run_coroutine_threadsafe(self._checkpoint_locked(session), loop))
+
+    async def _session(self, session_id):
+        """Return the live session for an id, resuming it from its checkpoint if needed"""
+        session = self.sessions.get(session_id)
+        if session is None or not session.touch():
+            session = await asyncio.to_thread(load_session, session_id, CHAT_MEMORY_WINDOW, self.backend)
+            if session is None:
+                raise ApiError(404, "Unknown session")
+            stream = session.question_stream
+            if stream and not stream.done:
+                self._track(session, stream)
+            self.sessions.add(session)
+        return session
+
+    def _add_message(self, session, role, message):
+        session.history.append(ChatMessage(role, message, int(time.time())))
+        if role == 'bot':
+            session.has_bot_message = True
+
+    def _trim(self, session):
+        """Drop checkpointed messages beyond the window from memory"""
+        excess = min(len(session.history) - CHAT_MEMORY_WINDOW, session.checkpointed - session.history_offset)
+        if excess > 0:
+            del session.history[:excess]
+            session.history_offset += excess
+
+    def _save(self, session):
+        """Queue the finished interview for the candidate store and drop its checkpoint once it is committed"""
+        paged_out = [ChatMessage(*m) for m in self.backend.messages(session.session_id)[:session.history_offset]]
+        history = [message_dict(m) for m in paged_out + session.history]
+        saved = get_candidate_store().save(candidate_record(session, history), session.session_id)
+        session_id = session.session_id
+
+        def on_saved(f):
+            if f.exception() is None:
+                self.backend.delete(session_id)
+
+        saved.add_done_callback(on_saved)
+        session.record_saved = True
+
+    def view(self, session, messages=None, **extra):
+        """The client's view of a session: its state, the current prompt or question, and progress"""
+        question = session.current_question if session.state == 'GENERATE_QUESTIONS' else None
+        if question:
+            prompt = question_message(session)
+        elif session.state == 'GENERATE_QUESTIONS':
+            prompt = "Preparing your questions..."
+        else:
+            prompt = get_prompt(session.state)
+        body = {
+            'session_id': session.session_id,
+            'state': session.state,
+            'ended': session.ended,
+            'prompt': prompt,
+            'question': {
+                'number': session.current_question_num + 1,
+                'total': session.total_questions(),
+                'technology': question['technology'],
+                'question': question['question'],
+            } if question else None,
+            'answered': len(session.user_answers),
+        }
+        if messages is not None:
+            body['messages'] = messages
+        body.update(extra)
+        return body
+
+    async def start(self):
+        """Start a session and greet the candidate"""
+        session = Session()
+        greeting = get_prompt(session.state)
+        self._add_message(session, 'bot', greeting)
+        async with self._lock(session.session_id):
+            self.sessions.add(session)
+            await asyncio.to_thread(self._checkpoint, session)
+            return self.view(session, [greeting])
+
+    async def get(self, session_id):
+        async with self._lock(session_id):
+            return self.view(await self._session(session_id))
+
+    async def submit(self, session_id, user_input):
+        """Apply one candidate input and return the bot's replies"""
+        async with self._lock(session_id):
+            session = await self._session(session_id)
+            if session.ended:
+                raise ApiError(409, "The session has ended")
+            self._add_message(session, 'user', user_input)
+            had_stream = session.question_stream
+
+            may_wait = session.state == 'COLLECT_TECH_STACK' or (had_stream is not None and not had_stream.done)
+            if may_wait:
+                result = await asyncio.to_thread(self.engine.step, session, user_input)
+            else:
+                result = self.engine.step(session, user_input)
+
+            if session.question_stream is not had_stream:
+                self._track(session, session.question_stream)
+            if result.answer:
+                get_answer_grader().submit(session.session_id, len(session.user_answers) - 1, result.answer)
+            for message in result.messages:
+                self._add_message(session, 'bot', message)
+            if result.completed:
+                await asyncio.to_thread(self._save, session)
+            elif session.ended:
+                # The candidate left; there is nothing to resume
+                self.sessions.discard(session_id)
+                await asyncio.to_thread(self.backend.delete, session_id)
+            else:
+                await asyncio.to_thread(self._checkpoint, session)
+                self._trim(session)
+            return self.view(session, result.messages, completed=result.completed,
+                             error=str(result.error) if result.error else None)
+
+    async def end(self, session_id):
+        """End a session at the candidate's request and forget it"""
+        async with self._lock(session_id):
+            session = await self._session(session_id)
+            messages = []
+            if not session.ended:
+                messages = self.engine.step(session, 'exit').messages
+            self.sessions.discard(session_id)
+            await asyncio.to_thread(self.backend.delete, session_id)
+            return self.view(session, messages)
+
+
+def _json_body(body):
+    if not body:
+        return {}
+    try:
+        data = json.loads(body)
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        raise ApiError(400, "Request body must be JSON")
+    if not isinstance(data, dict):
+        raise ApiError(400, "Request body must be a JSON object")
+    return data
+
+async def route(service, method, target, body):
+    """Dispatch one request; returns (status, route name, payload)"""
+    parts = target.split('?', 1)[0].strip('/').split('/')
+
+    if parts == ['sessions']:
+        if method != 'POST':
+            raise ApiError(405, "Use POST to start a session")
+        return 201, 'start', await service.start()
+
+    if len(parts) == 2 and parts[0] == 'sessions':
+        if method == 'GET':
+            return 200, 'get', await service.get(parts[1])
+        if method == 'DELETE':
+            return 200, 'end', await service.end(parts[1])
+        raise ApiError(405, "Use GET or DELETE on a session")
+
+    if len(parts) == 3 and parts[0] == 'sessions' and parts[2] == 'input':
+        if method != 'POST':
+            raise ApiError(405, "Use POST to submit input")
+        user_input = _json_body(body).get('input')
+        if not isinstance(user_input, str) or not user_input.strip():
+            raise ApiError(400, "'input' must be a non-empty string")
+        return 200, 'input', await service.submit(parts[1], user_input)
+
+    if parts == ['metrics'] and method == 'GET':
+        return 200, 'metrics', registry.render()
+
+    raise ApiError(404, "Not found")
+
+
+def _response(status, payload, keep_alive):
+    if isinstance(payload, str):
+        body, content_type = payload.encode('utf-8'), 'text/plain; version=0.0.4; charset=utf-8'
+    else:
+        body, content_type = json.dumps(payload, ensure_ascii=False).encode('utf-8'), 'application/json; charset=utf-8'
+    head = (
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode('latin-1') + body
+
+async def handle_connection(service, reader, writer):
+    """Serve requests on one keep-alive connection until the client closes it"""
+    try:
+        while True:
+            try:
+                head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), API_KEEPALIVE_SECONDS)
+            except asyncio.LimitOverrunError:
+                writer.write(_response(431, {'error': "Request head too large"}, False))
+                break
+            except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                break
+
+            request_line, *header_lines = head.decode('latin-1').rstrip('\r\n').split('\r\n')
+            headers = {}
+            for line in header_lines:
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+            try:
+                method, target, version = request_line.split(' ')
+                length = int(headers.get('content-length') or 0)
+                if length < 0:
+                    raise ValueError(length)
+            except ValueError:
+                writer.write(_response(400, {'error': "Malformed request"}, False))
+                break
+            if 'transfer-encoding' in headers:
+                writer.write(_response(501, {'error': "Chunked request bodies are not supported"}, False))
+                break
+            if length > API_MAX_BODY_BYTES:
+                writer.write(_response(413, {'error': "Request body too large"}, False))
+                break
+            body = await reader.readexactly(length) if length else b''
+            keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+
+            started = time.perf_counter()
+            name = 'unknown'
+            try:
+                status, name, payload = await route(service, method, target, body)
+            except ApiError as e:
+                status, payload = e.status, {'error': str(e)}
+            except Exception:
+                logger.exception("Failed to handle %s %s", method, target)
+                status, payload = 500, {'error': "Internal server error"}
+            API_REQUEST_SECONDS.observe(time.perf_counter() - started, route=name, status=status)
+
+            writer.write(_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host=API_HOST, port=API_PORT, service=None):
+    """Run the API server until cancelled"""
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(API_WAIT_THREADS, thread_name_prefix="api-step"))
+    service = service or ScreeningService()
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_connection(service, reader, writer), host, port, limit=API_MAX_BODY_BYTES
+    )
+    logger.info("TalentScout API listening on http://%s:%d", host, port)
+    async with server:
+        await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the TalentScout screening flow as a JSON API")
+    parser.add_argument('--host', default=API_HOST, help="interface to bind")
+    parser.add_argument('--port', type=int, default=API_PORT, help="port to listen on")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    start_metrics_exporter()
+    warm_up()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,25 @@
 import streamlit as st
 import os
-import re
-import json
-import random
-from datetime import datetime
-from dotenv import load_dotenv
-from openai import OpenAI
-
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+import sys
+import time
+import uuid
+import math
+import textwrap
+import concurrent.futures
+from contextlib import nullcontext
+from functools import lru_cache
+
+import environment  # noqa: F401  (loads .env before the modules below read their settings)
+from answer_journal import get_answer_journal
+from candidate_store import get_candidate_store
+from engine import STATES, ChatMessage, ConversationEngine, Session, candidate_record, get_prompt, message_dict
+from grading import get_answer_grader
+from llm_client import warm_up
+from llm_scheduler import INTERACTIVE, get_scheduler
+from metrics import RENDER_SECONDS, SAVE_SECONDS, profiled, start_metrics_exporter
+from question_generator import QuestionStream, start_question_generation
+from session_backend import checkpoint_session, get_session_backend, load_session
+from session_registry import SessionRegistry
 
 st.set_page_config(
     page_title="TalentScout - Hiring Assistant",
@@ -17,444 +28,291 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.5rem;
-        font-weight: bold;
-        color: #1f77b4;
-        text-align: center;
-        margin-bottom: 0.5rem;
-    }
-    .sub-header {
-        font-size: 1.1rem;
-        color: #333333;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .chat-message {
-        padding: 1rem;
-        border-radius: 0.5rem;
-        margin-bottom: 0.5rem;
-        color: #000000;
-    }
-    .user-message {
-        background-color: #e3f2fd;
-        border-left: 4px solid #2196f3;
-        color: #000000;
-    }
-    .bot-message {
-        background-color: #f5f5f5;
-        border-left: 4px solid #4caf50;
-        color: #000000;
-    }
-    .info-box {
-        background-color: #fff3e0;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        border-left: 4px solid #ff9800;
-        margin-bottom: 1rem;
-        color: #000000;
-    }
-    .success-box {
-        background-color: #e8f5e9;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        border-left: 4px solid #4caf50;
-        margin-bottom: 1rem;
-        color: #000000;
-    }
-    .success-box h3 {
-        color: #2e7d32;
-    }
-    .stTextInput > div > div > input {
-        font-size: 16px;
-        color: #000000;
-        background-color: #ffffff;
-        border: 1px solid #cccccc;
-    }
-    .option-button {
-        font-size: 1.1rem;
-        font-weight: bold;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-def init_session_state():
-    if 'conversation_state' not in st.session_state:
-        st.session_state.conversation_state = 'GREETING'
-    if 'candidate_info' not in st.session_state:
-        st.session_state.candidate_info = {
-            'full_name': '',
-            'email': '',
-            'phone': '',
-            'years_experience': '',
-            'desired_position': '',
-            'current_location': '',
-            'tech_stack': []
-        }
-    if 'conversation_history' not in st.session_state:
-        st.session_state.conversation_history = []
-    if 'generated_questions' not in st.session_state:
-        st.session_state.generated_questions = {}
-    if 'current_questions_index' not in st.session_state:
-        st.session_state.current_questions_index = 0
-    if 'tech_stack_list' not in st.session_state:
-        st.session_state.tech_stack_list = []
-    if 'conversation_ended' not in st.session_state:
-        st.session_state.conversation_ended = False
-    if 'current_question' not in st.session_state:
-        st.session_state.current_question = None
-    if 'questions_queue' not in st.session_state:
-        st.session_state.questions_queue = []
-    if 'current_question_num' not in st.session_state:
-        st.session_state.current_question_num = 0
-    if 'user_answers' not in st.session_state:
-        st.session_state.user_answers = []
-
-EXIT_KEYWORDS = ['exit', 'quit', 'bye', 'goodbye', 'stop', 'end']
-
-EMAIL_REGEX = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-
-PHONE_REGEX = r'^[\d\s\-\+\(\)]+$'
-
-def check_exit_keywords(user_input):
-    """Check if user wants to exit"""
-    return user_input.lower().strip() in EXIT_KEYWORDS
-
-def validate_email(email):
-    """Validate email format"""
-    return re.match(EMAIL_REGEX, email) is not None
-
-def validate_phone(phone):
-    """Validate phone number"""
-    return re.match(PHONE_REGEX, phone) is not None and len(re.sub(r'\D', '', phone)) >= 10
+@st.cache_resource(show_spinner=False)
+def page_style():
+    """static/style.css as a compact <style> block, read once per process"""
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'style.css'), encoding='utf-8') as f:
+        return f"<style>{' '.join(f.read().split())}</style>"
 
-def add_to_history(role, message):
-    """Add message to conversation history"""
-    st.session_state.conversation_history.append({
-        'role': role,
-        'message': message,
-        'timestamp': datetime.now().strftime("%H:%M:%S")
-    })
+# Every rerun must re-emit the style (elements a run doesn't draw are cleared), but only the cached string
+st.markdown(page_style(), unsafe_allow_html=True)
 
-def display_chat_history():
-    """Display conversation history"""
-    for msg in st.session_state.conversation_history:
-        if msg['role'] == 'user':
-            st.markdown(f"""
-            <div class="chat-message user-message">
-                <strong>👤 You:</strong> {msg['message']}
-            </div>
-            """, unsafe_allow_html=True)
+def init_session_state():
+    if 'session_id' not in st.session_state:
+        # Reconnects carry the session id in the URL so the session can be resumed, on any replica
+        session_id = st.query_params.get('sid', '')
+        if not (get_session_backend().exists(session_id) or get_answer_journal().exists(session_id)):
+            session_id = uuid.uuid4().hex
+            st.query_params['sid'] = session_id
+        st.session_state.session_id = session_id
+    if 'earlier_pages' not in st.session_state:
+        st.session_state.earlier_pages = 0
+    
+    session = st.session_state.get('session')
+    if session is None or not session.touch():
+        # New tab, or the session went idle and was flushed to storage
+        session = resume_session(st.session_state.session_id)
+        st.session_state.session = session
+        get_sessions().add(session)
+
+def resume_session(session_id):
+    """Load a session from its last checkpoint, falling back to replaying its journal"""
+    session = load_session(session_id, CHAT_MEMORY_WINDOW)
+    if session is None:
+        session = Session(session_id)
+        if get_answer_journal().exists(session_id):
+            restore_from_journal(session)
+        return session
+    
+    stream = session.question_stream
+    if stream and not stream.done:
+        track_question_stream(session, stream)
+        stream.wait_for(session.current_question_num + 1)
+    return session
+
+@st.cache_resource
+def get_engine():
+    """The conversation engine, shared by every session in the process"""
+    return ConversationEngine()
+
+@st.cache_resource(show_spinner=False)
+def warm_up_llm_client():
+    """Start loading the OpenAI SDK and client once per process, after the first page has been drawn"""
+    warm_up()
+
+@st.cache_resource
+def get_sessions():
+    """Live sessions in this process; idle ones are flushed to storage and released"""
+    return SessionRegistry(on_evict=flush_session, on_expire=expire_sessions)
+
+def restore_from_journal(session):
+    """Rebuild a session's progress from its journal after a reconnect, restart or eviction"""
+    snapshot = None
+    questions = None
+    for entry in get_answer_journal().read(session.session_id):
+        if entry['type'] == 'message':
+            session.history.append(ChatMessage(entry['role'], entry['message'], entry['timestamp']))
+            if entry['role'] == 'bot':
+                session.has_bot_message = True
+        elif entry['type'] == 'answer':
+            session.user_answers.append(entry['answer'])
+        elif entry['type'] == 'questions':
+            questions = entry['questions']
+        elif entry['type'] == 'state':
+            snapshot = entry
+    
+    if not snapshot:
+        trim_history(session)
+        return
+    session.state = sys.intern(snapshot['conversation_state'])
+    session.candidate_info = snapshot['candidate_info']
+    session.candidate_info['tech_stack'] = [sys.intern(tech) for tech in session.candidate_info['tech_stack']]
+    session.ended = snapshot['conversation_ended']
+    
+    if session.state == 'GENERATE_QUESTIONS':
+        info = session.candidate_info
+        if questions:
+            stream = QuestionStream.completed(questions)
         else:
-            st.markdown(f"""
-            <div class="chat-message bot-message">
-                <strong>🤖 TalentScout:</strong> {msg['message']}
-            </div>
-            """, unsafe_allow_html=True)
+            stream = start_question_generation(info['tech_stack'], info.get('years_experience', ''),
+                                               email=info.get('email') or None)
+            track_question_stream(session, stream)
+        session.question_stream = stream
+        session.current_question_num = len(session.user_answers)
+        stream.wait_for(session.current_question_num + 1)
+    
+    # Seed the session backend with the whole transcript before trimming to the window
+    checkpoint_session(session)
+    trim_history(session)
 
-def generate_ai_questions(tech_stack):
-    """Generate technical questions using OpenAI API based on the candidate's tech stack"""
-    try:
-        tech_list = ', '.join(tech_stack) if tech_stack else "software development"
-        
-        # Generate 3 questions per technology
-        num_questions = len(tech_stack) * 3 if tech_stack else 3
-        
-        prompt = f"""Generate {num_questions} technical interview questions for a candidate with the following tech stack: {tech_list}.
-
-For each question, provide:
-1. A challenging, real-world scenario-based question related to the tech stack
-2. Which technology this question is for
-
-Make the questions progressively more difficult and cover different aspects like:
-- Architecture and design patterns
-- Performance optimization
-- Security best practices
-- Debugging and troubleshooting
-- Advanced concepts and edge cases
-
-Return the output as a JSON array with this exact format:
-[
-  {{
-    "question": "Your question here",
-    "technology": "technology name"
-  }},
-  ...
-]
-
-Generate now:"""
-
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are an expert technical interviewer. Generate complex, real-world scenario-based technical questions with proper JSON format."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=2000
-        )
-        
-        content = response.choices[0].message.content
-        
-        # Try to parse the JSON response
-        try:
-            import re
-            json_match = re.search(r'\[.*\]', content, re.DOTALL)
-            if json_match:
-                questions = json.loads(json_match.group())
-                return questions
-            else:
-                return get_fixed_questions(tech_stack)
-        except json.JSONDecodeError:
-            return get_fixed_questions(tech_stack)
-            
-    except Exception as e:
-        st.error(f"Failed to generate AI questions: {str(e)}")
-        return get_fixed_questions(tech_stack)
-
-
-def get_fixed_questions(tech_stack):
-    """Get fixed questions - fallback"""
-    questions = []
-    for tech in tech_stack:
-        questions.append({
-            'question': f'What is the primary purpose of {tech} in software development?',
-            'technology': tech
-        })
-        questions.append({
-            'question': f'What are the best practices when working with {tech}?',
-            'technology': tech
-        })
-        questions.append({
-            'question': f'How does {tech} handle security concerns?',
-            'technology': tech
-        })
-    return questions
+def track_question_stream(session, stream):
+    """Journal and checkpoint the full question list once generation finishes"""
+    journal = get_answer_journal()
+    
+    def on_done(s):
+        journal.append(session.session_id, 'questions', questions=list(s.questions))
+        checkpoint_session(session)
+    
+    stream.add_done_callback(on_done)
 
+def journal_state(session):
+    """Journal the current position in the conversation"""
+    if session.record_saved or session.ended or session.evicted:
+        return
+    get_answer_journal().append(
+        session.session_id, 'state',
+        conversation_state=session.state,
+        candidate_info=session.candidate_info,
+        conversation_ended=session.ended
+    )
+
+def flush_session(session):
+    """Checkpoint an idle session before it is released from memory"""
+    if session.record_saved or session.evicted or not session.has_bot_message:
+        return
+    journal_state(session)
+    checkpoint_session(session)
+    get_answer_journal().flush()
 
-def get_current_prompt():
-    """Get the appropriate prompt based on current conversation state"""
-    state = st.session_state.conversation_state
-    
-    prompts = {
-        'GREETING': """👋 Welcome to **TalentScout** - Your AI Hiring Assistant!
+def expire_sessions(cutoff):
+    """Delete the checkpoints and journals of sessions untouched since cutoff"""
+    return get_session_backend().expire(cutoff) + get_answer_journal().expire(cutoff)
 
-I'm here to help you through the initial screening process for technical positions. 
+def discard_session(session):
+    """Delete what storage holds for a session the candidate left"""
+    get_answer_journal().discard(session.session_id)
+    get_session_backend().delete(session.session_id)
 
-**What I'll do:**
-- Collect your basic information
-- Ask about your technical skills
-- Ask technical questions on all your tech stack
+# Messages kept in memory per session; older ones are paged back from the journal on demand
+CHAT_MEMORY_WINDOW = int(os.getenv("CHAT_MEMORY_WINDOW", "50"))
 
-**To exit anytime, type:** exit, quit, or bye
+CHAT_PAGE_SIZE = 20
 
-Let's get started! 
+# How long the end of an interview waits for the record's commit before reporting it as still saving
+SAVE_CONFIRM_SECONDS = float(os.getenv("SAVE_CONFIRM_SECONDS", "2"))
 
-**Please enter your Full Name:**""",
-        
-        'COLLECT_NAME': "Please enter your **Full Name**:",
-        
-        'COLLECT_EMAIL': "Please enter your **Email Address**:",
-        
-        'COLLECT_PHONE': "Please enter your **Phone Number** (with country code if applicable):",
-        
-        'COLLECT_EXPERIENCE': "How many **Years of Experience** do you have in the tech industry?",
-        
-        'COLLECT_POSITION': "What is your **Desired Position** or job title you're applying for?",
-        
-        'COLLECT_LOCATION': "What is your **Current Location** (City, Country)?",
-        
-        'COLLECT_TECH_STACK': """Please enter your **Tech Stack** (comma-separated list of technologies).
+# Per-session profiling is only offered when the deployment opts in
+PROFILING_AVAILABLE = os.getenv("ENABLE_PROFILING", "0") == "1"
 
-**Examples:**
-- Python, Django, PostgreSQL, Docker
-- React, Node.js, MongoDB, AWS
-- Java, Spring Boot, MySQL, Kubernetes
+def add_to_history(role, message):
+    """Add message to conversation history"""
+    session = st.session_state.session
+    entry = ChatMessage(role, message, int(time.time()))
+    session.history.append(entry)
+    if role == 'bot':
+        session.has_bot_message = True
+    get_answer_journal().append(session.session_id, 'message', **entry._asdict())
+    trim_history(session)
+
+def trim_history(session):
+    """Drop the oldest in-memory messages beyond the window; they remain in the journal"""
+    excess = len(session.history) - CHAT_MEMORY_WINDOW
+    if excess > 0:
+        del session.history[:excess]
+        session.history_offset += excess
+
+def paged_out_history(session):
+    """Messages that were dropped from memory, read back from the session backend or the journal"""
+    if session.history_offset == 0:
+        return []
+    messages = get_session_backend().messages(session.session_id)[:session.history_offset]
+    if len(messages) == session.history_offset:
+        return [ChatMessage(*m) for m in messages]
+    messages = [
+        ChatMessage(e['role'], e['message'], e['timestamp'])
+        for e in get_answer_journal().read(session.session_id) if e['type'] == 'message'
+    ]
+    return messages[:session.history_offset]
+
+def full_conversation_history(session):
+    """The complete conversation in the stored record format, including messages paged out of memory"""
+    return [message_dict(m) for m in paged_out_history(session) + session.history]
+
+@lru_cache(maxsize=2048)
+def render_message(role, message):
+    """Render one chat message to HTML (cached, so each message is only formatted once)"""
+    if role == 'user':
+        return textwrap.dedent(f"""
+            <div class="chat-message user-message">
+                <strong>👤 You:</strong> {message}
+            </div>
+            """)
+    return textwrap.dedent(f"""
+            <div class="chat-message bot-message">
+                <strong>🤖 TalentScout:</strong> {message}
+            </div>
+            """)
 
-**Your Tech Stack:**""",
-        
-        'GENERATE_QUESTIONS': "Here are your technical questions...",
-        
-        'END': "Thank you for your time! Our recruitment team will review your profile and contact you shortly."
-    }
+def display_chat_history():
+    """Display conversation history as a single markdown element"""
+    with RENDER_SECONDS.time():
+        _display_chat_history()
+
+def _display_chat_history():
+    session = st.session_state.session
+    offset = session.history_offset
+    if offset:
+        # Older turns are only read back from the journal when asked for
+        shown = min(offset, st.session_state.earlier_pages * CHAT_PAGE_SIZE)
+        if shown < offset and st.button(f"⬆️ Show earlier messages ({offset - shown} more)"):
+            st.session_state.earlier_pages += 1
+            shown = min(offset, shown + CHAT_PAGE_SIZE)
+        if shown:
+            earlier = paged_out_history(session)[-shown:]
+            st.markdown('\n'.join(render_message(m.role, m.message) for m in earlier), unsafe_allow_html=True)
     
-    return prompts.get(state, "How can I help you today?")
+    if session.history:
+        st.markdown('\n'.join(render_message(m.role, m.message) for m in session.history), unsafe_allow_html=True)
+
+def get_current_prompt():
+    """Get the appropriate prompt based on current conversation state"""
+    return get_prompt(st.session_state.session.state)
+
+def generation_wait_message():
+    """Spinner text for a step that may wait on question generation, with the current OpenAI queue"""
+    scheduler = get_scheduler()
+    depth = scheduler.queue_depth()
+    if not depth:
+        return "Preparing your questions..."
+    wait = math.ceil(scheduler.estimated_wait(INTERACTIVE))
+    return f"Preparing your questions... {depth} request(s) ahead of you, about {wait}s"
 
 def process_user_input(user_input):
-    """Process user input based on current conversation state"""
-    user_input = user_input.strip()
-    
+    """Process user input by running one step of the conversation engine"""
+    session = st.session_state.session
+    had_stream = session.question_stream
     
-    if check_exit_keywords(user_input):
-        st.session_state.conversation_state = 'END'
-        name = st.session_state.candidate_info.get('full_name', 'there')
-        farewell = f"Thank you for your time, {name}. Our recruitment team will contact you shortly if needed. Goodbye! 👋"
-        add_to_history('bot', farewell)
-        st.session_state.conversation_ended = True
-        return
-    
-    state = st.session_state.conversation_state
-    
-    if state == 'GREETING':
-        if len(user_input) < 2:
-            add_to_history('bot', "Please enter a valid name (at least 2 characters).")
-            return
-        st.session_state.candidate_info['full_name'] = user_input
-        st.session_state.conversation_state = 'COLLECT_EMAIL'
-        add_to_history('bot', f"Nice to meet you, {user_input}! {get_current_prompt()}")
-        return
-        
-    elif state == 'COLLECT_NAME':
-        if len(user_input) < 2:
-            add_to_history('bot', "Please enter a valid name (at least 2 characters).")
-            return
-        st.session_state.candidate_info['full_name'] = user_input
-        st.session_state.conversation_state = 'COLLECT_EMAIL'
-        add_to_history('bot', f"Nice to meet you, {user_input}! {get_current_prompt()}")
-        
-    elif state == 'COLLECT_EMAIL':
-        if not validate_email(user_input):
-            add_to_history('bot', "Please enter a valid email address (e.g., name@example.com).")
-            return
-        st.session_state.candidate_info['email'] = user_input
-        st.session_state.conversation_state = 'COLLECT_PHONE'
-        add_to_history('bot', get_current_prompt())
-        
-    elif state == 'COLLECT_PHONE':
-        if not validate_phone(user_input):
-            add_to_history('bot', "Please enter a valid phone number with at least 10 digits.")
-            return
-        st.session_state.candidate_info['phone'] = user_input
-        st.session_state.conversation_state = 'COLLECT_EXPERIENCE'
-        add_to_history('bot', get_current_prompt())
-        
-    elif state == 'COLLECT_EXPERIENCE':
-        try:
-            exp = float(user_input)
-            if exp < 0 or exp > 50:
-                add_to_history('bot', "Please enter a valid number of years (0-50).")
-                return
-        except ValueError:
-            add_to_history('bot', "Please enter a valid number (e.g., 3, 5.5, etc.).")
-            return
-        st.session_state.candidate_info['years_experience'] = user_input
-        st.session_state.conversation_state = 'COLLECT_POSITION'
-        add_to_history('bot', get_current_prompt())
-        
-    elif state == 'COLLECT_POSITION':
-        if len(user_input) < 2:
-            add_to_history('bot', "Please enter a valid position title.")
-            return
-        st.session_state.candidate_info['desired_position'] = user_input
-        st.session_state.conversation_state = 'COLLECT_LOCATION'
-        add_to_history('bot', get_current_prompt())
-        
-    elif state == 'COLLECT_LOCATION':
-        if len(user_input) < 2:
-            add_to_history('bot', "Please enter a valid location.")
-            return
-        st.session_state.candidate_info['current_location'] = user_input
-        st.session_state.conversation_state = 'COLLECT_TECH_STACK'
-        add_to_history('bot', get_current_prompt())
-        
-    elif state == 'COLLECT_TECH_STACK':
-        tech_stack = [tech.strip() for tech in user_input.split(',') if tech.strip()]
-        if len(tech_stack) == 0:
-            add_to_history('bot', "Please enter at least one technology.")
-            return
-        
-        st.session_state.candidate_info['tech_stack'] = tech_stack
-        st.session_state.tech_stack_list = tech_stack
-        
-        # Generate questions for ALL technologies
-        st.session_state.questions_queue = generate_ai_questions(tech_stack)
-        st.session_state.current_question_num = 0
-        st.session_state.user_answers = []
-        
-        st.session_state.conversation_state = 'GENERATE_QUESTIONS'
-        tech_msg = f"Great! I've recorded your tech stack: {', '.join(tech_stack)}\n\nI'll ask you {len(st.session_state.questions_queue)} questions (3 for each technology). Please answer each question."
-        add_to_history('bot', tech_msg)
-        
-        if st.session_state.questions_queue:
-            q = st.session_state.questions_queue[0]
-            st.session_state.current_question = q
-            question_msg = f"**Question 1 of {len(st.session_state.questions_queue)}** (Technology: {q['technology']}):\n\n{q['question']}"
-            add_to_history('bot', question_msg)
-        
-    elif state == 'GENERATE_QUESTIONS':
-        # Check if user typed "done"
-        if user_input.lower().strip() == 'done':
-            st.session_state.conversation_state = 'END'
-            name = st.session_state.candidate_info.get('full_name', 'there')
-            email = st.session_state.candidate_info.get('email', 'your email')
-            farewell = f"🎉 Thank you for your time, {name}! \n\nWe have recorded your answers. We will let you know the result through your mail at {email}.\n\n🍀 Good luck with your application!"
-            add_to_history('bot', farewell)
-            st.session_state.conversation_ended = True
-            save_candidate_info()
-            return
-        
-        # Store the answer for the current question
-        st.session_state.user_answers.append({
-            'question': st.session_state.current_question.get('question', ''),
-            'answer': user_input,
-            'technology': st.session_state.current_question.get('technology', '')
-        })
-        
-        st.session_state.current_question_num += 1
-        
-        # Check if we've asked all questions
-        total_questions = len(st.session_state.questions_queue)
-        
-        if st.session_state.current_question_num >= total_questions:
-            # All questions answered, end automatically
-            st.session_state.conversation_state = 'END'
-            name = st.session_state.candidate_info.get('full_name', 'there')
-            email = st.session_state.candidate_info.get('email', 'your email')
-            farewell = f"🎉 Thank you for your time, {name}! \n\nWe have recorded your answers. We will let you know the result through your mail at {email}.\n\n🍀 Good luck with your application!"
-            add_to_history('bot', farewell)
-            st.session_state.conversation_ended = True
-            save_candidate_info()
-            return
-        
-        # Ask next question
-        q = st.session_state.questions_queue[st.session_state.current_question_num]
-        st.session_state.current_question = q
-        question_num = st.session_state.current_question_num + 1
-        question_msg = f"**Question {question_num} of {total_questions}** (Technology: {q['technology']}):\n\n{q['question']}"
-        add_to_history('bot', question_msg)
+    may_wait = session.state == 'COLLECT_TECH_STACK' or (had_stream is not None and not had_stream.done)
+    with st.spinner(generation_wait_message()) if may_wait else nullcontext():
+        result = get_engine().step(session, user_input)
     
-    else:
-        add_to_history('bot', "I'm here to assist with the hiring process. Could you please provide the requested details?")
+    if session.question_stream is not had_stream:
+        track_question_stream(session, session.question_stream)
+    if result.error:
+        st.error(f"Failed to generate AI questions: {result.error}")
+    if result.answer:
+        get_answer_journal().append(session.session_id, 'answer', answer=result.answer)
+        get_answer_grader().submit(session.session_id, len(session.user_answers) - 1, result.answer)
+    for message in result.messages:
+        add_to_history('bot', message)
+    if result.completed:
+        save_candidate_info()
+    elif session.ended:
+        discard_session(session)
 
 def save_candidate_info():
-    """Save candidate information to a JSON file"""
+    """Queue candidate information for the candidate store"""
+    session = st.session_state.session
     try:
-        filename = f"candidate_{st.session_state.candidate_info['full_name'].replace(' ', '_').lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        
-        data = {
-            'candidate_info': st.session_state.candidate_info,
-            'conversation_history': st.session_state.conversation_history,
-            'generated_questions': st.session_state.generated_questions,
-            'user_answers': st.session_state.get('user_answers', []),
-            'timestamp': datetime.now().isoformat()
-        }
-        
-        with open(filename, 'w') as f:
-            json.dump(data, f, indent=2)
+        with SAVE_SECONDS.time():
+            data = candidate_record(session, full_conversation_history(session))
+            
+            # Written by the store's background thread, batched with other sessions' writes
+            saved = get_candidate_store().save(data, session.session_id)
+            
+            def on_saved(f):
+                # The committed record supersedes the journal and the checkpoint; until then they are kept
+                if f.exception() is None:
+                    discard_session(session)
+            
+            saved.add_done_callback(on_saved)
+            session.record_saved = True
         
-        st.success(f"✅ Candidate information saved to {filename}")
+        saved.result(timeout=SAVE_CONFIRM_SECONDS)
+        st.success("✅ Candidate information saved")
+    except concurrent.futures.TimeoutError:
+        st.info("⏳ Candidate information is being saved")
     except Exception as e:
-        st.error(f"Error saving candidate info: {str(e)}")
+        st.error(f"Error saving candidate info: {str(e)}. Your answers have been kept.")
 
 def display_candidate_summary():
     """Display a summary of collected candidate information"""
-    if st.session_state.candidate_info['full_name']:
+    session = st.session_state.session
+    if session.candidate_info['full_name']:
         st.sidebar.markdown("---")
         st.sidebar.subheader("📋 Candidate Summary")
         
-        info = st.session_state.candidate_info
+        info = session.candidate_info
         st.sidebar.markdown(f"""
         **Name:** {info['full_name'] or 'Not provided'}  
         **Email:** {info['email'] or 'Not provided'}  
@@ -465,22 +323,26 @@ def display_candidate_summary():
         **Tech Stack:** {', '.join(info['tech_stack']) if info['tech_stack'] else 'Not provided'}
         """)
 
-        states = ['GREETING', 'COLLECT_NAME', 'COLLECT_EMAIL', 'COLLECT_PHONE', 
-                 'COLLECT_EXPERIENCE', 'COLLECT_POSITION', 'COLLECT_LOCATION', 
-                 'COLLECT_TECH_STACK', 'GENERATE_QUESTIONS', 'END']
-        current_idx = states.index(st.session_state.conversation_state) if st.session_state.conversation_state in states else 8
-        progress = (current_idx / (len(states) - 1)) * 100
+        current_idx = STATES.index(session.state) if session.state in STATES else 8
+        progress = (current_idx / (len(STATES) - 1)) * 100
         st.sidebar.progress(int(progress), text=f"Progress: {int(progress)}%")
 
 def reset_conversation():
     """Reset the conversation to start over"""
+    get_sessions().discard(st.session_state.session_id)
     for key in list(st.session_state.keys()):
         del st.session_state[key]
+    st.query_params.clear()
     init_session_state()
     st.rerun()
 
+def profiling_enabled():
+    """Whether this session has asked for its reruns to be profiled"""
+    return PROFILING_AVAILABLE and st.session_state.get('profiling', False)
+
 def main():
     init_session_state()
+    start_metrics_exporter()
     
     st.markdown('<h1 class="main-header">👔 TalentScout</h1>', unsafe_allow_html=True)
     st.markdown('<p class="sub-header">AI-Powered Hiring Assistant</p>', unsafe_allow_html=True)
@@ -515,28 +377,29 @@ def main():
         **Current Status:**  
         """)
         
-        status_color = "🟢" if not st.session_state.conversation_ended else "🔴"
-        st.markdown(f"{status_color} **{st.session_state.conversation_state.replace('_', ' ')}**")
+        session = st.session_state.session
+        status_color = "🟢" if not session.ended else "🔴"
+        st.markdown(f"{status_color} **{session.state.replace('_', ' ')}**")
         
         display_candidate_summary()
+        
+        if PROFILING_AVAILABLE:
+            st.markdown("---")
+            st.checkbox("🔬 Profile this session", key="profiling",
+                        help=f"Write a profile of each step to {os.getenv('PROFILE_DIR', 'profiles')}/")
     
   
     chat_container = st.container()
     
     with chat_container:
        
-        display_chat_history()
+        with profiled(profiling_enabled(), f"{st.session_state.session_id}_render"):
+            display_chat_history()
         
        
-        if not st.session_state.conversation_ended:
+        if not st.session_state.session.ended:
             
-            last_bot_msg = None
-            for msg in reversed(st.session_state.conversation_history):
-                if msg['role'] == 'bot':
-                    last_bot_msg = msg['message']
-                    break
-            
-            if not last_bot_msg:
+            if not st.session_state.session.has_bot_message:
                
                 initial_msg = get_current_prompt()
                 st.markdown(f"""
@@ -545,14 +408,14 @@ def main():
                 </div>
                 """, unsafe_allow_html=True)
     
-    if not st.session_state.conversation_ended:
+    if not st.session_state.session.ended:
         st.markdown("---")
         
         # Always use text input for all states including questions
         with st.form(key='chat_form', clear_on_submit=True):
-            if st.session_state.conversation_state == 'GENERATE_QUESTIONS':
-                total_q = len(st.session_state.questions_queue)
-                answered = st.session_state.current_question_num
+            if st.session_state.session.state == 'GENERATE_QUESTIONS':
+                total_q = st.session_state.session.total_questions()
+                answered = st.session_state.session.current_question_num
                 user_input = st.text_input(
                     f"Your answer ({answered + 1}/{total_q}):",
                     placeholder="Type your answer here...",
@@ -573,7 +436,10 @@ def main():
                 add_to_history('user', user_input)
                
                
-                process_user_input(user_input)
+                with profiled(profiling_enabled(), f"{st.session_state.session_id}_{st.session_state.session.state}"):
+                    process_user_input(user_input)
+                journal_state(st.session_state.session)
+                checkpoint_session(st.session_state.session)
                
                
                 st.rerun()
@@ -588,5 +454,7 @@ def main():
         </div>
         """, unsafe_allow_html=True)
 
+    warm_up_llm_client()
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,140 @@
+"""Drive concurrent synthetic candidates through the full GREETING -> END flow against a mock OpenAI.
+
+Reports p50/p95/p99 latency per state, end-to-end throughput and memory per session.
+
+Usage:
+    python benchmarks/load_test.py --candidates 200 --concurrency 50 --latency 0.8 --tps 80
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+import argparse
+import threading
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_openai import MockConfig, MockOpenAIServer
+from stats import print_latency_table
+
+STACKS = [
+    'Python, Django, PostgreSQL',
+    'React, Node.js, MongoDB, AWS',
+    'Java, Spring Boot, MySQL, Kubernetes',
+    'Go, Docker, Redis',
+    'TypeScript, Next.js, GraphQL',
+    'C#, .NET, Azure',
+    'Python, Pandas, scikit-learn, PyTorch',
+    'Ruby on Rails, PostgreSQL, Redis',
+]
+
+
+def candidate_inputs(n, rng, unique_stacks):
+    """The inputs one synthetic candidate types, up to (but excluding) the answers"""
+    stack = rng.choice(STACKS)
+    if unique_stacks:
+        stack += f", Tool{n}"
+    return [
+        f"Candidate {n}",
+        f"candidate{n}@example.com",
+        f"+1 555 {n % 1000:03d} {n % 10000:04d}",
+        str(rng.randint(0, 20)),
+        "Backend Engineer",
+        "Remote",
+        stack,
+    ]
+
+def run_candidate(n, engine, store, timings, timings_lock, seed, unique_stacks):
+    """Run one candidate to completion and record per-state step latencies"""
+    from engine import Session, candidate_record
+
+    rng = random.Random(seed + n)
+    session = Session()
+    inputs = candidate_inputs(n, rng, unique_stacks)
+    local = []
+    history = []
+    started = time.perf_counter()
+    while not session.ended:
+        user_input = inputs.pop(0) if inputs else f"My answer, take {session.current_question_num + 1}."
+        state = session.state
+        t0 = time.perf_counter()
+        result = engine.step(session, user_input)
+        local.append((state, time.perf_counter() - t0))
+        history.append({'role': 'user', 'message': user_input, 'timestamp': ''})
+        history.extend({'role': 'bot', 'message': m, 'timestamp': ''} for m in result.messages)
+        if result.completed:
+            t0 = time.perf_counter()
+            store.save(candidate_record(session, history), session.session_id)
+            local.append(('SAVE', time.perf_counter() - t0))
+    local.append(('TOTAL', time.perf_counter() - started))
+    with timings_lock:
+        for state, seconds in local:
+            timings.setdefault(state, []).append(seconds)
+    return session
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the TalentScout conversation flow")
+    parser.add_argument('--candidates', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=25)
+    parser.add_argument('--latency', type=float, default=0.5)
+    parser.add_argument('--jitter', type=float, default=0.1)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--tps', type=float, default=100.0)
+    parser.add_argument('--mode', choices=['batch', 'concurrent'], default='batch')
+    parser.add_argument('--unique-stacks', action='store_true', help="defeat caching and request coalescing")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    server = MockOpenAIServer(0, MockConfig(args.latency, args.jitter, args.error_rate, args.tps)).start()
+    workdir = tempfile.mkdtemp(prefix='talentscout-load-')
+
+    # Configuration is read at import time, so it has to be in place before the app modules load
+    os.environ['OPENAI_BASE_URL'] = server.base_url
+    os.environ['OPENAI_API_KEY'] = 'mock-key'
+    os.environ['QUESTION_GENERATION_MODE'] = args.mode
+    os.environ['QUESTION_CACHE_PATH'] = os.path.join(workdir, 'question_cache.json')
+    os.environ['QUESTION_BANK_PATH'] = os.path.join(workdir, 'missing.tsqb')
+    os.environ['CANDIDATE_DB_PATH'] = os.path.join(workdir, 'candidates.db')
+    from engine import ConversationEngine
+    from candidate_store import get_candidate_store
+    from llm_client import get_client
+
+    engine = ConversationEngine()
+    store = get_candidate_store()
+    # A serving instance has the SDK loaded by warm_up() before candidates arrive; don't time or trace that
+    get_client()
+    timings = {}
+    timings_lock = threading.Lock()
+
+    print(f"Mock OpenAI at {server.base_url} (latency {args.latency}s +/- {args.jitter}s, "
+          f"{args.tps} tok/s, error rate {args.error_rate:.0%}); mode={args.mode}")
+    print(f"Running {args.candidates} candidates with concurrency {args.concurrency}...")
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = [pool.submit(run_candidate, n, engine, store, timings, timings_lock, args.seed, args.unique_stacks)
+                   for n in range(args.candidates)]
+        sessions = [future.result() for future in futures]
+    elapsed = time.perf_counter() - started
+    store.flush()
+    per_session = (tracemalloc.get_traced_memory()[0] - baseline) / max(1, len(sessions))
+    tracemalloc.stop()
+
+    print()
+    print_latency_table(timings)
+    steps = sum(len(values) for state, values in timings.items() if state not in ('TOTAL', 'SAVE'))
+    print()
+    print(f"Completed {len(sessions)} interviews in {elapsed:.2f}s: "
+          f"{len(sessions) / elapsed:.1f} interviews/s, {steps / elapsed:.1f} steps/s")
+    print(f"OpenAI requests: {server.request_count}")
+    print(f"Memory retained per session: {per_session / 1024:.1f} KiB")
+    server.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
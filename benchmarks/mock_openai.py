@@ -0,0 +1,189 @@
+"""Local stand-in for the OpenAI chat-completions endpoint.
+
+Serves POST /v1/chat/completions (streamed and non-streamed) with configurable latency,
+jitter, error rate and token throughput, answering question-generation prompts with
+well-formed JSON question arrays and answer-grading prompts with JSON grades.
+
+Usage:
+    python benchmarks/mock_openai.py --port 8765 --latency 0.8 --jitter 0.3 --tps 80
+"""
+import re
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockConfig:
+    """Behaviour of the mock endpoint"""
+
+    def __init__(self, latency=0.5, jitter=0.1, error_rate=0.0, tokens_per_second=100.0, chunk_tokens=4):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.tokens_per_second = tokens_per_second
+        self.chunk_tokens = chunk_tokens
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token)"""
+    return max(1, len(text) // 4)
+
+# Distinct scenarios, so generated sets don't look like near-duplicates of each other
+SCENARIOS = [
+    "a production {tech} service degrades under load after a deploy. How would you diagnose and fix it?",
+    "you must design a multi-tenant system on {tech} with strict data isolation. Which patterns would you choose?",
+    "an auditor finds secrets committed to a {tech} codebase. How do you remediate and prevent recurrence?",
+    "memory usage of a long-running {tech} process grows steadily until it crashes. Walk through your investigation.",
+    "a critical {tech} dependency has a breaking major release. How would you plan and verify the upgrade?",
+    "intermittent test failures appear in the {tech} CI pipeline. How do you find the root cause?",
+    "you need zero-downtime schema changes for a {tech} application. Describe your rollout.",
+    "latency SLOs for a {tech} API are missed at p99 only. What do you measure first and why?",
+]
+
+def fake_questions(prompt):
+    """Build a JSON question array matching a question-generation prompt"""
+    stack_match = re.search(r'tech stack: (.*?)\.\n', prompt)
+    techs = stack_match.group(1).split(', ') if stack_match else ['software development']
+    count_match = re.search(r'Generate exactly (\d+) questions', prompt)
+    per_tech = int(count_match.group(1)) if count_match else 3
+    questions = []
+    for tech in techs:
+        for i, scenario in enumerate(random.sample(SCENARIOS, min(per_tech, len(SCENARIOS)))):
+            questions.append({
+                'question': f"Scenario {i + 1}: {scenario.format(tech=tech)} ({uuid.uuid4().hex[:6]})",
+                'technology': tech
+            })
+    return json.dumps(questions, indent=2)
+
+def fake_grades(prompt):
+    """Build a JSON grade array matching an answer-grading prompt"""
+    count = len(re.findall(r'^Answer \d+ \(Technology:', prompt, re.MULTILINE))
+    return json.dumps([{'id': i, 'score': random.randint(3, 9), 'feedback': "Mock grade."}
+                       for i in range(1, count + 1)], indent=2)
+
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        config = self.server.config
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length) or b'{}')
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': 'not found'}})
+            return
+
+        self.server.record_request()
+        time.sleep(max(0.0, config.latency + random.uniform(-config.jitter, config.jitter)))
+        if random.random() < config.error_rate:
+            status = random.choice([429, 500, 503])
+            self._send_json(status, {'error': {'message': 'mock failure', 'type': 'server_error', 'code': status}})
+            return
+
+        prompt = request.get('messages', [{}])[-1].get('content', '')
+        content = fake_grades(prompt) if prompt.startswith('Grade each candidate answer') else fake_questions(prompt)
+        prompt_tokens = sum(estimate_tokens(m.get('content', '')) for m in request.get('messages', []))
+        completion_tokens = estimate_tokens(content)
+        usage = {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                 'total_tokens': prompt_tokens + completion_tokens}
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        model = request.get('model', 'mock')
+
+        if not request.get('stream'):
+            time.sleep(completion_tokens / config.tokens_per_second)
+            self._send_json(200, {
+                'id': completion_id, 'object': 'chat.completion', 'created': int(time.time()), 'model': model,
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+                'usage': usage
+            })
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        step = config.chunk_tokens * 4
+        delay = config.chunk_tokens / config.tokens_per_second
+        for i in range(0, len(content), step):
+            self._send_event({
+                'id': completion_id, 'object': 'chat.completion.chunk', 'created': int(time.time()), 'model': model,
+                'choices': [{'index': 0, 'delta': {'content': content[i:i + step]}, 'finish_reason': None}]
+            })
+            time.sleep(delay)
+        final = {
+            'id': completion_id, 'object': 'chat.completion.chunk', 'created': int(time.time()), 'model': model,
+            'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]
+        }
+        if request.get('stream_options', {}).get('include_usage'):
+            final['usage'] = usage
+        self._send_event(final)
+        self.wfile.write(b'data: [DONE]\n\n')
+        self.wfile.flush()
+
+    def _send_event(self, payload):
+        self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode('utf-8'))
+        self.wfile.flush()
+
+
+class MockOpenAIServer(ThreadingHTTPServer):
+    """Threaded HTTP server for the mock endpoint"""
+
+    daemon_threads = True
+
+    def __init__(self, port=0, config=None):
+        super().__init__(('127.0.0.1', port), MockOpenAIHandler)
+        self.config = config or MockConfig()
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+
+    def record_request(self):
+        with self._count_lock:
+            self.request_count += 1
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def start(self):
+        """Serve in a background thread and return self"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local mock of the OpenAI chat-completions API")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.5, help="seconds before the first byte")
+    parser.add_argument('--jitter', type=float, default=0.1, help="uniform +/- jitter on latency, in seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered with 429/5xx")
+    parser.add_argument('--tps', type=float, default=100.0, help="output tokens per second")
+    args = parser.parse_args()
+
+    server = MockOpenAIServer(args.port, MockConfig(args.latency, args.jitter, args.error_rate, args.tps))
+    print(f"Mock OpenAI listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""Replay saved candidate transcripts through the conversation engine with the LLM mocked.
+
+Every recorded user turn is fed back through ConversationEngine; the bot replies are
+checked against the recorded ones and every step is timed, giving a deterministic
+regression corpus built from real interviews.
+
+Usage:
+    python benchmarks/replay.py exports/candidate_*.json
+    python benchmarks/replay.py --from-store --limit 500 --repeat 5
+"""
+import os
+import re
+import sys
+import glob
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stats import print_latency_table
+
+QUESTION_MESSAGE = re.compile(r'^\*\*Question (\d+) of (\d+)\*\* \(Technology: (.*?)\):\n\n(.*)$', re.DOTALL)
+
+
+def recorded_questions(record):
+    """Recover the question list a candidate was given from their transcript"""
+    asked = {}
+    total = 0
+    for msg in record.get('conversation_history', []):
+        match = QUESTION_MESSAGE.match(msg['message']) if msg['role'] == 'bot' else None
+        if match:
+            number, total = int(match.group(1)), int(match.group(2))
+            asked[number] = {'question': match.group(4), 'technology': match.group(3)}
+    # Questions after an early exit were never shown; their text can't affect the replay
+    return [asked.get(n, {'question': f"(unasked question {n})", 'technology': ''}) for n in range(1, total + 1)]
+
+def split_turns(record):
+    """Pair each recorded user turn with the bot messages that followed it"""
+    turns = []
+    for msg in record.get('conversation_history', []):
+        if msg['role'] == 'user':
+            turns.append((msg['message'], []))
+        elif turns:
+            turns[-1][1].append(msg['message'])
+    return turns
+
+def replay_record(record, timings):
+    """Replay one record and return a list of mismatch descriptions"""
+    from engine import ConversationEngine, Session
+    from question_generator import QuestionStream
+
+    questions = recorded_questions(record)
+    engine = ConversationEngine(question_source=lambda tech_stack, years, email=None: QuestionStream.completed(questions))
+    session = Session()
+    states = [session.state]
+    mismatches = []
+    completed = False
+
+    for index, (user_input, expected) in enumerate(split_turns(record)):
+        state = session.state
+        t0 = time.perf_counter()
+        result = engine.step(session, user_input)
+        timings.setdefault(state, []).append(time.perf_counter() - t0)
+        states.append(session.state)
+        completed = completed or result.completed
+        if result.messages != expected:
+            mismatches.append(f"turn {index + 1} ({state}, input {user_input!r}): "
+                              f"expected {expected!r}, got {result.messages!r}")
+
+    if record.get('user_answers') and session.user_answers != record['user_answers']:
+        mismatches.append(f"answers differ: expected {len(record['user_answers'])}, got {len(session.user_answers)}")
+    if states[-1] != 'END' or not (completed or session.ended):
+        mismatches.append(f"conversation did not reach END: {' -> '.join(states)}")
+    return mismatches
+
+def load_records(args):
+    """Load records from the given files or from the candidate store"""
+    if args.from_store:
+        from candidate_store import get_candidate_store
+        return [('store', record) for record in get_candidate_store().find(limit=args.limit)]
+    records = []
+    for pattern in args.paths or ['candidate_*.json']:
+        for path in sorted(glob.glob(pattern)):
+            with open(path, 'r') as f:
+                records.append((path, json.load(f)))
+    return records[:args.limit]
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay saved TalentScout transcripts as a regression benchmark")
+    parser.add_argument('paths', nargs='*', help="candidate_*.json files or glob patterns")
+    parser.add_argument('--from-store', action='store_true', help="replay records from the candidate store")
+    parser.add_argument('--limit', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=1, help="replay the corpus this many times for timing")
+    parser.add_argument('--no-check', action='store_true', help="only time the replay; don't fail on mismatches")
+    parser.add_argument('--verbose', action='store_true', help="print every mismatch")
+    args = parser.parse_args()
+
+    # Replays must never reach the network
+    os.environ['USE_LIVE_QUESTIONS'] = '0'
+    records = load_records(args)
+    if not records:
+        print("No candidate records found", file=sys.stderr)
+        return 1
+
+    timings = {}
+    failures = {}
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        for source, record in records:
+            mismatches = replay_record(record, timings)
+            if mismatches:
+                failures[source] = mismatches
+    elapsed = time.perf_counter() - started
+    steps = sum(len(values) for values in timings.values())
+
+    print_latency_table(timings)
+    print()
+    print(f"Replayed {len(records)} record(s) x {args.repeat}: {steps} steps in {elapsed:.3f}s "
+          f"({steps / elapsed:.0f} steps/s)")
+    if failures:
+        print(f"{len(failures)} record(s) diverged from their recorded transcript")
+        for source, mismatches in failures.items():
+            print(f"  {source}: {mismatches[0]}")
+            if args.verbose:
+                for mismatch in mismatches[1:]:
+                    print(f"      {mismatch}")
+    return 0 if args.no_check or not failures else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""Measure how long a fresh process takes to import the app and draw its first page.
+
+Each repeat starts new Python processes, so nothing is warm but the OS file cache:
+one imports app.py under -X importtime, another renders it with Streamlit's
+AppTest (the first run, then a rerun in the same process). Medians are reported,
+with the slowest of app.py's own imports, and the exit status is non-zero when a
+--max-* budget is exceeded, so CI can track startup regressions.
+
+Usage:
+    python benchmarks/startup.py --repeat 5
+    python benchmarks/startup.py --json --max-import-ms 800 --max-render-ms 1500
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+IMPORT_SCRIPT = """
+import time
+started = time.perf_counter()
+import app
+print(time.perf_counter() - started)
+"""
+
+RENDER_SCRIPT = """
+import json, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file('app.py', default_timeout=120)
+started = time.perf_counter()
+at.run()
+first = time.perf_counter() - started
+started = time.perf_counter()
+at.run()
+rerun = time.perf_counter() - started
+print(json.dumps({'first_render': first, 'rerun': rerun, 'exception': bool(at.exception)}))
+"""
+
+
+def child_env():
+    """Environment for the measured processes: a configured key, no network, no exporters"""
+    env = dict(os.environ)
+    env.setdefault('OPENAI_API_KEY', 'sk-startup-benchmark')
+    env['USE_LIVE_QUESTIONS'] = '0'
+    env.pop('METRICS_PORT', None)
+    env.pop('METRICS_FILE', None)
+    return env
+
+def run_child(args):
+    """Run python with args in the repo root and return (stdout, stderr, wall seconds)"""
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable] + args, cwd=ROOT, env=child_env(), capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if result.returncode:
+        sys.stderr.write(result.stderr)
+        raise SystemExit(f"startup benchmark child failed with exit status {result.returncode}")
+    return result.stdout, result.stderr, elapsed
+
+def app_imports(importtime_output):
+    """Cumulative seconds per module app.py imports directly, from -X importtime output"""
+    imports = {}
+    children = {}
+    for line in importtime_output.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        # A module's line follows those of the modules it imported, each level indented two more spaces
+        depth = len(match.group(3)) // 2
+        if depth == 1:
+            children[match.group(4)] = int(match.group(2)) / 1e6
+        elif depth == 0:
+            if match.group(4) == 'app':
+                imports = children
+            children = {}
+    return imports
+
+def measure_once():
+    """One cold import and one cold render, each in its own process"""
+    _, _, interpreter = run_child(['-c', 'pass'])
+    stdout, stderr, process = run_child(['-X', 'importtime', '-c', IMPORT_SCRIPT])
+    render = json.loads(run_child(['-c', RENDER_SCRIPT])[0].strip().splitlines()[-1])
+    return {
+        'interpreter': interpreter,
+        'import': float(stdout.strip().splitlines()[-1]),
+        'import_process': process,
+        'first_render': render['first_render'],
+        'rerun': render['rerun'],
+        'render_exception': render['exception'],
+        'imports': app_imports(stderr),
+    }
+
+def summarize(runs, top):
+    """Medians of every timing across runs, and the slowest imports by median"""
+    summary = {key: statistics.median(run[key] for run in runs)
+               for key in ('interpreter', 'import', 'import_process', 'first_render', 'rerun')}
+    modules = set().union(*(run['imports'] for run in runs))
+    slowest = {name: statistics.median(run['imports'].get(name, 0.0) for run in runs) for name in modules}
+    summary['slowest_imports'] = sorted(slowest.items(), key=lambda item: -item[1])[:top]
+    summary['repeat'] = len(runs)
+    summary['render_exception'] = any(run['render_exception'] for run in runs)
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TalentScout cold start: import time and time to first render")
+    parser.add_argument('--repeat', type=int, default=5, help="fresh processes to measure; medians are reported")
+    parser.add_argument('--top', type=int, default=10, help="how many of app.py's slowest imports to list")
+    parser.add_argument('--json', action='store_true', help="print the summary as JSON")
+    parser.add_argument('--max-import-ms', type=float, help="fail if the median import of app.py takes longer")
+    parser.add_argument('--max-render-ms', type=float, help="fail if the median first render takes longer")
+    args = parser.parse_args()
+
+    summary = summarize([measure_once() for _ in range(args.repeat)], args.top)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(f"{'median over ' + str(summary['repeat']) + ' cold process(es)':<36}{'ms':>10}")
+        for key, label in (('interpreter', 'interpreter start'), ('import', 'import app'),
+                           ('import_process', 'process start + import app'),
+                           ('first_render', 'first render (cold process)'), ('rerun', 'rerun (warm process)')):
+            print(f"{label:<36}{summary[key] * 1000:>10.1f}")
+        print()
+        print(f"{'slowest imports of app.py':<36}{'ms':>10}")
+        for name, seconds in summary['slowest_imports']:
+            print(f"{name:<36}{seconds * 1000:>10.1f}")
+        if summary['render_exception']:
+            print("\nThe app raised an exception while rendering; timings may not be representative")
+
+    failed = False
+    if args.max_import_ms is not None and summary['import'] * 1000 > args.max_import_ms:
+        print(f"import app took {summary['import'] * 1000:.0f} ms, over the {args.max_import_ms:g} ms budget", file=sys.stderr)
+        failed = True
+    if args.max_render_ms is not None and summary['first_render'] * 1000 > args.max_render_ms:
+        print(f"first render took {summary['first_render'] * 1000:.0f} ms, over the {args.max_render_ms:g} ms budget", file=sys.stderr)
+        failed = True
+    return 1 if failed or summary['render_exception'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
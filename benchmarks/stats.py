@@ -0,0 +1,17 @@
+"""Shared timing helpers for the benchmark scripts."""
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+def print_latency_table(timings):
+    """Print p50/p95/p99 step latency per state, slowest first"""
+    print(f"{'state':<22}{'steps':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for state, values in sorted(timings.items(), key=lambda item: -percentile(item[1], 99)):
+        print(f"{state:<22}{len(values):>8}{percentile(values, 50) * 1000:>10.2f}"
+              f"{percentile(values, 95) * 1000:>10.2f}{percentile(values, 99) * 1000:>10.2f}")
@@ -0,0 +1,69 @@
+"""Pre-generate a versioned question bank for the most common technologies.
+
+Usage:
+    python build_question_bank.py --top 40 --per-tier 12 --output question_bank.tsqb
+"""
+import os
+import sys
+import asyncio
+import argparse
+from datetime import datetime
+
+import environment  # noqa: F401  (loads .env before the modules below read their settings)
+from llm_client import make_async_client
+from llm_scheduler import BACKGROUND
+from question_bank import write_question_bank
+from question_cache import SENIORITY_BANDS
+from question_generator import request_tech_questions_async
+from tech_canon import CANONICAL_TECHNOLOGIES, canonicalize_tech
+
+
+async def build_pools(technologies, bands, per_tier, concurrency):
+    """Generate a pool for every (technology, band) pair"""
+    async_client = make_async_client()
+    semaphore = asyncio.Semaphore(concurrency)
+    jobs = [(tech, band) for tech in technologies for band in bands]
+    try:
+        results = await asyncio.gather(
+            *(request_tech_questions_async(async_client, semaphore, tech, band, per_tier, BACKGROUND)
+              for tech, band in jobs),
+            return_exceptions=True
+        )
+    finally:
+        await async_client.close()
+
+    pools = {}
+    for (tech, band), result in zip(jobs, results):
+        if isinstance(result, Exception) or not result:
+            print(f"  ! {tech} ({band}): {result or 'no questions returned'}", file=sys.stderr)
+            continue
+        pools[(tech, band)] = [{'question': q['question'], 'technology': tech} for q in result]
+    return pools
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the offline TalentScout question bank")
+    parser.add_argument('--top', type=int, default=40, help="number of most common technologies to include")
+    parser.add_argument('--tech', action='append', default=[], help="extra technology to include (repeatable)")
+    parser.add_argument('--per-tier', type=int, default=12, help="questions per technology and difficulty tier")
+    parser.add_argument('--tiers', default=','.join(SENIORITY_BANDS), help="comma-separated difficulty tiers")
+    parser.add_argument('--concurrency', type=int, default=8, help="maximum concurrent OpenAI requests")
+    parser.add_argument('--version', default=datetime.now().strftime('%Y%m%d_%H%M%S'), help="bank version label")
+    parser.add_argument('--output', default=os.getenv("QUESTION_BANK_PATH", "question_bank.tsqb"))
+    args = parser.parse_args()
+
+    technologies = list(CANONICAL_TECHNOLOGIES)[:args.top]
+    for tech in args.tech:
+        tech = canonicalize_tech(tech)
+        if tech not in technologies:
+            technologies.append(tech)
+    bands = [band.strip() for band in args.tiers.split(',') if band.strip() in SENIORITY_BANDS]
+
+    print(f"Generating {args.per_tier} questions x {len(bands)} tiers for {len(technologies)} technologies...")
+    pools = asyncio.run(build_pools(technologies, bands, args.per_tier, args.concurrency))
+    write_question_bank(args.output, pools, args.version, technologies)
+    total = sum(len(pool) for pool in pools.values())
+    print(f"Wrote {total} questions in {len(pools)} pools to {args.output} (version {args.version})")
+    return 0 if pools else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+"""Pre-register candidates in bulk from a CSV file.
+
+The CSV is streamed in batches of BULK_IMPORT_BATCH_SIZE rows. Every row is checked
+with the same validators the chat applies one field at a time (check_candidate()),
+plus a duplicate-email check across the file, and each invalid row is reported
+with its line number and the failing fields. Valid rows get a session at
+GENERATE_QUESTIONS whose questions are generated in the background, at BACKGROUND
+priority so live interviews go first, with at most BULK_IMPORT_CONCURRENCY
+candidates in flight. Candidates sharing a stack and seniority band share one
+generation. Once a candidate's questions are ready the session is checkpointed to
+the session backend, with a welcome message and the first question, and their
+invitation is written out; opening the app with ?sid=<session_id> (or using the
+API's /sessions/<session_id>) starts them at question one.
+
+Invitations have to be readable by the app, so the session backend must be
+shared: use the sqlite backend (the default) with the app's SESSION_DB_PATH.
+
+Usage:
+    python bulk_import.py applicants.csv --invites invites.csv --errors errors.csv
+    python bulk_import.py applicants.csv --dry-run
+
+The CSV needs a header row naming the columns full_name, email, phone,
+years_experience, desired_position, current_location and tech_stack (a
+comma-separated list in one cell); the aliases in COLUMN_ALIASES are accepted too.
+"""
+import os
+import sys
+import csv
+import time
+import queue
+import argparse
+import itertools
+from collections import namedtuple
+from functools import partial
+
+import environment  # noqa: F401  (loads .env before the modules below read their settings)
+from engine import ChatMessage, ConversationEngine, check_candidate, invitation_messages
+from llm_scheduler import BACKGROUND
+from metrics import CANDIDATES_IMPORTED
+from question_generator import start_question_generation
+from session_backend import checkpoint_session, get_session_backend
+
+BULK_IMPORT_BATCH_SIZE = int(os.getenv("BULK_IMPORT_BATCH_SIZE", "500"))
+
+# Candidates whose questions may be generating at once
+BULK_IMPORT_CONCURRENCY = int(os.getenv("BULK_IMPORT_CONCURRENCY", "32"))
+
+# Prefix for invitation links, e.g. https://talentscout.example.com/
+INVITE_BASE_URL = os.getenv("INVITE_BASE_URL", "")
+
+FIELDS = ['full_name', 'email', 'phone', 'years_experience', 'desired_position', 'current_location', 'tech_stack']
+
+COLUMN_ALIASES = {
+    'name': 'full_name',
+    'email_address': 'email',
+    'phone_number': 'phone',
+    'experience': 'years_experience',
+    'years': 'years_experience',
+    'position': 'desired_position',
+    'location': 'current_location',
+    'stack': 'tech_stack',
+    'technologies': 'tech_stack',
+}
+
+RowError = namedtuple('RowError', ['line', 'email', 'field', 'message'])
+RowError.__doc__ = """Why one CSV row was not imported; line is the row's line number in the file"""
+
+Invite = namedtuple('Invite', ['line', 'full_name', 'email', 'session_id', 'questions'])
+Invite.__doc__ = """A pre-registered candidate whose questions are waiting for them"""
+
+
+def column_field(header):
+    """The candidate_info field a CSV header names, or None"""
+    name = '_'.join(header.strip().lower().replace('-', ' ').split())
+    name = COLUMN_ALIASES.get(name, name)
+    return name if name in FIELDS else None
+
+def read_batches(lines, batch_size=BULK_IMPORT_BATCH_SIZE):
+    """Stream a CSV as lists of (line number, {field: value}), batch_size rows at a time"""
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        raise ValueError("The CSV file is empty")
+    columns = [column_field(name) for name in header]
+    missing = [field for field in FIELDS if field not in columns]
+    if missing:
+        raise ValueError(f"The CSV header is missing column(s): {', '.join(missing)}")
+
+    def rows():
+        for row in reader:
+            if any(cell.strip() for cell in row):
+                yield reader.line_num, {field: value.strip() for field, value in zip(columns, row) if field}
+
+    rows = rows()
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def validate_batch(batch, seen_emails):
+    """Split a batch into valid candidates (line, info, tech stack) and RowErrors
+
+    seen_emails maps each lowercased email accepted so far to its line, so a
+    candidate listed twice is only imported once.
+    """
+    valid = []
+    errors = []
+    for line, info in batch:
+        email = info.get('email', '')
+        row_errors, tech_stack = check_candidate(info)
+        first = seen_emails.get(email.lower())
+        if first is not None and 'email' not in row_errors:
+            row_errors['email'] = f"Duplicate of the candidate on line {first}."
+        if row_errors:
+            errors += [RowError(line, email, field, message) for field, message in row_errors.items()]
+            continue
+        seen_emails[email.lower()] = line
+        valid.append((line, info, tech_stack))
+    return valid, errors
+
+
+class BulkImport:
+    """Validates CSV rows and pre-registers the valid ones, reporting each outcome through callbacks"""
+
+    def __init__(self, engine=None, backend=None, concurrency=BULK_IMPORT_CONCURRENCY,
+                 on_invite=None, on_error=None):
+        self.engine = engine or ConversationEngine(question_source=partial(start_question_generation, priority=BACKGROUND))
+        self.backend = backend or get_session_backend()
+        self.concurrency = max(1, concurrency)
+        self.on_invite = on_invite or (lambda invite: None)
+        self.on_error = on_error or (lambda error: None)
+        self.counts = {'invited': 0, 'invalid': 0, 'failed': 0}
+        # Sessions whose questions are done, put there by the generator threads
+        self._ready = queue.Queue()
+        self._in_flight = 0
+
+    def run(self, lines, dry_run=False, batch_size=BULK_IMPORT_BATCH_SIZE):
+        """Import every row of a CSV; with dry_run, only validate. Returns the outcome counts"""
+        seen_emails = {}
+        for batch in read_batches(lines, batch_size):
+            valid, errors = validate_batch(batch, seen_emails)
+            for error in errors:
+                self.on_error(error)
+            invalid = len({error.line for error in errors})
+            if invalid:
+                self.counts['invalid'] += invalid
+                CANDIDATES_IMPORTED.inc(invalid, outcome='invalid')
+            if dry_run:
+                continue
+            for line, info, tech_stack in valid:
+                while self._in_flight >= self.concurrency:
+                    self._finish(*self._ready.get())
+                self._start(line, info, tech_stack)
+            self._drain(block=False)
+        self._drain(block=True)
+        return self.counts
+
+    def _start(self, line, info, tech_stack):
+        session = self.engine.invite({field: info[field] for field in FIELDS if field != 'tech_stack'}, tech_stack)
+        self._in_flight += 1
+        session.question_stream.add_done_callback(lambda stream: self._ready.put((line, session)))
+
+    def _drain(self, block):
+        while self._in_flight and (block or not self._ready.empty()):
+            self._finish(*self._ready.get())
+
+    def _finish(self, line, session):
+        """Checkpoint a session whose questions are ready, on the importing thread"""
+        self._in_flight -= 1
+        info = session.candidate_info
+        if not session.questions:
+            self.counts['failed'] += 1
+            CANDIDATES_IMPORTED.inc(outcome='failed')
+            self.on_error(RowError(line, info['email'], 'tech_stack',
+                                   f"No questions could be prepared: {session.question_stream.error or 'unknown error'}"))
+            return
+        now = int(time.time())
+        session.history = [ChatMessage('bot', message, now) for message in invitation_messages(session)]
+        session.has_bot_message = True
+        checkpoint_session(session, self.backend)
+        self.counts['invited'] += 1
+        CANDIDATES_IMPORTED.inc(outcome='invited')
+        self.on_invite(Invite(line, info['full_name'], info['email'], session.session_id, len(session.questions)))
+
+
+def invite_link(session_id, base_url=INVITE_BASE_URL):
+    """The URL that opens a pre-registered candidate's session in the app"""
+    return f"{base_url}?sid={session_id}" if base_url else session_id
+
+def _open_output(path):
+    return sys.stdout if path == '-' else open(path, 'w', newline='', encoding='utf-8')
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-register TalentScout candidates from a CSV file")
+    parser.add_argument('path', help="CSV file with a header row ('-' for stdin)")
+    parser.add_argument('--invites', default='-', help="where to write the invitations CSV (default: stdout)")
+    parser.add_argument('--errors', help="also write the per-row errors to this CSV file")
+    parser.add_argument('--base-url', default=INVITE_BASE_URL, help="app URL to build invitation links from")
+    parser.add_argument('--concurrency', type=int, default=BULK_IMPORT_CONCURRENCY,
+                        help="candidates whose questions may be generating at once")
+    parser.add_argument('--dry-run', action='store_true', help="only validate the rows and report errors")
+    args = parser.parse_args()
+
+    if not args.dry_run and os.getenv("SESSION_BACKEND", "sqlite") == 'memory':
+        print("Invitations must be readable by the app: use SESSION_BACKEND=sqlite with the app's "
+              "SESSION_DB_PATH, or --dry-run", file=sys.stderr)
+        return 2
+
+    invites_file = None if args.dry_run else _open_output(args.invites)
+    errors_file = _open_output(args.errors) if args.errors else None
+    invites = csv.writer(invites_file) if invites_file else None
+    errors = csv.writer(errors_file) if errors_file else None
+    if invites:
+        invites.writerow(['line', 'full_name', 'email', 'session_id', 'questions', 'link'])
+    if errors:
+        errors.writerow(['line', 'email', 'field', 'error'])
+
+    def on_invite(invite):
+        invites.writerow(list(invite) + [invite_link(invite.session_id, args.base_url)])
+
+    def on_error(error):
+        print(f"line {error.line} ({error.email or 'no email'}): {error.field}: {error.message}", file=sys.stderr)
+        if errors:
+            errors.writerow(list(error))
+
+    importer = BulkImport(concurrency=args.concurrency, on_invite=on_invite, on_error=on_error)
+    started = time.perf_counter()
+    source = sys.stdin if args.path == '-' else open(args.path, newline='', encoding='utf-8-sig')
+    try:
+        counts = importer.run(source, dry_run=args.dry_run)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        for f in (invites_file, errors_file):
+            if f not in (None, sys.stdout):
+                f.close()
+
+    if args.dry_run:
+        print(f"{counts['invalid']} invalid row(s); nothing imported (dry run)", file=sys.stderr)
+    else:
+        print(f"Invited {counts['invited']} candidate(s) in {time.perf_counter() - started:.1f}s; "
+              f"{counts['invalid']} invalid row(s), {counts['failed']} without questions", file=sys.stderr)
+    return 1 if counts['invalid'] or counts['failed'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+"""Recruiter search and analytics over the candidate store.
+
+CandidateIndex keeps an in-memory inverted index from canonical technologies and
+position/location words to candidate ids, plus per-candidate years of experience
+and record timestamps in NumPy arrays. A filtered search is a handful of vector
+operations, so it takes milliseconds over hundreds of thousands of candidates.
+The index is loaded from the store once, then brought up to date before each
+query from the store's change log, which also picks up candidates saved by
+other processes.
+
+Usage:
+    python candidate_search.py --tech Python --tech Django --min-years 3 --position backend --location berlin
+    python candidate_search.py --weekly --tech Python --tech Go --since 2024-01-01
+"""
+import re
+import sys
+import json
+import math
+import argparse
+import threading
+from array import array
+from functools import lru_cache
+from datetime import datetime, timedelta
+import numpy as np
+from candidate_store import TECH_SEPARATOR, get_candidate_store
+from tech_canon import canonicalize_tech
+
+TERM_PATTERN = re.compile(r"[a-z0-9+#]+")
+
+# A Monday, so that weeks counted from it start on Mondays
+EPOCH = datetime(1970, 1, 5)
+
+WEEK_SECONDS = 7 * 24 * 3600
+
+
+@lru_cache(maxsize=65536)
+def index_terms(text):
+    """Lowercased words of a position or location, as kept in the index"""
+    return frozenset(TERM_PATTERN.findall((text or '').lower()))
+
+def timestamp_key(value):
+    """Seconds since EPOCH for an ISO timestamp or date, or NaN"""
+    try:
+        return (datetime.fromisoformat(value).replace(tzinfo=None) - EPOCH).total_seconds()
+    except (TypeError, ValueError):
+        return math.nan
+
+def timestamp_keys(values):
+    """timestamp_key() for many values, parsed in one NumPy call when they are all valid"""
+    try:
+        return (np.array(values, dtype='datetime64[us]') - np.datetime64(EPOCH)) / np.timedelta64(1, 's')
+    except (TypeError, ValueError):
+        return [timestamp_key(value) for value in values]
+
+def week_start(week):
+    """The Monday (ISO date) starting week number week"""
+    return (EPOCH + timedelta(weeks=week)).date().isoformat()
+
+def _as_list(value):
+    if not value:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+class CandidateIndex:
+    """In-memory inverted and numeric indexes over a candidate store, safe to share between threads"""
+
+    def __init__(self, store):
+        self.store = store
+        self._seq = None
+        self._lock = threading.Lock()
+        # Indexed by candidate id
+        self._alive = np.zeros(0, dtype=bool)
+        self._years = np.zeros(0, dtype=np.float32)
+        self._created = np.zeros(0, dtype=np.float64)
+        # ('tech' | 'position' | 'location', term) -> candidate ids
+        self._postings = {}
+        # Lowercased tech -> its canonical spelling
+        self._tech_names = {}
+
+    def __len__(self):
+        return int(np.count_nonzero(self._alive))
+
+    def refresh(self):
+        """Index every candidate written since the last refresh"""
+        with self._lock:
+            seq, rows = self.store.index_rows(self._seq)
+            if self._seq is not None:
+                self._remove([row[0] for row in rows if row[0] < len(self._alive) and self._alive[row[0]]])
+            if rows:
+                self._reserve(rows[-1][0] + 1)
+                ids = [row[0] for row in rows]
+                self._alive[ids] = True
+                self._years[ids] = [np.nan if row[1] is None else row[1] for row in rows]
+                self._created[ids] = timestamp_keys([row[4] for row in rows])
+            self._add_terms('position', rows, 2, index_terms)
+            self._add_terms('location', rows, 3, index_terms)
+            self._add_terms('tech', rows, 5, self._tech_terms)
+            self._seq = seq
+
+    def _reserve(self, size):
+        if size <= len(self._alive):
+            return
+        size = max(size, 2 * len(self._alive), 1024)
+        grow = size - len(self._alive)
+        self._alive = np.concatenate([self._alive, np.zeros(grow, dtype=bool)])
+        self._years = np.concatenate([self._years, np.full(grow, np.nan, dtype=np.float32)])
+        self._created = np.concatenate([self._created, np.full(grow, np.nan)])
+
+    def _add_terms(self, field, rows, column, terms):
+        """Add each row's id to the postings of the terms in one of its columns"""
+        # Rows sharing a value are indexed together, so each distinct value is only split once
+        groups = {}
+        for row in rows:
+            groups.setdefault(row[column], []).append(row[0])
+        for value, ids in groups.items():
+            for term in terms(value):
+                posting = self._postings.get((field, term))
+                if posting is None:
+                    posting = self._postings[(field, term)] = array('i')
+                posting.extend(ids)
+
+    def _tech_terms(self, techs):
+        terms = set()
+        for tech in (techs or '').split(TECH_SEPARATOR):
+            if tech:
+                self._tech_names.setdefault(tech.lower(), tech)
+                terms.add(tech.lower())
+        return terms
+
+    def _remove(self, candidate_ids):
+        """Drop rewritten candidates from every posting before they are indexed again"""
+        if not candidate_ids:
+            return
+        stale = np.array(candidate_ids, dtype=np.int32)
+        for key, posting in self._postings.items():
+            ids = np.frombuffer(posting, dtype=np.int32)
+            hit = np.isin(ids, stale)
+            if hit.any():
+                self._postings[key] = array('i', ids[~hit].tobytes())
+        self._alive[stale] = False
+
+    def _mask(self, tech=None, position=None, location=None, min_years=None, max_years=None, since=None, until=None):
+        """Boolean array over candidate ids matching every given filter"""
+        mask = self._alive.copy()
+        keys = [('tech', canonicalize_tech(name).lower()) for name in _as_list(tech)]
+        keys += [('position', term) for term in index_terms(position)]
+        keys += [('location', term) for term in index_terms(location)]
+        for key in keys:
+            posting = self._postings.get(key)
+            if not posting:
+                mask[:] = False
+                return mask
+            hit = np.zeros_like(mask)
+            hit[np.frombuffer(posting, dtype=np.int32)] = True
+            mask &= hit
+        if min_years is not None:
+            mask &= self._years >= min_years
+        if max_years is not None:
+            mask &= self._years <= max_years
+        if since:
+            mask &= self._created >= timestamp_key(since)
+        if until:
+            mask &= self._created < timestamp_key(until)
+        return mask
+
+    def search_ids(self, limit=50, offset=0, **filters):
+        """Ids of candidates matching every filter, newest first
+
+        Filters: tech (one or a list, all required), position and location (every
+        word must appear), min_years, max_years, since and until (ISO timestamps or dates).
+        """
+        self.refresh()
+        with self._lock:
+            ids = np.flatnonzero(self._mask(**filters))
+            created = np.nan_to_num(self._created[ids], nan=-np.inf)
+        wanted = offset + limit
+        if len(ids) > wanted:
+            top = np.argpartition(-created, wanted - 1)[:wanted]
+            ids, created = ids[top], created[top]
+        order = np.argsort(-created, kind='stable')
+        return ids[order][offset:wanted].tolist()
+
+    def search(self, limit=50, offset=0, **filters):
+        """Summaries of matching candidates, newest first"""
+        return self.store.summaries(self.search_ids(limit, offset, **filters))
+
+    def count(self, **filters):
+        """Number of candidates matching every filter"""
+        self.refresh()
+        with self._lock:
+            return int(np.count_nonzero(self._mask(**filters)))
+
+    def tech_counts(self, limit=20, **filters):
+        """The most common technologies among matching candidates as (tech, count)"""
+        self.refresh()
+        with self._lock:
+            mask = self._mask(**filters)
+            counts = [
+                (self._tech_names[term], int(np.count_nonzero(mask[np.frombuffer(posting, dtype=np.int32)])))
+                for (field, term), posting in self._postings.items() if field == 'tech'
+            ]
+        counts.sort(key=lambda item: (-item[1], item[0]))
+        return [item for item in counts[:limit] if item[1]]
+
+    def weekly_counts(self, tech=None, **filters):
+        """Matching candidates per technology per week as (week start, tech, count), oldest week first
+
+        Counts every technology unless tech names one or a list; the other filters are search_ids()'s.
+        """
+        self.refresh()
+        results = []
+        with self._lock:
+            mask = self._mask(**filters) & ~np.isnan(self._created)
+            weeks = np.floor_divide(self._created, WEEK_SECONDS, where=mask, out=np.zeros_like(self._created))
+            weeks = weeks.astype(np.int64)
+            if tech:
+                terms = [canonicalize_tech(name).lower() for name in _as_list(tech)]
+            else:
+                terms = [term for field, term in self._postings if field == 'tech']
+            for term in terms:
+                posting = self._postings.get(('tech', term))
+                if not posting:
+                    continue
+                ids = np.frombuffer(posting, dtype=np.int32)
+                ids = ids[mask[ids]]
+                if not len(ids):
+                    continue
+                found, counts = np.unique(weeks[ids], return_counts=True)
+                name = self._tech_names[term]
+                results += [(int(week), name, int(count)) for week, count in zip(found, counts)]
+        results.sort(key=lambda item: (item[0], -item[2], item[1]))
+        return [(week_start(week), name, count) for week, name, count in results]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_candidate_index():
+    """Return the process-wide index over the default candidate store"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = CandidateIndex(get_candidate_store())
+        return _index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search TalentScout candidates and report candidates per technology per week")
+    parser.add_argument('--tech', action='append', help="only candidates with this technology (repeatable, all required)")
+    parser.add_argument('--position', help="only candidates whose desired position contains these words")
+    parser.add_argument('--location', help="only candidates whose location contains these words")
+    parser.add_argument('--min-years', type=float, help="at least this many years of experience")
+    parser.add_argument('--max-years', type=float, help="at most this many years of experience")
+    parser.add_argument('--since', help="only records on or after this ISO date")
+    parser.add_argument('--until', help="only records before this ISO date")
+    parser.add_argument('--weekly', action='store_true', help="print candidates per technology per week instead")
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('--offset', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help="print JSON lines")
+    args = parser.parse_args()
+
+    index = get_candidate_index()
+    filters = {
+        'position': args.position, 'location': args.location, 'min_years': args.min_years,
+        'max_years': args.max_years, 'since': args.since, 'until': args.until,
+    }
+    if args.weekly:
+        for week, tech, count in index.weekly_counts(tech=args.tech, **filters):
+            print(json.dumps({'week': week, 'tech': tech, 'candidates': count}) if args.json else f"{week}  {count:>6}  {tech}")
+        return 0
+
+    results = index.search(limit=args.limit, offset=args.offset, tech=args.tech, **filters)
+    for c in results:
+        if args.json:
+            print(json.dumps(c))
+        else:
+            years = '' if c['years_experience'] is None else f"{c['years_experience']:g}y"
+            print(f"{c['created_at'][:16]}  {c['full_name']} <{c['email']}>  {years}  "
+                  f"{c['desired_position']}  |  {c['current_location']}  |  {', '.join(c['tech_stack'])}")
+    print(f"{index.count(tech=args.tech, **filters)} matching candidate(s), showing {len(results)}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
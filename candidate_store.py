@@ -0,0 +1,354 @@
+import os
+import json
+import time
+import queue
+import atexit
+import sqlite3
+import logging
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+from metrics import STORE_WRITE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT UNIQUE,
+    full_name TEXT,
+    email TEXT,
+    phone TEXT,
+    years_experience REAL,
+    desired_position TEXT,
+    current_location TEXT,
+    created_at TEXT NOT NULL,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_candidates_email ON candidates (email COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_candidates_position ON candidates (desired_position COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_candidates_created ON candidates (created_at);
+CREATE TABLE IF NOT EXISTS candidate_tech (
+    tech TEXT NOT NULL COLLATE NOCASE,
+    candidate_id INTEGER NOT NULL REFERENCES candidates (id) ON DELETE CASCADE,
+    PRIMARY KEY (tech, candidate_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_candidate_tech_candidate ON candidate_tech (candidate_id);
+CREATE TABLE IF NOT EXISTS candidate_changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    candidate_id INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS seen_questions (
+    email TEXT NOT NULL COLLATE NOCASE,
+    question TEXT NOT NULL,
+    tech TEXT NOT NULL,
+    seen_at TEXT NOT NULL,
+    PRIMARY KEY (email, question)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS answer_scores (
+    session_id TEXT NOT NULL,
+    answer_index INTEGER NOT NULL,
+    score REAL NOT NULL,
+    method TEXT NOT NULL,
+    feedback TEXT,
+    graded_at TEXT NOT NULL,
+    PRIMARY KEY (session_id, answer_index)
+) WITHOUT ROWID;
+"""
+
+# SQLite's default limit on bound parameters is 999
+_IN_CHUNK = 500
+
+TECH_SEPARATOR = '\x1f'
+
+# Attempts at a write that failed with its batch, e.g. on "database is locked"
+STORE_WRITE_ATTEMPTS = int(os.getenv("STORE_WRITE_ATTEMPTS", "4"))
+
+STORE_RETRY_SECONDS = float(os.getenv("STORE_RETRY_SECONDS", "0.5"))
+
+def _years(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def export_filename(record):
+    """The legacy candidate_<name>_<timestamp>.json file name for a record"""
+    name = record['candidate_info'].get('full_name', '').replace(' ', '_').lower()
+    stamp = record.get('timestamp', '')[:19].replace('-', '').replace(':', '').replace('T', '_')
+    return f"candidate_{name}_{stamp}.json"
+
+def export_json(record, directory='.'):
+    """Write a record in the legacy per-candidate JSON format and return its path"""
+    path = os.path.join(directory, export_filename(record))
+    with open(path, 'w') as f:
+        json.dump(record, f, indent=2)
+    return path
+
+
+class CandidateStore:
+    """SQLite (WAL) store for candidate records, written by a single background thread"""
+
+    def __init__(self, path, batch_size=64):
+        self.path = path
+        self.batch_size = batch_size
+        self.last_error = None
+        self._queue = queue.Queue()
+        self._local = threading.local()
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.commit()
+        self._writer = threading.Thread(target=self._write_loop, name="candidate-store-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.flush)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _reader(self):
+        """A connection for the calling thread, used for reads only"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _enqueue(self, write, key, payload):
+        done = Future()
+        self._queue.put((write, key, payload, done))
+        return done
+
+    def save(self, record, session_id=None):
+        """Queue a candidate record for writing; returns a Future resolved with its id once committed"""
+        return self._enqueue(self._write, session_id, record)
+
+    def save_scores(self, session_id, scores):
+        """Queue grades for a session's answers; they may arrive before or after its record"""
+        return self._enqueue(self._write_scores, session_id, scores)
+
+    def save_seen_questions(self, email, questions):
+        """Queue the questions served to a candidate, so later interviews for the same email avoid them"""
+        return self._enqueue(self._write_seen, email, questions)
+
+    def flush(self):
+        """Block until every queued record has been written"""
+        self._queue.join()
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                try:
+                    with STORE_WRITE_SECONDS.time(), conn:
+                        results = [write(conn, key, payload) for write, key, payload, _ in batch]
+                except Exception:
+                    # One bad write must not take the rest of the batch down with it
+                    logger.warning("Failed to write a batch of %d candidate update(s); writing them one by one",
+                                   len(batch), exc_info=True)
+                    for item in batch:
+                        self._write_one(conn, *item)
+                else:
+                    for (_, _, _, done), result in zip(batch, results):
+                        done.set_result(result)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_one(self, conn, write, key, payload, done):
+        """Write one update in its own transaction, retrying while the database is locked"""
+        for attempt in range(max(1, STORE_WRITE_ATTEMPTS)):
+            if attempt:
+                time.sleep(STORE_RETRY_SECONDS * 2 ** (attempt - 1))
+            try:
+                with conn:
+                    result = write(conn, key, payload)
+            except sqlite3.OperationalError as e:
+                error = e
+                continue
+            except Exception as e:
+                error = e
+                break
+            done.set_result(result)
+            return
+        self.last_error = error
+        logger.error("Failed to write a candidate update for %s", key, exc_info=error)
+        done.set_exception(error)
+
+    def _write(self, conn, session_id, record):
+        info = record.get('candidate_info', {})
+        values = (
+            info.get('full_name'), info.get('email'), info.get('phone'),
+            _years(info.get('years_experience')), info.get('desired_position'),
+            info.get('current_location'), record.get('timestamp'), json.dumps(record)
+        )
+        row = None
+        if session_id:
+            row = conn.execute("SELECT id FROM candidates WHERE session_id = ?", (session_id,)).fetchone()
+        if row:
+            candidate_id = row[0]
+            conn.execute(
+                """UPDATE candidates SET full_name = ?, email = ?, phone = ?, years_experience = ?,
+                   desired_position = ?, current_location = ?, created_at = ?, record = ? WHERE id = ?""",
+                values + (candidate_id,)
+            )
+            conn.execute("DELETE FROM candidate_tech WHERE candidate_id = ?", (candidate_id,))
+        else:
+            candidate_id = conn.execute(
+                """INSERT INTO candidates (session_id, full_name, email, phone, years_experience,
+                   desired_position, current_location, created_at, record) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (session_id,) + values
+            ).lastrowid
+        conn.executemany(
+            "INSERT OR IGNORE INTO candidate_tech (tech, candidate_id) VALUES (?, ?)",
+            [(tech, candidate_id) for tech in info.get('tech_stack', [])]
+        )
+        # Lets search indexes in any process catch up with this write
+        conn.execute("INSERT INTO candidate_changes (candidate_id) VALUES (?)", (candidate_id,))
+        return candidate_id
+
+    def _write_scores(self, conn, session_id, scores):
+        conn.executemany(
+            """INSERT OR REPLACE INTO answer_scores (session_id, answer_index, score, method, feedback, graded_at)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            [(session_id, s['index'], s['score'], s['method'], s.get('feedback'), s['graded_at']) for s in scores]
+        )
+
+    def _write_seen(self, conn, email, questions):
+        seen_at = datetime.now().isoformat()
+        conn.executemany(
+            "INSERT OR REPLACE INTO seen_questions (email, question, tech, seen_at) VALUES (?, ?, ?, ?)",
+            [(email.strip(), q['question'], q['technology'], seen_at) for q in questions]
+        )
+
+    def seen_questions(self, email):
+        """Questions already served to this email, as {'question', 'technology'} dicts"""
+        rows = self._reader().execute(
+            "SELECT question, tech FROM seen_questions WHERE email = ? ORDER BY seen_at", (email.strip(),)
+        )
+        return [{'question': row['question'], 'technology': row['tech']} for row in rows]
+
+    def _scores_for(self, session_ids):
+        """Map each session id to its stored answer scores, in answer order"""
+        scores = {}
+        for i in range(0, len(session_ids), _IN_CHUNK):
+            chunk = session_ids[i:i + _IN_CHUNK]
+            rows = self._reader().execute(
+                f"""SELECT session_id, answer_index, score, method, feedback, graded_at FROM answer_scores
+                    WHERE session_id IN ({','.join('?' * len(chunk))}) ORDER BY session_id, answer_index""",
+                chunk
+            )
+            for row in rows:
+                scores.setdefault(row['session_id'], []).append({
+                    'index': row['answer_index'], 'score': row['score'], 'method': row['method'],
+                    'feedback': row['feedback'], 'graded_at': row['graded_at']
+                })
+        return scores
+
+    def _records(self, rows):
+        """Decode record rows, attaching any answer scores stored for them"""
+        scores = self._scores_for([row['session_id'] for row in rows if row['session_id']])
+        records = []
+        for row in rows:
+            record = json.loads(row['record'])
+            if row['session_id'] in scores:
+                record['answer_scores'] = scores[row['session_id']]
+            records.append(record)
+        return records
+
+    def get(self, candidate_id):
+        """Return a stored record by id, or None"""
+        rows = self._reader().execute(
+            "SELECT session_id, record FROM candidates WHERE id = ?", (candidate_id,)
+        ).fetchall()
+        return self._records(rows)[0] if rows else None
+
+    def summaries(self, candidate_ids):
+        """Search result rows (no transcript) for candidate ids, in the order given"""
+        by_id = {}
+        for i in range(0, len(candidate_ids), _IN_CHUNK):
+            chunk = candidate_ids[i:i + _IN_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self._reader().execute(
+                f"""SELECT id, session_id, full_name, email, years_experience, desired_position, current_location,
+                           created_at FROM candidates WHERE id IN ({placeholders})""",
+                chunk
+            )
+            for row in rows:
+                by_id[row['id']] = dict(row, tech_stack=[])
+            rows = self._reader().execute(
+                f"SELECT candidate_id, tech FROM candidate_tech WHERE candidate_id IN ({placeholders})", chunk
+            )
+            for candidate_id, tech in rows:
+                by_id[candidate_id]['tech_stack'].append(tech)
+        return [by_id[candidate_id] for candidate_id in candidate_ids if candidate_id in by_id]
+
+    def index_rows(self, after_seq=None):
+        """Searchable fields of every candidate, or only of those written since change after_seq
+
+        Returns the latest change seq and (id, years_experience, desired_position,
+        current_location, created_at, techs) rows, techs joined by TECH_SEPARATOR.
+        """
+        conn = self._reader()
+        seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM candidate_changes").fetchone()[0]
+        where, params = "", []
+        if after_seq is not None:
+            where, params = "WHERE c.id IN (SELECT candidate_id FROM candidate_changes WHERE seq > ?)", [after_seq]
+        rows = conn.execute(
+            f"""SELECT c.id, c.years_experience, c.desired_position, c.current_location, c.created_at,
+                       (SELECT group_concat(tech, ?) FROM candidate_tech WHERE candidate_id = c.id)
+                FROM candidates c {where} ORDER BY c.id""",
+            [TECH_SEPARATOR] + params
+        ).fetchall()
+        return seq, rows
+
+    def scores(self, session_id):
+        """Return the grades stored so far for a session's answers"""
+        return self._scores_for([session_id]).get(session_id, [])
+
+    def find(self, email=None, tech=None, position=None, since=None, until=None, limit=100):
+        """Return records matching every given filter, newest first"""
+        clauses = []
+        params = []
+        if email:
+            clauses.append("c.email = ? COLLATE NOCASE")
+            params.append(email)
+        if tech:
+            clauses.append("c.id IN (SELECT candidate_id FROM candidate_tech WHERE tech = ?)")
+            params.append(tech)
+        if position:
+            clauses.append("c.desired_position = ? COLLATE NOCASE")
+            params.append(position)
+        if since:
+            clauses.append("c.created_at >= ?")
+            params.append(since)
+        if until:
+            clauses.append("c.created_at < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._reader().execute(
+            f"SELECT c.session_id, c.record FROM candidates c {where} ORDER BY c.created_at DESC LIMIT ?",
+            params + [limit]
+        ).fetchall()
+        return self._records(rows)
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+def get_candidate_store():
+    """Return the process-wide candidate store configured from the environment"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = CandidateStore(os.getenv("CANDIDATE_DB_PATH", "candidates.db"))
+        return _default_store
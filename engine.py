@@ -0,0 +1,418 @@
+"""Streamlit-free conversation engine for the TalentScout screening flow.
+
+The engine is table-driven: every state maps to a handler that takes a Session and
+the candidate's input, mutates the session and returns the bot's replies. The
+Streamlit UI, the API server and the benchmarks all drive the same engine.
+"""
+import re
+import sys
+import time
+import uuid
+import threading
+from datetime import datetime
+from collections import namedtuple
+from metrics import STATE_DWELL_SECONDS, STEP_SECONDS, TIME_TO_FIRST_QUESTION_SECONDS
+from question_generator import QuestionStream, start_question_generation
+from tech_canon import parse_tech_stack
+
+STATES = ['GREETING', 'COLLECT_NAME', 'COLLECT_EMAIL', 'COLLECT_PHONE',
+          'COLLECT_EXPERIENCE', 'COLLECT_POSITION', 'COLLECT_LOCATION',
+          'COLLECT_TECH_STACK', 'GENERATE_QUESTIONS', 'END']
+
+EXIT_KEYWORDS = ['exit', 'quit', 'bye', 'goodbye', 'stop', 'end']
+
+EMAIL_REGEX = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+
+PHONE_REGEX = r'^[\d\s\-\+\(\)]+$'
+
+EMAIL_PATTERN = re.compile(EMAIL_REGEX)
+
+PHONE_PATTERN = re.compile(PHONE_REGEX)
+
+NON_DIGIT_PATTERN = re.compile(r'\D')
+
+PROMPTS = {
+    'GREETING': """👋 Welcome to **TalentScout** - Your AI Hiring Assistant!
+
+I'm here to help you through the initial screening process for technical positions. 
+
+**What I'll do:**
+- Collect your basic information
+- Ask about your technical skills
+- Ask technical questions on all your tech stack
+
+**To exit anytime, type:** exit, quit, or bye
+
+Let's get started! 
+
+**Please enter your Full Name:**""",
+
+    'COLLECT_NAME': "Please enter your **Full Name**:",
+
+    'COLLECT_EMAIL': "Please enter your **Email Address**:",
+
+    'COLLECT_PHONE': "Please enter your **Phone Number** (with country code if applicable):",
+
+    'COLLECT_EXPERIENCE': "How many **Years of Experience** do you have in the tech industry?",
+
+    'COLLECT_POSITION': "What is your **Desired Position** or job title you're applying for?",
+
+    'COLLECT_LOCATION': "What is your **Current Location** (City, Country)?",
+
+    'COLLECT_TECH_STACK': """Please enter your **Tech Stack** (comma-separated list of technologies).
+
+**Examples:**
+- Python, Django, PostgreSQL, Docker
+- React, Node.js, MongoDB, AWS
+- Java, Spring Boot, MySQL, Kubernetes
+
+**Your Tech Stack:**""",
+
+    'GENERATE_QUESTIONS': "Here are your technical questions...",
+
+    'END': "Thank you for your time! Our recruitment team will review your profile and contact you shortly."
+}
+
+def check_exit_keywords(user_input):
+    """Check if user wants to exit"""
+    return user_input.lower().strip() in EXIT_KEYWORDS
+
+def validate_email(email):
+    """Validate email format"""
+    return EMAIL_PATTERN.match(email) is not None
+
+def validate_phone(phone):
+    """Validate phone number"""
+    return PHONE_PATTERN.match(phone) is not None and len(NON_DIGIT_PATTERN.sub('', phone)) >= 10
+
+def get_prompt(state):
+    """Get the prompt for a conversation state"""
+    return PROMPTS.get(state, "How can I help you today?")
+
+
+def now_seconds():
+    """Integer monotonic clock used for session bookkeeping"""
+    return int(time.monotonic())
+
+def format_timestamp(timestamp):
+    """Format a message timestamp (epoch seconds) the way stored transcripts show it"""
+    if isinstance(timestamp, str):
+        return timestamp
+    return datetime.fromtimestamp(timestamp).strftime("%H:%M:%S")
+
+
+ChatMessage = namedtuple('ChatMessage', ['role', 'message', 'timestamp'])
+ChatMessage.__doc__ = """One chat message; timestamp is integer epoch seconds"""
+
+def message_dict(message):
+    """A chat message in the stored record format"""
+    return {'role': message.role, 'message': message.message, 'timestamp': format_timestamp(message.timestamp)}
+
+
+class Session:
+    """State of one screening conversation
+
+    Slotted, so an idle session costs a few hundred bytes once release() has
+    dropped its questions, answers and chat window.
+    """
+
+    __slots__ = ('session_id', 'state', 'candidate_info', 'question_stream', 'current_question_num',
+                 'user_answers', 'ended', 'state_entered', 'last_active', 'history', 'history_offset',
+                 'has_bot_message', 'record_saved', 'evicted', 'checkpointed', 'lock')
+
+    def __init__(self, session_id=None):
+        self.session_id = session_id or uuid.uuid4().hex
+        self.state = 'GREETING'
+        self.candidate_info = {
+            'full_name': '',
+            'email': '',
+            'phone': '',
+            'years_experience': '',
+            'desired_position': '',
+            'current_location': '',
+            'tech_stack': []
+        }
+        self.question_stream = None
+        self.current_question_num = 0
+        self.user_answers = []
+        self.ended = False
+        self.state_entered = self.last_active = now_seconds()
+        # The most recent chat messages; older ones are paged out to storage
+        self.history = []
+        self.history_offset = 0
+        self.has_bot_message = False
+        self.record_saved = False
+        self.evicted = False
+        # Messages already written to the session backend
+        self.checkpointed = 0
+        # Held while the session is stepped, touched or evicted, so it is never released mid-step
+        self.lock = threading.RLock()
+
+    @property
+    def questions(self):
+        return self.question_stream.questions if self.question_stream else []
+
+    @property
+    def current_question(self):
+        if self.current_question_num < len(self.questions):
+            return self.questions[self.current_question_num]
+        return None
+
+    def total_questions(self):
+        """Number of questions the candidate will be asked"""
+        return self.question_stream.total() if self.question_stream else 0
+
+    def touch(self):
+        """Mark the session as active now; False if it was already evicted and has to be resumed from storage"""
+        with self.lock:
+            if self.evicted:
+                return False
+            self.last_active = now_seconds()
+            return True
+
+    def to_dict(self):
+        """Checkpoint of everything needed to resume the conversation elsewhere (chat messages excepted)"""
+        stream = self.question_stream
+        return {
+            'session_id': self.session_id,
+            'state': self.state,
+            'candidate_info': self.candidate_info,
+            'questions': list(stream.questions) if stream else [],
+            'questions_done': stream.done if stream else False,
+            'current_question_num': self.current_question_num,
+            'user_answers': self.user_answers,
+            'ended': self.ended,
+            'has_bot_message': self.has_bot_message,
+        }
+
+    @classmethod
+    def from_dict(cls, data, question_source=start_question_generation):
+        """Resume a session from a checkpoint, regenerating questions if generation hadn't finished"""
+        session = cls(data['session_id'])
+        session.state = sys.intern(data['state'])
+        session.candidate_info = data['candidate_info']
+        session.candidate_info['tech_stack'] = [sys.intern(tech) for tech in session.candidate_info['tech_stack']]
+        session.current_question_num = data['current_question_num']
+        session.user_answers = data['user_answers']
+        session.ended = data['ended']
+        session.has_bot_message = data['has_bot_message']
+        if data['questions_done']:
+            session.question_stream = QuestionStream.completed(data['questions'])
+        elif session.state == 'GENERATE_QUESTIONS':
+            info = session.candidate_info
+            session.question_stream = question_source(info['tech_stack'], info.get('years_experience', ''),
+                                                      email=info.get('email') or None)
+        return session
+
+    def release(self):
+        """Drop everything but the id once the session has been flushed to storage"""
+        self.candidate_info = {}
+        self.question_stream = None
+        self.user_answers = []
+        self.history = []
+        self.evicted = True
+
+
+StepResult = namedtuple('StepResult', ['state', 'messages', 'answer', 'completed', 'error'])
+StepResult.__doc__ = """Outcome of one engine step: the new state, bot replies, the answer recorded
+(if any), whether the interview completed and should be saved, and any generation error"""
+
+def _check_name(value):
+    return None if len(value) >= 2 else "Please enter a valid name (at least 2 characters)."
+
+def _check_email(value):
+    return None if validate_email(value) else "Please enter a valid email address (e.g., name@example.com)."
+
+def _check_phone(value):
+    return None if validate_phone(value) else "Please enter a valid phone number with at least 10 digits."
+
+def check_experience(value):
+    """Return an error message if value isn't a valid number of years, else None"""
+    try:
+        exp = float(value)
+    except ValueError:
+        return "Please enter a valid number (e.g., 3, 5.5, etc.)."
+    if exp < 0 or exp > 50:
+        return "Please enter a valid number of years (0-50)."
+    return None
+
+def _check_position(value):
+    return None if len(value) >= 2 else "Please enter a valid position title."
+
+def _check_location(value):
+    return None if len(value) >= 2 else "Please enter a valid location."
+
+# state: (candidate_info field, validator, next state, reply template)
+FIELD_STEPS = {
+    'GREETING': ('full_name', _check_name, 'COLLECT_EMAIL', "Nice to meet you, {value}! {prompt}"),
+    'COLLECT_NAME': ('full_name', _check_name, 'COLLECT_EMAIL', "Nice to meet you, {value}! {prompt}"),
+    'COLLECT_EMAIL': ('email', _check_email, 'COLLECT_PHONE', "{prompt}"),
+    'COLLECT_PHONE': ('phone', _check_phone, 'COLLECT_EXPERIENCE', "{prompt}"),
+    'COLLECT_EXPERIENCE': ('years_experience', check_experience, 'COLLECT_POSITION', "{prompt}"),
+    'COLLECT_POSITION': ('desired_position', _check_position, 'COLLECT_LOCATION', "{prompt}"),
+    'COLLECT_LOCATION': ('current_location', _check_location, 'COLLECT_TECH_STACK', "{prompt}"),
+}
+
+# candidate_info field -> the validator the chat applies to it, in the order they are asked
+FIELD_CHECKS = {field: check for field, check, _, _ in FIELD_STEPS.values()}
+
+def check_candidate(info):
+    """Errors in a complete set of candidate details as {field: message}, checked as the chat checks them
+
+    Returns the parsed tech stack too, so callers don't parse it twice.
+    """
+    errors = {}
+    for field, check in FIELD_CHECKS.items():
+        error = check(str(info.get(field) or '').strip())
+        if error:
+            errors[field] = error
+    tech_stack, _ = parse_tech_stack(str(info.get('tech_stack') or ''))
+    if not tech_stack:
+        errors['tech_stack'] = "Please enter at least one technology."
+    return errors, tech_stack
+
+
+def question_message(session):
+    """Format the current question for the chat"""
+    q = session.current_question
+    return f"**Question {session.current_question_num + 1} of {session.total_questions()}** (Technology: {q['technology']}):\n\n{q['question']}"
+
+def invitation_messages(session):
+    """Opening chat for a pre-registered candidate, who starts at their first question"""
+    name = session.candidate_info.get('full_name', 'there')
+    welcome = (f"👋 Welcome to **TalentScout**, {name}! Your details are already on file, so we'll go straight to "
+               f"your technical questions.\n\nI'll ask you {session.total_questions()} questions on "
+               f"{', '.join(session.candidate_info['tech_stack'])}. Please answer each question.\n\n"
+               f"**To exit anytime, type:** exit, quit, or bye")
+    return [welcome, question_message(session)] if session.current_question else [welcome]
+
+def completion_message(session):
+    """Farewell shown when the interview is complete"""
+    name = session.candidate_info.get('full_name', 'there')
+    email = session.candidate_info.get('email', 'your email')
+    return f"🎉 Thank you for your time, {name}! \n\nWe have recorded your answers. We will let you know the result through your mail at {email}.\n\n🍀 Good luck with your application!"
+
+def candidate_record(session, conversation_history):
+    """Build the stored record for a session"""
+    return {
+        'candidate_info': session.candidate_info,
+        'conversation_history': conversation_history,
+        'generated_questions': {},
+        'user_answers': session.user_answers,
+        'timestamp': datetime.now().isoformat()
+    }
+
+
+class ConversationEngine:
+    """Table-driven state machine for the screening conversation"""
+
+    def __init__(self, question_source=start_question_generation):
+        self.question_source = question_source
+        self.handlers = {state: self._collect_field for state in FIELD_STEPS}
+        self.handlers['COLLECT_TECH_STACK'] = self._collect_tech_stack
+        self.handlers['GENERATE_QUESTIONS'] = self._answer_question
+
+    def invite(self, candidate_info, tech_stack, session_id=None):
+        """A session for a candidate whose details were collected elsewhere, at GENERATE_QUESTIONS
+
+        Its questions start generating now; the candidate's first input answers the first one.
+        """
+        session = Session(session_id)
+        session.candidate_info.update(candidate_info)
+        session.candidate_info['tech_stack'] = [sys.intern(tech) for tech in tech_stack]
+        info = session.candidate_info
+        session.question_stream = self.question_source(info['tech_stack'], info.get('years_experience', ''),
+                                                       email=info.get('email') or None)
+        session.state = 'GENERATE_QUESTIONS'
+        return session
+
+    def step(self, session, user_input):
+        """Apply one candidate input to a session and return the result"""
+        with session.lock:
+            state = session.state
+            with STEP_SECONDS.time(state=state):
+                result = self._step(session, user_input.strip())
+            now = now_seconds()
+            session.last_active = now
+            if session.state != state:
+                STATE_DWELL_SECONDS.observe(now - session.state_entered, state=state)
+                session.state_entered = now
+        return result
+
+    def _step(self, session, user_input):
+        if check_exit_keywords(user_input):
+            session.state = 'END'
+            session.ended = True
+            name = session.candidate_info.get('full_name', 'there')
+            farewell = f"Thank you for your time, {name}. Our recruitment team will contact you shortly if needed. Goodbye! 👋"
+            return StepResult(session.state, [farewell], None, False, None)
+
+        handler = self.handlers.get(session.state)
+        if handler is None:
+            return StepResult(session.state, ["I'm here to assist with the hiring process. Could you please provide the requested details?"], None, False, None)
+        return handler(session, user_input)
+
+    def _collect_field(self, session, user_input):
+        field, check, next_state, template = FIELD_STEPS[session.state]
+        error = check(user_input)
+        if error:
+            return StepResult(session.state, [error], None, False, None)
+        session.candidate_info[field] = user_input
+        session.state = next_state
+        return StepResult(session.state, [template.format(value=user_input, prompt=get_prompt(next_state))], None, False, None)
+
+    def _collect_tech_stack(self, session, user_input):
+        tech_stack, skipped = parse_tech_stack(user_input)
+        if len(tech_stack) == 0:
+            return StepResult(session.state, ["Please enter at least one technology."], None, False, None)
+
+        # Interned so every session naming a technology shares one string
+        tech_stack = [sys.intern(tech) for tech in tech_stack]
+        session.candidate_info['tech_stack'] = tech_stack
+
+        # Generate questions for ALL technologies; they stream in while the candidate answers
+        info = session.candidate_info
+        stream = self.question_source(tech_stack, info.get('years_experience', ''), email=info.get('email') or None)
+        session.question_stream = stream
+        session.current_question_num = 0
+        session.user_answers = []
+
+        # Only the first question is needed before we can reply
+        with TIME_TO_FIRST_QUESTION_SECONDS.time():
+            stream.wait_for(1)
+
+        session.state = 'GENERATE_QUESTIONS'
+        tech_msg = f"Great! I've recorded your tech stack: {', '.join(tech_stack)}\n\nI'll ask you {stream.total()} questions (3 for each technology). Please answer each question."
+        if skipped:
+            tech_msg += f"\n\n(We focus on your first {len(tech_stack)} technologies, so {', '.join(skipped)} won't be covered.)"
+        messages = [tech_msg]
+        if session.current_question:
+            messages.append(question_message(session))
+        return StepResult(session.state, messages, None, False, stream.error)
+
+    def _answer_question(self, session, user_input):
+        # Check if user typed "done"
+        if user_input.lower().strip() == 'done':
+            return self._complete(session, None)
+
+        q = session.current_question or {}
+        answer = {
+            'question': q.get('question', ''),
+            'answer': user_input,
+            'technology': q.get('technology', '')
+        }
+        session.user_answers.append(answer)
+        session.current_question_num += 1
+
+        # Wait for the next question if it is still being generated
+        session.question_stream.wait_for(session.current_question_num + 1)
+
+        # Check if we've asked all questions
+        if session.current_question_num >= session.total_questions():
+            return self._complete(session, answer)
+        return StepResult(session.state, [question_message(session)], answer, False, None)
+
+    def _complete(self, session, answer):
+        session.state = 'END'
+        session.ended = True
+        return StepResult(session.state, [completion_message(session)], answer, True, None)
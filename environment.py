@@ -0,0 +1,11 @@
+"""Load .env into the process environment.
+
+Modules read their settings from the environment when they are imported, so every
+entry point (app.py, api_server.py, bulk_import.py, build_question_bank.py)
+imports this module before any other project module:
+
+    import environment  # noqa: F401
+"""
+from dotenv import load_dotenv
+
+load_dotenv()
@@ -0,0 +1,34 @@
+"""Export stored candidate records as the legacy candidate_*.json files.
+
+Usage:
+    python export_candidates.py --tech Python --since 2024-01-01 --output-dir exports
+"""
+import os
+import sys
+import argparse
+from candidate_store import get_candidate_store, export_json
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export TalentScout candidate records to JSON files")
+    parser.add_argument('--email', help="only candidates with this email")
+    parser.add_argument('--tech', help="only candidates with this technology in their stack")
+    parser.add_argument('--position', help="only candidates applying for this position")
+    parser.add_argument('--since', help="only records on or after this ISO date")
+    parser.add_argument('--until', help="only records before this ISO date")
+    parser.add_argument('--limit', type=int, default=1000)
+    parser.add_argument('--output-dir', default='.')
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    records = get_candidate_store().find(
+        email=args.email, tech=args.tech, position=args.position,
+        since=args.since, until=args.until, limit=args.limit
+    )
+    for record in records:
+        print(export_json(record, args.output_dir))
+    print(f"Exported {len(records)} candidate record(s)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""Background grading of candidate answers.
+
+submit() only enqueues, so the candidate never waits on grading. A small pool of
+workers drains the queue in micro-batches, grading several answers per OpenAI
+call at background priority, and falls back to a keyword/rubric heuristic when
+the LLM is off, failing or behind an open circuit breaker. Scores are written
+to the candidate store and attached to the candidate's record.
+"""
+import os
+import re
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime
+from candidate_store import get_candidate_store
+from llm_client import chat_completion
+from llm_scheduler import BACKGROUND
+from metrics import ANSWERS_GRADED, GRADING_BATCH_SECONDS
+from question_generator import record_usage
+
+logger = logging.getLogger(__name__)
+
+GRADING_WORKERS = int(os.getenv("GRADING_WORKERS", "2"))
+
+GRADING_BATCH_SIZE = int(os.getenv("GRADING_BATCH_SIZE", "8"))
+
+# How long a worker holds a partial batch open for more answers
+GRADING_BATCH_WAIT_SECONDS = float(os.getenv("GRADING_BATCH_WAIT_SECONDS", "0.5"))
+
+GRADING_QUEUE_SIZE = int(os.getenv("GRADING_QUEUE_SIZE", "10000"))
+
+# With LLM grading off, every answer is scored by the heuristic
+GRADING_USE_LLM = os.getenv("GRADING_USE_LLM", "1") != "0"
+
+GRADING_SYSTEM_PROMPT = "You are a senior technical interviewer grading written answers fairly and concisely."
+
+STOPWORDS = frozenset("""
+    about after again also because been before being between both could does doing down during each
+    from further have having here into just more most other over same should some such than that their
+    them then there these they this those through under until very what when where which while whom
+    with would your you'd you're how why will using used work working handle handling approach
+""".split())
+
+# Signs of a reasoned, production-minded answer
+RUBRIC_TERMS = (
+    'because', 'trade-off', 'tradeoff', 'instead', 'however', 'for example', 'e.g.', 'first', 'then',
+    'monitor', 'metric', 'log', 'profil', 'benchmark', 'test', 'rollback', 'cache', 'index', 'latency',
+    'throughput', 'scal', 'secur', 'validat', 'retry', 'timeout', 'concurren', 'memory', 'bottleneck',
+)
+
+NON_ANSWERS = frozenset(["", "idk", "i don't know", "i dont know", "no idea", "skip", "pass", "n/a", "na"])
+
+WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.\-]*")
+
+
+def heuristic_score(question, answer, technology=''):
+    """Score an answer from 0 to 10 by length, question keyword coverage and rubric terms"""
+    text = answer.strip().lower()
+    if text in NON_ANSWERS:
+        return 0.0, "No substantive answer."
+    words = WORD_PATTERN.findall(text)
+    keywords = {w for w in WORD_PATTERN.findall(question.lower()) if len(w) > 3 and w not in STOPWORDS}
+    covered = keywords & set(words)
+    coverage = len(covered) / len(keywords) if keywords else 0.0
+    depth = min(1.0, len(words) / 80)
+    rubric = min(1.0, sum(term in text for term in RUBRIC_TERMS) / 4)
+    if technology and technology.lower() in text:
+        rubric = min(1.0, rubric + 0.25)
+    score = round(10 * (0.35 * depth + 0.35 * coverage + 0.3 * rubric), 1)
+    return score, f"Heuristic: {len(words)} words, {len(covered)}/{len(keywords)} question keywords covered."
+
+def build_grading_prompt(jobs):
+    """Build one grading prompt for a batch of answers"""
+    items = '\n\n'.join(
+        f"Answer {i} (Technology: {job.answer.get('technology', '')})\n"
+        f"Question: {job.answer.get('question', '')}\n"
+        f"Candidate answer: {job.answer.get('answer', '')}"
+        for i, job in enumerate(jobs, 1)
+    )
+    return f"""Grade each candidate answer below from 0 (wrong or empty) to 10 (excellent, production-ready).
+Judge technical correctness, depth, and whether the answer addresses the scenario asked.
+
+{items}
+
+Return the output as a JSON array with one entry per answer, in this exact format:
+[
+  {{
+    "id": 1,
+    "score": 7,
+    "feedback": "One sentence explaining the score"
+  }},
+  ...
+]"""
+
+def parse_grades(content):
+    """Parse the model's grades into {answer id: (score, feedback)}"""
+    match = re.search(r'\[.*\]', content or '', re.DOTALL)
+    if not match:
+        return {}
+    try:
+        grades = json.loads(match.group())
+    except json.JSONDecodeError:
+        return {}
+    parsed = {}
+    for grade in grades:
+        try:
+            parsed[int(grade['id'])] = (max(0.0, min(10.0, float(grade['score']))), str(grade.get('feedback', '')))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return parsed
+
+
+class GradingJob:
+    """One answer waiting to be graded"""
+
+    __slots__ = ('session_id', 'index', 'answer')
+
+    def __init__(self, session_id, index, answer):
+        self.session_id = session_id
+        self.index = index
+        self.answer = answer
+
+
+class AnswerGrader:
+    """Bounded worker pool grading answers off the request path"""
+
+    def __init__(self, store, workers=GRADING_WORKERS, batch_size=GRADING_BATCH_SIZE,
+                 batch_wait=GRADING_BATCH_WAIT_SECONDS, use_llm=GRADING_USE_LLM, max_queue=GRADING_QUEUE_SIZE):
+        self.store = store
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.use_llm = use_llm
+        self.last_error = None
+        self._queue = queue.Queue(max_queue)
+        self._workers = [
+            threading.Thread(target=self._work_loop, name=f"answer-grader-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+        atexit.register(self.flush)
+
+    def submit(self, session_id, index, answer):
+        """Queue answer number index of a session for grading; returns immediately"""
+        job = GradingJob(session_id, index, answer)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            # Shed load rather than block the candidate; the heuristic costs microseconds
+            self._save([job], [heuristic_score(answer.get('question', ''), answer.get('answer', ''),
+                                               answer.get('technology', '')) + ('heuristic',)])
+
+    def flush(self):
+        """Block until every queued answer has been graded and handed to the store"""
+        self._queue.join()
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _work_loop(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                with GRADING_BATCH_SECONDS.time():
+                    self._save(batch, self.grade(batch))
+            except Exception as e:
+                self.last_error = e
+                logger.exception("Failed to grade %d answer(s)", len(batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def grade(self, jobs):
+        """Return a (score, feedback, method) for each job, using the LLM where it answers"""
+        grades = {}
+        if self.use_llm:
+            try:
+                response = chat_completion(
+                    priority=BACKGROUND,
+                    model="gpt-4o-mini",
+                    messages=[
+                        {"role": "system", "content": GRADING_SYSTEM_PROMPT},
+                        {"role": "user", "content": build_grading_prompt(jobs)}
+                    ],
+                    temperature=0,
+                    max_tokens=80 * len(jobs)
+                )
+                record_usage(response.usage)
+                grades = parse_grades(response.choices[0].message.content)
+            except Exception as e:
+                logger.warning("LLM grading failed, using the heuristic: %s", e)
+
+        results = []
+        for i, job in enumerate(jobs, 1):
+            if i in grades:
+                results.append(grades[i] + ('llm',))
+            else:
+                answer = job.answer
+                results.append(heuristic_score(answer.get('question', ''), answer.get('answer', ''),
+                                               answer.get('technology', '')) + ('heuristic',))
+        return results
+
+    def _save(self, jobs, results):
+        graded_at = datetime.now().isoformat()
+        by_session = {}
+        for job, (score, feedback, method) in zip(jobs, results):
+            ANSWERS_GRADED.inc(method=method)
+            by_session.setdefault(job.session_id, []).append({
+                'index': job.index, 'score': score, 'method': method, 'feedback': feedback, 'graded_at': graded_at
+            })
+        for session_id, scores in by_session.items():
+            self.store.save_scores(session_id, scores)
+
+
+_grader = None
+_grader_lock = threading.Lock()
+
+def get_answer_grader():
+    """Return the process-wide answer grader, writing to the default candidate store"""
+    global _grader
+    with _grader_lock:
+        if _grader is None:
+            _grader = AnswerGrader(get_candidate_store())
+        return _grader
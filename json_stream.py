@@ -0,0 +1,64 @@
+import json
+
+
+class JsonArrayStreamParser:
+    """Incrementally parse a streamed JSON array, returning each top-level object as soon as it closes"""
+
+    def __init__(self):
+        self._buffer = ''
+        self._pos = 0
+        self._start = None
+        self._depth = 0
+        self._in_array = False
+        self._in_string = False
+        self._escape = False
+        self.finished = False
+
+    def feed(self, text):
+        """Consume the next chunk of model output and return any objects completed by it"""
+        objects = []
+        if self.finished or not text:
+            return objects
+        self._buffer += text
+        buf = self._buffer
+        i = self._pos
+        while i < len(buf):
+            ch = buf[i]
+            if not self._in_array:
+                if ch == '[':
+                    self._in_array = True
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == '{':
+                if self._depth == 0:
+                    self._start = i
+                self._depth += 1
+            elif ch == '}' and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        objects.append(json.loads(buf[self._start:i + 1]))
+                    except ValueError:
+                        pass
+                    self._start = None
+            elif ch == ']' and self._depth == 0:
+                self.finished = True
+                break
+            i += 1
+
+        # Drop everything that can no longer be part of an object
+        if self._start is None:
+            self._buffer = ''
+            self._pos = 0
+        else:
+            self._buffer = buf[self._start:]
+            self._pos = i - self._start
+            self._start = 0
+        return objects
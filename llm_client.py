@@ -0,0 +1,282 @@
+"""Managed OpenAI access: pooled clients, per-call deadlines, retries and a circuit breaker.
+
+Every OpenAI call in the app goes through chat_completion() (or its async twin), so
+a slow or failing API costs a candidate at most OPENAI_DEADLINE_SECONDS; a streamed
+response is cut off at the same deadline, checked as each chunk arrives. Once the
+API has failed CIRCUIT_FAILURE_THRESHOLD times in a row the breaker opens and calls
+fail immediately with CircuitOpenError until CIRCUIT_RESET_SECONDS have passed.
+
+The openai SDK (and httpx under it) is most of the app's import time, so it is
+imported on first use rather than with this module; warm_up() does that, and
+builds the client, off the request path.
+"""
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+from llm_scheduler import INTERACTIVE, QueueTimeout, estimate_tokens, get_scheduler
+from metrics import LLM_CIRCUIT_OPEN, LLM_RETRIES
+
+logger = logging.getLogger(__name__)
+
+# Per-attempt timeouts; a streamed response may take up to OPENAI_READ_TIMEOUT between chunks
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "3"))
+OPENAI_READ_TIMEOUT = float(os.getenv("OPENAI_READ_TIMEOUT", "20"))
+
+# Total time one call may take, retries and backoff included
+OPENAI_DEADLINE_SECONDS = float(os.getenv("OPENAI_DEADLINE_SECONDS", "30"))
+
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "3"))
+
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "32"))
+
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 8.0
+
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling OpenAI while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a single half-open probe"""
+
+    def __init__(self, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_seconds=CIRCUIT_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def is_open(self):
+        """True while calls should skip OpenAI entirely; a lock-free read for hot paths"""
+        opened_at = self._opened_at
+        return opened_at is not None and (self._probing or time.monotonic() - opened_at < self.reset_seconds)
+
+    def allow(self):
+        """Whether a call may proceed; after the reset period one probe call is let through"""
+        if self._opened_at is None:
+            return True
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or time.monotonic() - self._opened_at < self.reset_seconds:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        if self._failures or self._opened_at is not None:
+            with self._lock:
+                if self._opened_at is not None:
+                    logger.info("OpenAI circuit closed")
+                self._failures = 0
+                self._opened_at = None
+                self._probing = False
+            LLM_CIRCUIT_OPEN.set(0)
+
+    def cancel_probe(self):
+        """Give up a probe that never reached the API"""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning("OpenAI circuit opened after %d consecutive failures", self._failures)
+                self._opened_at = time.monotonic()
+                self._probing = False
+        if self._opened_at is not None:
+            LLM_CIRCUIT_OPEN.set(1)
+
+
+breaker = CircuitBreaker()
+
+_client = None
+_client_lock = threading.Lock()
+
+def _limits():
+    import httpx
+    return httpx.Limits(max_connections=OPENAI_MAX_CONNECTIONS,
+                        max_keepalive_connections=OPENAI_MAX_CONNECTIONS,
+                        keepalive_expiry=60)
+
+def _timeout():
+    import httpx
+    return httpx.Timeout(OPENAI_READ_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT)
+
+def get_client():
+    """Return the process-wide OpenAI client, sharing one keep-alive connection pool"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import httpx
+                from openai import OpenAI
+                _client = OpenAI(
+                    api_key=os.getenv("OPENAI_API_KEY"),
+                    base_url=os.getenv("OPENAI_BASE_URL"),
+                    # Retries are handled here so they share the call's deadline
+                    max_retries=0,
+                    timeout=_timeout(),
+                    http_client=httpx.Client(limits=_limits(), timeout=_timeout())
+                )
+    return _client
+
+def make_async_client():
+    """Create an AsyncOpenAI client with the same pool and timeout settings
+
+    Async connection pools are tied to an event loop, so each asyncio.run() needs its own.
+    """
+    import httpx
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        base_url=os.getenv("OPENAI_BASE_URL"),
+        max_retries=0,
+        timeout=_timeout(),
+        http_client=httpx.AsyncClient(limits=_limits(), timeout=_timeout())
+    )
+
+
+def warm_up():
+    """Import the SDK and build the shared client in a background thread, so no request waits for either"""
+    threading.Thread(target=get_client, name='openai-warm-up', daemon=True).start()
+
+
+def is_retryable(error):
+    """Rate limits, server errors, timeouts and dropped connections are worth retrying"""
+    from openai import APIConnectionError, APIStatusError, APITimeoutError
+    if isinstance(error, (APITimeoutError, APIConnectionError)):
+        return True
+    return isinstance(error, APIStatusError) and (error.status_code == 429 or error.status_code >= 500)
+
+def retry_delay(attempt, error=None):
+    """Full-jitter exponential backoff, honouring a short Retry-After from the server"""
+    response = getattr(error, 'response', None)
+    retry_after = response.headers.get('retry-after') if response is not None else None
+    try:
+        if retry_after is not None and float(retry_after) <= RETRY_MAX_DELAY:
+            return float(retry_after)
+    except ValueError:
+        pass
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+def _deadline_error():
+    import httpx
+    from openai import APITimeoutError
+    return APITimeoutError(request=httpx.Request('POST', 'chat/completions'))
+
+def _attempt_timeout(deadline):
+    import httpx
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise _deadline_error()
+    return httpx.Timeout(min(OPENAI_READ_TIMEOUT, remaining), connect=min(OPENAI_CONNECT_TIMEOUT, remaining))
+
+
+class DeadlineStream:
+    """Chunks of a streamed response, cut off at the call's deadline
+
+    Iterating raises APITimeoutError once a chunk arrives after the deadline,
+    closing the response; that and any other failure mid-stream count against
+    the breaker, as a failure to open the stream would.
+    """
+
+    def __init__(self, response, deadline):
+        self.response = response
+        self.deadline = deadline
+
+    def __iter__(self):
+        try:
+            for chunk in self.response:
+                if time.monotonic() >= self.deadline:
+                    raise _deadline_error()
+                yield chunk
+        except Exception:
+            breaker.record_failure()
+            self.close()
+            raise
+
+    def close(self):
+        self.response.close()
+
+def _next_delay(attempt, error, deadline):
+    """Seconds to wait before retrying, or None to give up"""
+    if not is_retryable(error) or attempt >= OPENAI_MAX_RETRIES:
+        return None
+    delay = retry_delay(attempt, error)
+    if time.monotonic() + delay >= deadline:
+        return None
+    LLM_RETRIES.inc()
+    return delay
+
+def _settle(error):
+    """Update the breaker for a call that gave up with error"""
+    from openai import APIStatusError
+    if isinstance(error, QueueTimeout):
+        # Our own queue was full; OpenAI was never asked
+        breaker.cancel_probe()
+    elif isinstance(error, APIStatusError) and not is_retryable(error):
+        # The API answered; a bad request says nothing about its health
+        breaker.record_success()
+    else:
+        breaker.record_failure()
+
+def chat_completion(deadline=None, priority=INTERACTIVE, **kwargs):
+    """Create a chat completion with retries, a deadline and the circuit breaker
+
+    Each attempt first waits its turn in the rate-limit scheduler at the given
+    priority. For streamed requests only opening the stream is retried; once
+    chunks are flowing the caller iterates a DeadlineStream, which stops at the
+    same deadline.
+    """
+    if not breaker.allow():
+        raise CircuitOpenError("OpenAI circuit breaker is open")
+    deadline = deadline or time.monotonic() + OPENAI_DEADLINE_SECONDS
+    estimated = estimate_tokens(kwargs.get('messages', []), kwargs.get('max_tokens'))
+    attempt = 0
+    while True:
+        try:
+            get_scheduler().acquire(estimated, priority, deadline)
+            response = get_client().chat.completions.create(timeout=_attempt_timeout(deadline), **kwargs)
+        except Exception as e:
+            delay = _next_delay(attempt, e, deadline)
+            if delay is None:
+                _settle(e)
+                raise
+            time.sleep(delay)
+            attempt += 1
+            continue
+        breaker.record_success()
+        return DeadlineStream(response, deadline) if kwargs.get('stream') else response
+
+async def chat_completion_async(async_client, deadline=None, priority=INTERACTIVE, **kwargs):
+    """Async twin of chat_completion() for an AsyncOpenAI client"""
+    if not breaker.allow():
+        raise CircuitOpenError("OpenAI circuit breaker is open")
+    deadline = deadline or time.monotonic() + OPENAI_DEADLINE_SECONDS
+    estimated = estimate_tokens(kwargs.get('messages', []), kwargs.get('max_tokens'))
+    attempt = 0
+    while True:
+        try:
+            await get_scheduler().acquire_async(estimated, priority, deadline)
+            response = await async_client.chat.completions.create(timeout=_attempt_timeout(deadline), **kwargs)
+        except Exception as e:
+            delay = _next_delay(attempt, e, deadline)
+            if delay is None:
+                _settle(e)
+                raise
+            await asyncio.sleep(delay)
+            attempt += 1
+            continue
+        breaker.record_success()
+        return response
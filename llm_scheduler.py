@@ -0,0 +1,179 @@
+"""Process-wide admission control for OpenAI calls.
+
+Every call reserves one request and its estimated tokens (prompt size plus
+max_tokens, the same way OpenAI counts them against TPM) from two token buckets
+sized from OPENAI_RPM_LIMIT and OPENAI_TPM_LIMIT. Calls that don't fit wait in a
+priority queue, so a candidate who is watching the screen goes ahead of
+background work such as bank builds and grading. Setting both limits to 0
+disables the scheduler.
+"""
+import os
+import time
+import heapq
+import asyncio
+import itertools
+import threading
+from metrics import LLM_QUEUE_DEPTH, LLM_QUEUE_WAIT_SECONDS
+
+OPENAI_RPM_LIMIT = int(os.getenv("OPENAI_RPM_LIMIT", "500"))
+OPENAI_TPM_LIMIT = int(os.getenv("OPENAI_TPM_LIMIT", "200000"))
+
+# How much of a minute's allowance may be spent in one burst
+OPENAI_BURST_SECONDS = float(os.getenv("OPENAI_BURST_SECONDS", "10"))
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', BACKGROUND: 'background'}
+
+
+class QueueTimeout(Exception):
+    """Raised when a call could not be admitted before its deadline"""
+
+
+class _Cancelled(Exception):
+    """Raised in the waiting thread of an acquire_async() whose caller was cancelled"""
+
+
+def estimate_tokens(messages, max_tokens=None):
+    """Tokens a request counts against TPM: about four characters per prompt token, plus max_tokens"""
+    prompt = sum(len(m.get('content') or '') for m in messages)
+    return prompt // 4 + len(messages) * 4 + (max_tokens or 0)
+
+
+class TokenBucket:
+    """Continuously refilling allowance of per_minute units, holding at most burst_seconds' worth"""
+
+    def __init__(self, per_minute, burst_seconds=OPENAI_BURST_SECONDS):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self, now):
+        self._refill(now)
+        return self.tokens
+
+    def wait_time(self, amount, now):
+        """Seconds until amount units are available (amounts above capacity wait for a full bucket)"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def take(self, amount, now):
+        self._refill(now)
+        self.tokens -= min(amount, self.capacity)
+
+
+class LLMScheduler:
+    """Priority queue in front of request and token buckets, shared by every session in the process"""
+
+    def __init__(self, rpm=OPENAI_RPM_LIMIT, tpm=OPENAI_TPM_LIMIT):
+        self.enabled = rpm > 0 or tpm > 0
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self._queue = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+
+    def _wait_time(self, estimated_tokens, now):
+        wait = 0.0
+        if self.requests:
+            wait = self.requests.wait_time(1, now)
+        if self.tokens:
+            wait = max(wait, self.tokens.wait_time(estimated_tokens, now))
+        return wait
+
+    def acquire(self, estimated_tokens, priority=INTERACTIVE, deadline=None, cancelled=None):
+        """Block until the call may be sent, raising QueueTimeout at the monotonic deadline
+
+        Setting the cancelled event (and notifying) withdraws the call from the queue.
+        """
+        if not self.enabled:
+            return
+        started = time.monotonic()
+        ticket = (priority, next(self._sequence), estimated_tokens)
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            LLM_QUEUE_DEPTH.set(len(self._queue))
+            # A new head may have arrived; let the current one re-check
+            self._cond.notify_all()
+            try:
+                while True:
+                    if cancelled is not None and cancelled.is_set():
+                        raise _Cancelled()
+                    now = time.monotonic()
+                    wait = None
+                    if self._queue[0] is ticket:
+                        wait = self._wait_time(estimated_tokens, now)
+                        if wait <= 0:
+                            heapq.heappop(self._queue)
+                            if self.requests:
+                                self.requests.take(1, now)
+                            if self.tokens:
+                                self.tokens.take(estimated_tokens, now)
+                            break
+                    if deadline is not None:
+                        if now >= deadline:
+                            raise QueueTimeout("Timed out waiting for OpenAI rate limit capacity")
+                        wait = deadline - now if wait is None else min(wait, deadline - now)
+                    self._cond.wait(wait)
+            except BaseException:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                raise
+            finally:
+                LLM_QUEUE_DEPTH.set(len(self._queue))
+                self._cond.notify_all()
+        LLM_QUEUE_WAIT_SECONDS.observe(time.monotonic() - started, priority=PRIORITY_NAMES.get(priority, priority))
+
+    async def acquire_async(self, estimated_tokens, priority=INTERACTIVE, deadline=None):
+        """acquire() for coroutines, waiting in a worker thread so the event loop keeps running"""
+        if not self.enabled:
+            return
+        cancelled = threading.Event()
+        try:
+            await asyncio.to_thread(self.acquire, estimated_tokens, priority, deadline, cancelled)
+        except asyncio.CancelledError:
+            # The thread can't be cancelled; have it give up its place so no capacity is spent on nobody
+            cancelled.set()
+            with self._cond:
+                self._cond.notify_all()
+            raise
+
+    def queue_depth(self):
+        """Number of calls waiting for capacity"""
+        return len(self._queue)
+
+    def estimated_wait(self, priority=INTERACTIVE, estimated_tokens=0):
+        """Seconds a new call at this priority would wait, given everything queued ahead of it"""
+        if not self.enabled:
+            return 0.0
+        with self._cond:
+            ahead = [ticket for ticket in self._queue if ticket[0] <= priority]
+            now = time.monotonic()
+            wait = 0.0
+            if self.requests:
+                shortfall = len(ahead) + 1 - self.requests.available(now)
+                wait = max(wait, shortfall / self.requests.rate)
+            if self.tokens:
+                shortfall = sum(ticket[2] for ticket in ahead) + estimated_tokens - self.tokens.available(now)
+                wait = max(wait, shortfall / self.tokens.rate)
+        return wait
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler():
+    """Return the process-wide scheduler, configured by OPENAI_RPM_LIMIT and OPENAI_TPM_LIMIT"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = LLMScheduler()
+    return _scheduler
@@ -0,0 +1,287 @@
+"""Low-overhead in-process metrics with Prometheus text export.
+
+Metrics are plain Python objects guarded by a lock; recording one is a dict update.
+Set METRICS_PORT to serve /metrics over HTTP, or METRICS_FILE to have the text
+format rewritten every METRICS_INTERVAL seconds.
+"""
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_text(labelnames, values, extra=''):
+    pairs = [f'{name}="{value}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    """Monotonically increasing count, optionally split by labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, _label_text(self.labelnames, key), value) for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    """A value that can go up and down"""
+
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            counts, total = self._values.get(key, (None, 0.0))
+            if counts is None:
+                counts = [0] * (len(self.buckets) + 1)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall-clock duration of a block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        out = []
+        with self._lock:
+            items = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                out.append((f"{self.name}_bucket", _label_text(self.labelnames, key, f'le="{le}"'), cumulative))
+            out.append((f"{self.name}_sum", _label_text(self.labelnames, key), total))
+            out.append((f"{self.name}_count", _label_text(self.labelnames, key), cumulative))
+        return out
+
+
+class Registry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Render every metric in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics)
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+QUESTION_GENERATION_SECONDS = registry.register(Histogram(
+    'talentscout_question_generation_seconds', 'Time spent generating questions with OpenAI', ['mode', 'outcome']))
+TIME_TO_FIRST_QUESTION_SECONDS = registry.register(Histogram(
+    'talentscout_time_to_first_question_seconds', 'Time from tech stack submission to the first question'))
+LLM_TOKENS = registry.register(Counter(
+    'talentscout_llm_tokens_total', 'Tokens reported by OpenAI usage', ['kind']))
+QUESTIONS_SERVED = registry.register(Counter(
+    'talentscout_questions_served_total', 'Technologies served per question source', ['source']))
+QUESTION_FALLBACKS = registry.register(Counter(
+    'talentscout_question_fallbacks_total', 'Technologies that fell back to offline questions after a live failure'))
+QUESTIONS_REJECTED = registry.register(Counter(
+    'talentscout_questions_rejected_total', 'Questions dropped as near-duplicates of the set or of ones asked before', ['reason']))
+STEP_SECONDS = registry.register(Histogram(
+    'talentscout_step_seconds', 'Time to process one candidate input, by state', ['state']))
+STATE_DWELL_SECONDS = registry.register(Histogram(
+    'talentscout_state_dwell_seconds', 'Time candidates spend in each state', ['state'],
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)))
+SAVE_SECONDS = registry.register(Histogram(
+    'talentscout_save_seconds', 'Time to hand a candidate record to the store'))
+STORE_WRITE_SECONDS = registry.register(Histogram(
+    'talentscout_store_write_seconds', 'Time to commit one batch of candidate records'))
+RENDER_SECONDS = registry.register(Histogram(
+    'talentscout_render_seconds', 'Time to render the chat history'))
+LLM_RETRIES = registry.register(Counter(
+    'talentscout_llm_retries_total', 'OpenAI calls retried after a rate limit, server error or timeout'))
+LLM_CIRCUIT_OPEN = registry.register(Gauge(
+    'talentscout_llm_circuit_open', 'Whether the OpenAI circuit breaker is open (1) or closed (0)'))
+LLM_QUEUE_DEPTH = registry.register(Gauge(
+    'talentscout_llm_queue_depth', 'OpenAI calls waiting for rate limit capacity'))
+LLM_QUEUE_WAIT_SECONDS = registry.register(Histogram(
+    'talentscout_llm_queue_wait_seconds', 'Time OpenAI calls waited for rate limit capacity', ['priority']))
+ANSWERS_GRADED = registry.register(Counter(
+    'talentscout_answers_graded_total', 'Candidate answers graded, by method', ['method']))
+GRADING_BATCH_SECONDS = registry.register(Histogram(
+    'talentscout_grading_batch_seconds', 'Time to grade and store one micro-batch of answers'))
+LIVE_SESSIONS = registry.register(Gauge(
+    'talentscout_live_sessions', 'Sessions held in memory'))
+SESSIONS_EVICTED = registry.register(Counter(
+    'talentscout_sessions_evicted_total', 'Idle sessions flushed to storage and released'))
+SESSIONS_EXPIRED = registry.register(Counter(
+    'talentscout_sessions_expired_total', 'Stored checkpoints and journals of abandoned sessions deleted'))
+API_REQUEST_SECONDS = registry.register(Histogram(
+    'talentscout_api_request_seconds', 'API request latency by route and status', ['route', 'status']))
+CANDIDATES_IMPORTED = registry.register(Counter(
+    'talentscout_candidates_imported_total', 'Bulk-imported CSV rows by outcome', ['outcome']))
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip('/') != '/metrics':
+            self.send_error(404)
+            return
+        body = registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _write_metrics_once(path):
+    """Atomically replace path with the current metrics in the text format"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(registry.render())
+    os.replace(tmp_path, path)
+
+def _write_metrics_file(path, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            _write_metrics_once(path)
+        except OSError:
+            # A full disk or a missing directory may clear up; keep trying every interval
+            logger.exception("Failed to write metrics to %s", path)
+
+_exporter_started = False
+_exporter_lock = threading.Lock()
+
+def start_metrics_exporter():
+    """Start the configured metrics exporter once per process"""
+    global _exporter_started
+    with _exporter_lock:
+        if _exporter_started:
+            return
+        _exporter_started = True
+        port = os.getenv("METRICS_PORT")
+        if port:
+            server = ThreadingHTTPServer((os.getenv("METRICS_HOST", "127.0.0.1"), int(port)), _MetricsHandler)
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, name="metrics-exporter", daemon=True).start()
+        path = os.getenv("METRICS_FILE")
+        if path:
+            interval = float(os.getenv("METRICS_INTERVAL", "15"))
+            threading.Thread(target=_write_metrics_file, args=(path, interval), name="metrics-file", daemon=True).start()
+
+
+# Only one profiler may be active per process (cProfile refuses a second one on Python 3.12+)
+_profile_lock = threading.Lock()
+
+@contextmanager
+def profiled(enabled, name):
+    """Profile a block with pyinstrument if installed, else cProfile, writing the report to PROFILE_DIR
+
+    While another block is being profiled this one runs unprofiled, and a report
+    that can't be written is logged; profiling never fails the block itself.
+    """
+    if not enabled or not _profile_lock.acquire(blocking=False):
+        yield
+        return
+    try:
+        directory = os.getenv("PROFILE_DIR", "profiles")
+        stamp = time.strftime('%Y%m%d_%H%M%S')
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            Profiler = None
+
+        if Profiler is not None:
+            profiler = Profiler()
+            profiler.start()
+            try:
+                yield
+            finally:
+                profiler.stop()
+                _write_profile(directory, f"{name}_{stamp}.html", lambda path: _write_text(path, profiler.output_html()))
+        else:
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                _write_profile(directory, f"{name}_{stamp}.prof", profiler.dump_stats)
+    finally:
+        _profile_lock.release()
+
+def _write_text(path, text):
+    with open(path, 'w') as f:
+        f.write(text)
+
+def _write_profile(directory, filename, write):
+    try:
+        os.makedirs(directory, exist_ok=True)
+        write(os.path.join(directory, filename))
+    except OSError:
+        logger.exception("Failed to write profile %s", filename)
@@ -0,0 +1,110 @@
+import os
+import json
+import mmap
+import time
+import random
+import struct
+import threading
+from question_cache import normalize_tech, SENIORITY_BANDS
+
+BANK_MAGIC = b'TSQB'
+BANK_FORMAT = 1
+
+# File layout: magic, little-endian header length, JSON header with the pool index, then
+# one compact JSON array per (technology, band) pool addressed by [offset, length].
+_HEADER = struct.Struct('<4sI')
+
+def _key(tech, band):
+    return f"{normalize_tech(tech)}|{band}"
+
+def write_question_bank(path, pools, version, technologies=None):
+    """Write pools of questions keyed by (technology, band) to a question bank file"""
+    blobs = []
+    index = {}
+    offset = 0
+    for (tech, band), questions in pools.items():
+        if not questions:
+            continue
+        blob = json.dumps(questions, separators=(',', ':')).encode('utf-8')
+        index[_key(tech, band)] = [offset, len(blob)]
+        blobs.append(blob)
+        offset += len(blob)
+
+    header = json.dumps({
+        'format': BANK_FORMAT,
+        'version': version,
+        'created': time.time(),
+        'technologies': technologies or sorted({tech for tech, _ in pools}),
+        'bands': SENIORITY_BANDS,
+        'index': index
+    }, separators=(',', ':')).encode('utf-8')
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(BANK_MAGIC, len(header)))
+        f.write(header)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_path, path)
+
+
+class QuestionBank:
+    """Read-only, memory-mapped question bank with O(1) lookup per technology and band"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_length = _HEADER.unpack_from(self._mm, 0)
+        if magic != BANK_MAGIC:
+            raise ValueError(f"{path} is not a question bank")
+        header = json.loads(self._mm[_HEADER.size:_HEADER.size + header_length])
+        if header.get('format') != BANK_FORMAT:
+            raise ValueError(f"Unsupported question bank format {header.get('format')}")
+        self.version = header['version']
+        self.technologies = header['technologies']
+        self._index = header['index']
+        self._data_start = _HEADER.size + header_length
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def get(self, tech, band):
+        """Return the question pool for a technology and band, or None"""
+        key = _key(tech, band)
+        pool = self._pools.get(key)
+        if pool is None:
+            location = self._index.get(key)
+            if location is None:
+                return None
+            start = self._data_start + location[0]
+            pool = json.loads(self._mm[start:start + location[1]])
+            with self._lock:
+                self._pools[key] = pool
+        return pool
+
+    def sample(self, tech, band, count):
+        """Pick up to count questions for a technology, preferring the closest band"""
+        order = sorted(SENIORITY_BANDS, key=lambda b: abs(SENIORITY_BANDS.index(b) - SENIORITY_BANDS.index(band)))
+        for candidate_band in order:
+            pool = self.get(tech, candidate_band)
+            if pool:
+                return [dict(q) for q in random.sample(pool, min(count, len(pool)))]
+        return None
+
+
+_default_bank = None
+_default_bank_loaded = False
+_default_bank_lock = threading.Lock()
+
+def get_question_bank():
+    """Return the process-wide question bank, or None if no bank file is available"""
+    global _default_bank, _default_bank_loaded
+    with _default_bank_lock:
+        if not _default_bank_loaded:
+            _default_bank_loaded = True
+            path = os.getenv("QUESTION_BANK_PATH", "question_bank.tsqb")
+            try:
+                _default_bank = QuestionBank(path)
+            except (OSError, ValueError):
+                _default_bank = None
+        return _default_bank
@@ -0,0 +1,128 @@
+import os
+import re
+import json
+import time
+import random
+import threading
+from collections import OrderedDict
+from question_similarity import QuestionFilter
+
+CACHE_VERSION = 1
+
+SENIORITY_BANDS = ['junior', 'mid', 'senior', 'lead']
+
+def normalize_tech(tech):
+    """Normalize a technology name for use as a cache key"""
+    return re.sub(r'\s+', ' ', str(tech)).strip().lower()
+
+def seniority_band(years_experience):
+    """Map years of experience to a seniority band"""
+    try:
+        years = float(years_experience)
+    except (TypeError, ValueError):
+        return 'mid'
+    if years < 2:
+        return 'junior'
+    if years < 5:
+        return 'mid'
+    if years < 10:
+        return 'senior'
+    return 'lead'
+
+
+class QuestionCache:
+    """On-disk LRU cache of generated question pools keyed by technology and seniority band"""
+
+    def __init__(self, path, max_entries=500, ttl_seconds=7 * 24 * 3600, pool_size=12):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.pool_size = pool_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def _key(tech, band):
+        return f"{normalize_tech(tech)}|{band}"
+
+    def _load(self):
+        """Load cached pools from disk, dropping anything expired"""
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') != CACHE_VERSION:
+            return
+        now = time.time()
+        for key, entry in data.get('entries', []):
+            if now - entry.get('created', 0) < self.ttl_seconds and entry.get('questions'):
+                self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _save(self):
+        """Atomically write the cache to disk (called with the lock held)"""
+        data = {'version': CACHE_VERSION, 'entries': list(self._entries.items())}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def get(self, tech, band):
+        """Return the cached question pool for a technology, or None on a miss"""
+        key = self._key(tech, band)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry['created'] >= self.ttl_seconds:
+                del self._entries[key]
+                return None
+            # Recency is only reordered in memory; it reaches disk on the next write
+            self._entries.move_to_end(key)
+            return list(entry['questions'])
+
+    def add(self, tech, band, questions):
+        """Merge freshly generated questions into a technology's pool"""
+        if not questions:
+            return
+        key = self._key(tech, band)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            pool = entry['questions'] if entry else []
+            # Near-duplicates of pooled questions (or of each other) would only repeat them
+            kept = QuestionFilter(q['question'] for q in pool).admit_many([q['question'] for q in questions])
+            pool.extend(questions[i] for i in kept)
+            self._entries[key] = {'created': time.time(), 'questions': pool[-self.pool_size:]}
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            try:
+                self._save()
+            except OSError:
+                pass
+
+    def sample(self, tech, band, count):
+        """Pick up to count questions from a technology's cached pool"""
+        pool = self.get(tech, band)
+        if not pool:
+            return None
+        return random.sample(pool, min(count, len(pool)))
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_question_cache():
+    """Return the process-wide question cache configured from the environment"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = QuestionCache(
+                os.getenv("QUESTION_CACHE_PATH", "question_cache.json"),
+                max_entries=int(os.getenv("QUESTION_CACHE_MAX_ENTRIES", "500")),
+                ttl_seconds=int(os.getenv("QUESTION_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+                pool_size=int(os.getenv("QUESTION_CACHE_POOL_SIZE", "12"))
+            )
+        return _default_cache
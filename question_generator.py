@@ -0,0 +1,484 @@
+import os
+import re
+import json
+import asyncio
+import time
+import random
+import threading
+from candidate_store import get_candidate_store
+from json_stream import JsonArrayStreamParser
+from llm_client import breaker, chat_completion, chat_completion_async, make_async_client
+from llm_scheduler import INTERACTIVE
+from metrics import LLM_TOKENS, QUESTION_FALLBACKS, QUESTION_GENERATION_SECONDS, QUESTIONS_REJECTED, QUESTIONS_SERVED
+from question_bank import get_question_bank
+from question_cache import SENIORITY_BANDS, get_question_cache, normalize_tech, seniority_band
+from question_similarity import QuestionFilter
+from single_flight import SingleFlight
+
+QUESTIONS_PER_TECH = 3
+
+# "batch" streams one request for the whole stack, "concurrent" sends one request per technology in parallel
+QUESTION_GENERATION_MODE = os.getenv("QUESTION_GENERATION_MODE", "batch")
+
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "4"))
+
+# With live questions off, only the cache, the question bank and fixed questions are used
+USE_LIVE_QUESTIONS = os.getenv("USE_LIVE_QUESTIONS", "1") != "0"
+
+SYSTEM_PROMPT = "You are an expert technical interviewer. Generate complex, real-world scenario-based technical questions with proper JSON format."
+
+# Identical stacks submitted at the same time share one in-flight generation
+_inflight_generations = SingleFlight()
+
+
+class QuestionStream:
+    """A candidate's question list, filled in by a background generator as questions arrive"""
+
+    def __init__(self, expected):
+        self.questions = []
+        self.expected = expected
+        self.error = None
+        self._done = False
+        self._callbacks = []
+        self._cond = threading.Condition()
+
+    @classmethod
+    def completed(cls, questions):
+        """A stream that already holds a finished question list"""
+        stream = cls(len(questions))
+        stream.questions.extend(questions)
+        stream._done = True
+        return stream
+
+    @property
+    def done(self):
+        return self._done
+
+    def push(self, question):
+        """Append a question and wake up anyone waiting for it"""
+        with self._cond:
+            self.questions.append(question)
+            self._cond.notify_all()
+
+    def finish(self, error=None):
+        """Mark generation as complete"""
+        with self._cond:
+            if error and not self.error:
+                self.error = error
+            self._done = True
+            self._cond.notify_all()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+    def add_done_callback(self, callback):
+        """Call callback(stream) once generation is done"""
+        with self._cond:
+            if not self._done:
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def wait_for(self, count, timeout=None):
+        """Block until at least count questions exist or generation is done"""
+        with self._cond:
+            self._cond.wait_for(lambda: len(self.questions) >= count or self._done, timeout)
+            return len(self.questions) >= count
+
+    def wait(self, timeout=None):
+        """Block until generation is done"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._done, timeout)
+
+    def total(self):
+        """Number of questions the candidate will be asked"""
+        if self._done:
+            return len(self.questions)
+        return max(self.expected, len(self.questions))
+
+
+class _StackOrder:
+    """Pushes questions to a stream in tech-stack order
+
+    Questions for the first unfinished technology go straight through, so the
+    candidate can start on them; those for later ones are held until every
+    technology before them is closed.
+    """
+
+    def __init__(self, stream, tech_stack):
+        self.stream = stream
+        self.order = list(dict.fromkeys(normalize_tech(tech) for tech in tech_stack))
+        self.held = {key: [] for key in self.order}
+        self.closed = set()
+        self.head = 0
+
+    def push(self, tech, question):
+        key = normalize_tech(tech)
+        if self.head < len(self.order) and key == self.order[self.head]:
+            self.stream.push(question)
+        else:
+            self.held.setdefault(key, []).append(question)
+
+    def close(self, tech):
+        """Mark a technology's share complete, releasing what was held behind it"""
+        self.closed.add(normalize_tech(tech))
+        while self.head < len(self.order) and self.order[self.head] in self.closed:
+            self.head += 1
+            if self.head < len(self.order):
+                for question in self.held.pop(self.order[self.head]):
+                    self.stream.push(question)
+
+
+def build_question_prompt(tech_stack, band, per_tech=QUESTIONS_PER_TECH):
+    """Build the question generation prompt for the given technologies"""
+    tech_list = ', '.join(tech_stack) if tech_stack else "software development"
+
+    # Generate 3 questions per technology
+    num_questions = len(tech_stack) * per_tech if tech_stack else per_tech
+
+    return f"""Generate {num_questions} technical interview questions for a {band}-level candidate with the following tech stack: {tech_list}.
+
+Generate exactly {per_tech} questions for each technology.
+
+For each question, provide:
+1. A challenging, real-world scenario-based question related to the tech stack
+2. Which technology this question is for (use the technology name exactly as listed above)
+
+Make the questions progressively more difficult and cover different aspects like:
+- Architecture and design patterns
+- Performance optimization
+- Security best practices
+- Debugging and troubleshooting
+- Advanced concepts and edge cases
+
+Return the output as a JSON array with this exact format:
+[
+  {{
+    "question": "Your question here",
+    "technology": "technology name"
+  }},
+  ...
+]
+
+Generate now:"""
+
+def match_technology(question, tech_stack):
+    """Return the stack entry a generated question belongs to, or None"""
+    if not isinstance(question, dict) or not question.get('question'):
+        return None
+    # A single-technology request can't be misattributed
+    if len(tech_stack) == 1:
+        return tech_stack[0]
+    key = normalize_tech(question.get('technology', ''))
+    for tech in tech_stack:
+        if normalize_tech(tech) == key:
+            return tech
+    return None
+
+def parse_question_json(content, tech_stack):
+    """Parse a JSON array of questions from the model output and group it by technology"""
+    try:
+        json_match = re.search(r'\[.*\]', content or '', re.DOTALL)
+        if not json_match:
+            return None
+        questions = json.loads(json_match.group())
+    except json.JSONDecodeError:
+        return None
+
+    grouped = {normalize_tech(tech): [] for tech in tech_stack}
+    for q in questions:
+        tech = match_technology(q, tech_stack)
+        if tech:
+            grouped[normalize_tech(tech)].append({'question': q['question'], 'technology': tech})
+    return grouped
+
+def get_fixed_questions(tech_stack):
+    """Get fixed questions - fallback"""
+    questions = []
+    for tech in tech_stack:
+        questions.append({
+            'question': f'What is the primary purpose of {tech} in software development?',
+            'technology': tech
+        })
+        questions.append({
+            'question': f'What are the best practices when working with {tech}?',
+            'technology': tech
+        })
+        questions.append({
+            'question': f'How does {tech} handle security concerns?',
+            'technology': tech
+        })
+    return questions
+
+
+def record_usage(usage):
+    """Count the tokens OpenAI reports for a request"""
+    if usage is not None:
+        LLM_TOKENS.inc(usage.prompt_tokens or 0, kind='prompt')
+        LLM_TOKENS.inc(usage.completion_tokens or 0, kind='completion')
+
+def full_share(questions):
+    """questions if there are enough of them for a technology's share, else None"""
+    return questions if questions and len(questions) >= QUESTIONS_PER_TECH else None
+
+def get_offline_questions(tech, band):
+    """Questions for a technology without any network call: the question bank, topped up with fixed questions"""
+    bank = get_question_bank()
+    questions = list((bank.sample(tech, band, QUESTIONS_PER_TECH) if bank else None) or [])
+    return questions + get_fixed_questions([tech])[:QUESTIONS_PER_TECH - len(questions)]
+
+def get_local_pool(tech, band):
+    """Every question held locally for a technology: its cached pool, the question bank (closest band first), then fixed questions"""
+    pool = list(get_question_cache().get(tech, band) or [])
+    random.shuffle(pool)
+    bank = get_question_bank()
+    if bank:
+        for candidate_band in sorted(SENIORITY_BANDS, key=lambda b: abs(SENIORITY_BANDS.index(b) - SENIORITY_BANDS.index(band))):
+            bank_pool = list(bank.get(tech, candidate_band) or [])
+            random.shuffle(bank_pool)
+            pool += bank_pool
+    return pool + get_fixed_questions([tech])
+
+
+def stream_ai_questions(tech_stack, band, on_question, priority=INTERACTIVE):
+    """Stream questions for the given technologies, calling on_question(tech, question) as each one completes
+
+    on_question returns whether it kept the question; only kept ones count towards a technology's share.
+    """
+    counts = {normalize_tech(tech): 0 for tech in tech_stack}
+    parser = JsonArrayStreamParser()
+    response = chat_completion(
+        priority=priority,
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": build_question_prompt(tech_stack, band)}
+        ],
+        temperature=0.7,
+        max_tokens=2000,
+        stream=True,
+        stream_options={"include_usage": True}
+    )
+    for chunk in response:
+        # The final chunk carries usage and no choices
+        record_usage(getattr(chunk, 'usage', None))
+        if not chunk.choices:
+            continue
+        for q in parser.feed(chunk.choices[0].delta.content or ''):
+            tech = match_technology(q, tech_stack)
+            if tech and counts[normalize_tech(tech)] < QUESTIONS_PER_TECH:
+                if on_question(tech, {'question': q['question'], 'technology': tech}):
+                    counts[normalize_tech(tech)] += 1
+
+async def request_tech_questions_async(async_client, semaphore, tech, band, per_tech=QUESTIONS_PER_TECH,
+                                       priority=INTERACTIVE):
+    """Request questions for a single technology, respecting the concurrency limit"""
+    async with semaphore:
+        response = await chat_completion_async(
+            async_client,
+            priority=priority,
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": build_question_prompt([tech], band, per_tech)}
+            ],
+            temperature=0.7,
+            max_tokens=200 * per_tech
+        )
+    record_usage(response.usage)
+    grouped = parse_question_json(response.choices[0].message.content, [tech])
+    return grouped.get(normalize_tech(tech), []) if grouped else []
+
+async def fan_out_questions(tech_stack, band, priority=INTERACTIVE):
+    """Request questions for every technology concurrently"""
+    async_client = make_async_client()
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    try:
+        return await asyncio.gather(
+            *(request_tech_questions_async(async_client, semaphore, tech, band, priority=priority)
+              for tech in tech_stack),
+            return_exceptions=True
+        )
+    finally:
+        await async_client.close()
+
+
+def _generate_missing(stream, order, missing, band, priority):
+    """Fill a stream with fresh questions for technologies that missed the cache"""
+    fresh = {tech: [] for tech in missing}
+    # At temperature 0.7 a set can repeat itself; near-duplicates within a technology are dropped
+    filters = {tech: QuestionFilter() for tech in missing}
+    errors = []
+
+    def on_question(tech, question):
+        if not filters[tech].admit(question['question']):
+            QUESTIONS_REJECTED.inc(reason='duplicate')
+            return False
+        fresh[tech].append(question)
+        order.push(tech, question)
+        if len(fresh[tech]) == QUESTIONS_PER_TECH:
+            order.close(tech)
+        return True
+
+    started = time.perf_counter()
+    try:
+        if QUESTION_GENERATION_MODE == 'concurrent':
+            results = asyncio.run(fan_out_questions(missing, band, priority))
+            # Merge in stack order once every request is back
+            for tech, result in zip(missing, results):
+                if isinstance(result, Exception):
+                    errors.append(f"{tech}: {result}")
+                    continue
+                kept = filters[tech].admit_many([question['question'] for question in result])
+                QUESTIONS_REJECTED.inc(len(result) - len(kept), reason='duplicate')
+                for i in kept[:QUESTIONS_PER_TECH]:
+                    fresh[tech].append(result[i])
+                    order.push(tech, result[i])
+        else:
+            stream_ai_questions(missing, band, on_question, priority)
+    except Exception as e:
+        errors.append(str(e))
+    QUESTION_GENERATION_SECONDS.observe(
+        time.perf_counter() - started, mode=QUESTION_GENERATION_MODE, outcome='error' if errors else 'ok'
+    )
+
+    cache = get_question_cache()
+    for tech in missing:
+        if fresh[tech]:
+            # A short or cut-off set would be served as a hit to every later candidate
+            if len(fresh[tech]) >= QUESTIONS_PER_TECH:
+                cache.add(tech, band, fresh[tech])
+            # Make up for dropped duplicates from local questions
+            needed = QUESTIONS_PER_TECH - len(fresh[tech])
+            if needed > 0:
+                pool = get_local_pool(tech, band)
+                for i in filters[tech].admit_many([q['question'] for q in pool])[:needed]:
+                    order.push(tech, {'question': pool[i]['question'], 'technology': tech})
+        else:
+            QUESTION_FALLBACKS.inc()
+            for question in get_offline_questions(tech, band):
+                order.push(tech, {'question': question['question'], 'technology': tech})
+        order.close(tech)
+    stream.finish('; '.join(errors) or None)
+
+def _start_stream(tech_stack, band, priority):
+    """Start a new generation for a stack and band"""
+    cache = get_question_cache()
+    stream = QuestionStream(len(tech_stack) * QUESTIONS_PER_TECH)
+
+    bank = get_question_bank()
+    order = _StackOrder(stream, tech_stack)
+
+    # Cached pools and the question bank are served without waiting; only misses go to OpenAI.
+    # A pool too small for a technology's share counts as a miss. Questions still come out in
+    # stack order, so hits after the first miss are held until the technologies before them are in.
+    missing = []
+    for tech in tech_stack:
+        source = 'cache'
+        local = full_share(cache.sample(tech, band, QUESTIONS_PER_TECH))
+        if not local and bank:
+            source = 'bank'
+            local = full_share(bank.sample(tech, band, QUESTIONS_PER_TECH))
+        if local:
+            QUESTIONS_SERVED.inc(source=source)
+            for q in local:
+                order.push(tech, {'question': q['question'], 'technology': tech})
+            order.close(tech)
+        elif USE_LIVE_QUESTIONS and not breaker.is_open():
+            QUESTIONS_SERVED.inc(source='live')
+            missing.append(tech)
+        else:
+            QUESTIONS_SERVED.inc(source='offline')
+            for q in get_offline_questions(tech, band):
+                order.push(tech, {'question': q['question'], 'technology': tech})
+            order.close(tech)
+
+    if not missing:
+        stream.finish()
+        return stream
+
+    threading.Thread(target=_generate_missing, args=(stream, order, missing, band, priority), daemon=True).start()
+    return stream
+
+def _forward_unseen(source, stream, tech_stack, band, filters):
+    """Copy questions the candidate hasn't seen from source to stream, topping up from local pools"""
+    order = _StackOrder(stream, tech_stack)
+    techs = {normalize_tech(tech): tech for tech in tech_stack}
+    kept = {key: 0 for key in filters}
+    repeats = {key: [] for key in filters}
+    topped_up = set()
+
+    def top_up(key):
+        if key in topped_up:
+            return
+        topped_up.add(key)
+        needed = QUESTIONS_PER_TECH - kept[key]
+        if needed > 0:
+            pool = get_local_pool(techs[key], band)
+            picked = [pool[j] for j in filters[key].admit_many([q['question'] for q in pool])[:needed]]
+            # With nothing new left, asking a question again beats asking fewer
+            picked += repeats[key][:needed - len(picked)]
+            for question in picked:
+                order.push(techs[key], {'question': question['question'], 'technology': techs[key]})
+        order.close(techs[key])
+
+    i = 0
+    current = None
+    while source.wait_for(i + 1):
+        question = source.questions[i]
+        i += 1
+        key = normalize_tech(question['technology'])
+        if key not in filters:
+            stream.push(question)
+            continue
+        # The source is in stack order, so a new technology means the previous one is complete
+        if current is not None and key != current:
+            top_up(current)
+        current = key
+        if filters[key].admit(question['question']):
+            kept[key] += 1
+            order.push(question['technology'], question)
+        else:
+            QUESTIONS_REJECTED.inc(reason='seen')
+            repeats[key].append(question)
+
+    for key in techs:
+        top_up(key)
+    stream.finish(source.error)
+
+def _exclude_seen(source, tech_stack, band, email):
+    """Serve source's questions minus those this email has been asked before, and remember the ones served"""
+    store = get_candidate_store()
+    seen = {normalize_tech(tech): [] for tech in tech_stack}
+    for question in store.seen_questions(email):
+        seen.get(normalize_tech(question['technology']), []).append(question['question'])
+
+    stream = source
+    if any(seen.values()):
+        stream = QuestionStream(source.expected)
+        filters = {key: QuestionFilter(texts) for key, texts in seen.items()}
+        threading.Thread(target=_forward_unseen, args=(source, stream, tech_stack, band, filters), daemon=True).start()
+    stream.add_done_callback(lambda s: store.save_seen_questions(email, list(s.questions)))
+    return stream
+
+def start_question_generation(tech_stack, years_experience='', priority=INTERACTIVE, email=None):
+    """Start generating a candidate's questions and return the stream they arrive on
+
+    Sessions asking for the same normalized stack, seniority band and priority
+    while a generation is in flight share its stream instead of issuing another
+    request; a live candidate never joins a background generation, which could
+    be queued behind a whole import.
+    Given the candidate's email, questions they were asked in earlier interviews
+    are swapped for fresh ones from the local pools. Work nobody is waiting on
+    should pass priority=BACKGROUND.
+    """
+    band = seniority_band(years_experience)
+    key = (tuple(sorted({normalize_tech(tech) for tech in tech_stack})), band, priority)
+    stream = _inflight_generations.join(key, lambda: _start_stream(tech_stack, band, priority))
+    return _exclude_seen(stream, tech_stack, band, email) if email else stream
+
+def generate_ai_questions(tech_stack, years_experience=''):
+    """Generate a candidate's full question set, blocking until it is complete"""
+    stream = start_question_generation(tech_stack, years_experience)
+    stream.wait()
+    return list(stream.questions)
@@ -0,0 +1,90 @@
+"""Local near-duplicate detection for interview questions.
+
+Questions are embedded as hashed character n-gram vectors (3- to 5-grams of the
+normalized text, signed feature hashing into QUESTION_VECTOR_DIM dimensions, unit
+length), so no embedding service is called. Two questions whose vectors have a
+cosine similarity of at least QUESTION_SIMILARITY_THRESHOLD are treated as the
+same question. A whole generated set is checked with one matrix product. NumPy is
+imported on first use, as nothing before question generation needs it.
+"""
+import os
+import re
+import threading
+from functools import lru_cache
+
+QUESTION_VECTOR_DIM = int(os.getenv("QUESTION_VECTOR_DIM", "2048"))
+
+QUESTION_SIMILARITY_THRESHOLD = float(os.getenv("QUESTION_SIMILARITY_THRESHOLD", "0.7"))
+
+NGRAM_SIZES = (3, 4, 5)
+
+_NON_WORD = re.compile(r"[^a-z0-9+#]+")
+
+
+def normalize_question(text):
+    """Lowercase a question and reduce punctuation and whitespace to single spaces"""
+    return _NON_WORD.sub(' ', str(text).lower()).strip()
+
+@lru_cache(maxsize=16384)
+def _features(text):
+    """Hashed n-gram buckets and signs for one question"""
+    import numpy as np
+    padded = f" {normalize_question(text)} "
+    # hash() is salted per process, which is fine: vectors are never stored
+    hashes = np.fromiter(
+        (hash(padded[i:i + n]) for n in NGRAM_SIZES for i in range(len(padded) - n + 1)), dtype=np.int64
+    )
+    buckets = hashes % QUESTION_VECTOR_DIM
+    signs = np.where((hashes // QUESTION_VECTOR_DIM) & 1, 1.0, -1.0).astype(np.float32)
+    return buckets, signs
+
+def embed(texts):
+    """Unit-length vectors for questions, one row each"""
+    import numpy as np
+    matrix = np.zeros((len(texts), QUESTION_VECTOR_DIM), dtype=np.float32)
+    if not texts:
+        return matrix
+    features = [_features(text) for text in texts]
+    rows = np.concatenate([np.full(len(buckets), i) for i, (buckets, _) in enumerate(features)])
+    np.add.at(matrix, (rows, np.concatenate([buckets for buckets, _ in features])),
+              np.concatenate([signs for _, signs in features]))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1.0)
+
+
+class QuestionFilter:
+    """Questions already asked or accepted, admitting only new ones that aren't near-duplicates of them"""
+
+    def __init__(self, texts=(), threshold=QUESTION_SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self._vectors = embed(list(texts))
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._vectors)
+
+    def admit_many(self, texts):
+        """Indices of the texts to keep, in order: each unlike everything known and every text kept before it
+
+        Kept texts are added to the filter.
+        """
+        if not texts:
+            return []
+        import numpy as np
+        vectors = embed(list(texts))
+        with self._lock:
+            # One product scores every new text against the known ones and against each other
+            scores = vectors @ np.vstack([self._vectors, vectors]).T
+            known = len(self._vectors)
+            duplicate = (scores[:, :known] >= self.threshold).any(axis=1) if known else np.zeros(len(texts), dtype=bool)
+            close = scores[:, known:] >= self.threshold
+            kept = []
+            for i in range(len(texts)):
+                if not duplicate[i] and not close[i, kept].any():
+                    kept.append(i)
+            self._vectors = np.vstack([self._vectors, vectors[kept]])
+        return kept
+
+    def admit(self, text):
+        """Keep text, and return True, unless it nearly duplicates a known question"""
+        return bool(self.admit_many([text]))
@@ -0,0 +1,201 @@
+"""Pluggable storage for conversation checkpoints.
+
+After every transition the app writes the session's checkpoint (state, questions,
+current question and answers) and any new chat messages to the backend, so any
+process sharing the backend can resume any candidate. SESSION_BACKEND selects:
+
+- sqlite (default): a SQLite database at SESSION_DB_PATH, shared by every process
+  that can reach the file; checkpoints stay on disk, off the Python heap
+- memory: checkpoints live in this process, which then holds a second copy of every
+  session's transcript; only for tests and short single-process runs
+"""
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from engine import ChatMessage, Session
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS session_checkpoints (
+    session_id TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS session_messages (
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    message TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS session_checkpoints_updated_at ON session_checkpoints (updated_at);
+"""
+
+
+class MemorySessionBackend:
+    """Checkpoints held in this process as compact JSON, least recently saved dropped first"""
+
+    def __init__(self, max_sessions=10000):
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def exists(self, session_id):
+        return session_id in self._sessions
+
+    def load(self, session_id):
+        """Return a session's checkpoint, or None"""
+        entry = self._sessions.get(session_id)
+        return json.loads(entry[0]) if entry else None
+
+    def messages(self, session_id):
+        """Return a session's chat messages as (role, message, timestamp) tuples"""
+        entry = self._sessions.get(session_id)
+        return list(entry[1]) if entry else []
+
+    def save(self, session_id, checkpoint, messages=()):
+        """Replace a session's checkpoint and append (seq, role, message, timestamp) messages"""
+        data = json.dumps(checkpoint, separators=(',', ':'))
+        with self._lock:
+            entry = self._sessions.pop(session_id, None) or [None, [], 0]
+            entry[0] = data
+            entry[2] = time.time()
+            for seq, role, message, timestamp in messages:
+                # Messages already held (a repeated save) are skipped, as in the SQLite backend
+                if seq == len(entry[1]):
+                    entry[1].append((role, message, timestamp))
+            self._sessions[session_id] = entry
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def delete(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def expire(self, cutoff):
+        """Delete sessions last saved before cutoff (epoch seconds); returns how many"""
+        expired = 0
+        with self._lock:
+            # Least recently saved first
+            while self._sessions and next(iter(self._sessions.values()))[2] < cutoff:
+                self._sessions.popitem(last=False)
+                expired += 1
+        return expired
+
+
+class SqliteSessionBackend:
+    """Checkpoints in a SQLite (WAL) database shared between processes"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def exists(self, session_id):
+        row = self._conn().execute("SELECT 1 FROM session_checkpoints WHERE session_id = ?", (session_id,)).fetchone()
+        return row is not None
+
+    def load(self, session_id):
+        """Return a session's checkpoint, or None"""
+        row = self._conn().execute("SELECT data FROM session_checkpoints WHERE session_id = ?", (session_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def messages(self, session_id):
+        """Return a session's chat messages as (role, message, timestamp) tuples"""
+        return self._conn().execute(
+            "SELECT role, message, timestamp FROM session_messages WHERE session_id = ? ORDER BY seq", (session_id,)
+        ).fetchall()
+
+    def save(self, session_id, checkpoint, messages=()):
+        """Replace a session's checkpoint and append (seq, role, message, timestamp) messages in one transaction"""
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                """INSERT INTO session_checkpoints (session_id, state, data, updated_at)
+                   VALUES (?, ?, ?, ?)
+                   ON CONFLICT (session_id) DO UPDATE SET
+                   state = excluded.state, data = excluded.data, updated_at = excluded.updated_at""",
+                (session_id, checkpoint['state'], json.dumps(checkpoint, separators=(',', ':')), time.time())
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO session_messages (session_id, seq, role, message, timestamp) VALUES (?, ?, ?, ?, ?)",
+                [(session_id,) + tuple(m) for m in messages]
+            )
+
+    def delete(self, session_id):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM session_checkpoints WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM session_messages WHERE session_id = ?", (session_id,))
+
+    def expire(self, cutoff):
+        """Delete sessions last saved before cutoff (epoch seconds); returns how many"""
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                """DELETE FROM session_messages WHERE session_id IN
+                   (SELECT session_id FROM session_checkpoints WHERE updated_at < ?)""", (cutoff,)
+            )
+            return conn.execute("DELETE FROM session_checkpoints WHERE updated_at < ?", (cutoff,)).rowcount
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_session_backend():
+    """Return the process-wide session backend selected by SESSION_BACKEND"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            kind = os.getenv("SESSION_BACKEND", "sqlite")
+            if kind == 'sqlite':
+                _backend = SqliteSessionBackend(os.getenv("SESSION_DB_PATH", "sessions.db"))
+            elif kind == 'memory':
+                _backend = MemorySessionBackend()
+            else:
+                raise ValueError(f"Unknown SESSION_BACKEND: {kind!r}")
+        return _backend
+
+
+def checkpoint_session(session, backend=None):
+    """Write a session's checkpoint and its chat messages since the last one"""
+    with session.lock:
+        # A saved or abandoned interview has nothing left to resume, and an evicted one was
+        # flushed before release() emptied it; writing it now would overwrite that checkpoint
+        if session.record_saved or session.ended or session.evicted:
+            return
+        total = session.history_offset + len(session.history)
+        unsaved = min(total - session.checkpointed, len(session.history))
+        messages = [
+            (seq, m.role, m.message, m.timestamp)
+            for seq, m in enumerate(session.history[len(session.history) - unsaved:], total - unsaved)
+        ] if unsaved > 0 else []
+        (backend or get_session_backend()).save(session.session_id, session.to_dict(), messages)
+        session.checkpointed = total
+
+def load_session(session_id, window, backend=None):
+    """Resume a session from its checkpoint with its last window messages in memory, or return None"""
+    backend = backend or get_session_backend()
+    data = backend.load(session_id)
+    if data is None:
+        return None
+    session = Session.from_dict(data)
+    messages = backend.messages(session_id)
+    session.history = [ChatMessage(*m) for m in messages[-window:]]
+    session.history_offset = len(messages) - len(session.history)
+    session.checkpointed = len(messages)
+    return session
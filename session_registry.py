@@ -0,0 +1,116 @@
+"""Process-wide registry of live sessions with idle-timeout eviction.
+
+A background sweeper evicts sessions that have been idle for SESSION_IDLE_SECONDS:
+each one is handed to on_evict to be flushed to storage, then released so only
+its id stays in memory. The next interaction restores it from storage.
+
+Every SESSION_EXPIRE_INTERVAL seconds the sweeper also calls on_expire(cutoff)
+to delete what storage holds for sessions nobody has touched since cutoff,
+SESSION_TTL_SECONDS ago: candidates who walked away mid-interview.
+"""
+import os
+import time
+import logging
+import threading
+from engine import now_seconds
+from metrics import LIVE_SESSIONS, SESSIONS_EVICTED, SESSIONS_EXPIRED
+
+logger = logging.getLogger(__name__)
+
+SESSION_IDLE_SECONDS = int(os.getenv("SESSION_IDLE_SECONDS", "1800"))
+
+SESSION_SWEEP_SECONDS = float(os.getenv("SESSION_SWEEP_SECONDS", "60"))
+
+# Stored sessions untouched this long are abandoned; keep it well above SESSION_IDLE_SECONDS
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", str(7 * 24 * 3600)))
+
+SESSION_EXPIRE_INTERVAL = float(os.getenv("SESSION_EXPIRE_INTERVAL", "3600"))
+
+
+class SessionRegistry:
+    """Live sessions by id, evicted once idle"""
+
+    def __init__(self, on_evict=None, idle_seconds=SESSION_IDLE_SECONDS, sweep_seconds=SESSION_SWEEP_SECONDS,
+                 on_expire=None, ttl_seconds=SESSION_TTL_SECONDS, expire_interval=SESSION_EXPIRE_INTERVAL):
+        self.on_evict = on_evict
+        self.idle_seconds = idle_seconds
+        self.sweep_seconds = sweep_seconds
+        self.on_expire = on_expire
+        self.ttl_seconds = ttl_seconds
+        self.expire_interval = expire_interval
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._sweeper = threading.Thread(target=self._sweep_loop, name="session-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def add(self, session):
+        """Track a session for eviction"""
+        with self._lock:
+            self._sessions[session.session_id] = session
+            LIVE_SESSIONS.set(len(self._sessions))
+
+    def get(self, session_id):
+        """Return the live session for an id, or None"""
+        return self._sessions.get(session_id)
+
+    def discard(self, session_id):
+        """Stop tracking a session without flushing it"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            LIVE_SESSIONS.set(len(self._sessions))
+
+    def evict_idle(self, now=None):
+        """Flush and release every session idle for longer than idle_seconds; returns how many"""
+        cutoff = (now_seconds() if now is None else now) - self.idle_seconds
+        with self._lock:
+            idle = [session for session in self._sessions.values() if session.last_active < cutoff]
+        evicted = 0
+        for session in idle:
+            # A session being stepped is busy, not idle
+            if not session.lock.acquire(blocking=False):
+                continue
+            try:
+                # The candidate may have come back since the scan
+                if session.last_active >= cutoff or session.evicted:
+                    continue
+                with self._lock:
+                    if self._sessions.get(session.session_id) is not session:
+                        continue
+                    del self._sessions[session.session_id]
+                    LIVE_SESSIONS.set(len(self._sessions))
+                try:
+                    if self.on_evict:
+                        self.on_evict(session)
+                except Exception:
+                    logger.exception("Failed to flush evicted session %s", session.session_id)
+                session.release()
+                evicted += 1
+            finally:
+                session.lock.release()
+        SESSIONS_EVICTED.inc(evicted)
+        return evicted
+
+    def expire_stored(self, now=None):
+        """Have on_expire delete stored sessions untouched for ttl_seconds; returns how much went"""
+        if self.on_expire is None:
+            return 0
+        cutoff = (time.time() if now is None else now) - self.ttl_seconds
+        try:
+            expired = self.on_expire(cutoff) or 0
+        except Exception:
+            logger.exception("Failed to expire abandoned sessions")
+            return 0
+        SESSIONS_EXPIRED.inc(expired)
+        return expired
+
+    def _sweep_loop(self):
+        last_expired = None
+        while True:
+            time.sleep(self.sweep_seconds)
+            self.evict_idle()
+            if last_expired is None or time.monotonic() - last_expired >= self.expire_interval:
+                last_expired = time.monotonic()
+                self.expire_stored()
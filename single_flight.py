@@ -0,0 +1,34 @@
+import threading
+
+
+class SingleFlight:
+    """Process-wide de-duplication of identical in-flight work, shared across Streamlit script threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    def join(self, key, start):
+        """Return the in-flight result for key, calling start() only if nothing is running for it
+
+        start() must return an object with add_done_callback(fn); the key is released
+        once that object completes, so later callers start fresh work.
+        """
+        with self._lock:
+            result = self._inflight.get(key)
+            if result is not None:
+                return result
+            result = start()
+            self._inflight[key] = result
+        result.add_done_callback(lambda _: self._release(key, result))
+        return result
+
+    def _release(self, key, result):
+        with self._lock:
+            if self._inflight.get(key) is result:
+                del self._inflight[key]
+
+    def inflight_count(self):
+        """Number of keys currently being worked on"""
+        with self._lock:
+            return len(self._inflight)
@@ -0,0 +1,210 @@
+import os
+import re
+import json
+import bisect
+from functools import lru_cache
+
+MAX_TECH_STACK = int(os.getenv("MAX_TECH_STACK", "8"))
+
+# Prefix and typo matches only land on aliases at least this long: one edit away
+# from a short alias is usually a different technology ("Jest" vs "rest")
+MIN_FUZZY_ALIAS_LENGTH = 6
+
+# Canonical technology names, most commonly listed first, with their known aliases
+CANONICAL_TECHNOLOGIES = {
+    'Python': ['py', 'python3', 'python2', 'cpython'],
+    'JavaScript': ['js', 'ecmascript', 'es6', 'vanilla js'],
+    'Java': ['jdk', 'java se', 'java ee'],
+    'TypeScript': ['ts'],
+    'SQL': ['structured query language'],
+    'React': ['reactjs', 'react.js'],
+    'Node.js': ['node', 'nodejs'],
+    'AWS': ['amazon web services', 'amazon aws'],
+    'Docker': ['docker compose', 'docker-compose'],
+    'Kubernetes': ['k8s', 'kube'],
+    'Git': [],
+    'PostgreSQL': ['postgres', 'psql', 'pg', 'postgre'],
+    'MySQL': ['my sql'],
+    'MongoDB': ['mongo'],
+    'C#': ['csharp', 'c sharp'],
+    'C++': ['cpp', 'cplusplus', 'c plus plus'],
+    'C': ['c language', 'ansi c'],
+    'Go': ['golang'],
+    'Rust': ['rustlang', 'rust lang'],
+    'Ruby': ['rb'],
+    'PHP': ['php7', 'php8'],
+    'Kotlin': ['kt'],
+    'Swift': ['swiftui'],
+    'Scala': [],
+    'R': ['rlang', 'r language'],
+    'HTML': ['html5'],
+    'CSS': ['css3'],
+    'Tailwind CSS': ['tailwind', 'tailwindcss'],
+    'Angular': ['angularjs', 'angular.js'],
+    'Vue.js': ['vue', 'vuejs'],
+    'Next.js': ['nextjs', 'next'],
+    'Express': ['expressjs', 'express.js'],
+    'Django': ['django rest framework', 'drf'],
+    'Flask': [],
+    'FastAPI': ['fast api'],
+    'Spring Boot': ['springboot', 'spring', 'spring framework'],
+    '.NET': ['dotnet', 'asp.net', 'aspnet', '.net core', 'dotnet core', 'asp.net core'],
+    'Ruby on Rails': ['rails', 'ror'],
+    'Laravel': [],
+    'Redis': [],
+    'SQLite': ['sqlite3'],
+    'Elasticsearch': ['elastic search'],
+    'Kafka': ['apache kafka'],
+    'RabbitMQ': ['rabbit mq'],
+    'Azure': ['microsoft azure'],
+    'GCP': ['google cloud', 'google cloud platform'],
+    'Terraform': [],
+    'Ansible': [],
+    'Jenkins': [],
+    'GraphQL': ['gql'],
+    'REST APIs': ['rest', 'rest api', 'restful', 'restful apis'],
+    'Linux': [],
+    'Pandas': [],
+    'NumPy': [],
+    'TensorFlow': ['tensor flow'],
+    'PyTorch': ['torch'],
+    'scikit-learn': ['sklearn', 'scikit learn'],
+    'Apache Spark': ['spark', 'pyspark'],
+    'Hadoop': ['apache hadoop'],
+    'Machine Learning': ['ml'],
+    'Flutter': [],
+    'Dart': [],
+    'React Native': ['reactnative'],
+    # Listed so that they aren't mistaken for a technology one edit away
+    'NestJS': ['nest.js'],
+    'Nuxt.js': ['nuxt', 'nuxtjs'],
+    'Jest': [],
+    'Erlang': [],
+    'Sails.js': ['sails', 'sailsjs'],
+    'Dash': ['plotly dash'],
+}
+
+
+def fold(text):
+    """Fold case and punctuation so that spelling variants share a key"""
+    return re.sub(r'[\s.\-_/]+', '', str(text).lower())
+
+def clean_tech(text):
+    """Tidy a technology name we have no canonical form for"""
+    return re.sub(r'\s+', ' ', str(text)).strip(' \t\'"`*;:')
+
+def edit_distance(a, b, limit):
+    """Damerau-Levenshtein distance between a and b, or limit + 1 if it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev_prev = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev_prev[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev_prev, prev = prev, cur
+    return prev[-1]
+
+
+class TechIndex:
+    """Alias, prefix and typo-tolerant lookup from free-text technology names to canonical ones"""
+
+    def __init__(self, technologies):
+        self._aliases = {}
+        self._by_length = {}
+        for canonical, aliases in technologies.items():
+            for alias in [canonical] + list(aliases):
+                key = fold(alias)
+                if key and key not in self._aliases:
+                    self._aliases[key] = canonical
+                    self._by_length.setdefault(len(key), []).append(key)
+        self._sorted_keys = sorted(self._aliases)
+
+    def _prefix_match(self, key):
+        """Match a key that is an unambiguous prefix of known aliases"""
+        i = bisect.bisect_left(self._sorted_keys, key)
+        matches = set()
+        while i < len(self._sorted_keys) and self._sorted_keys[i].startswith(key):
+            if len(self._sorted_keys[i]) >= MIN_FUZZY_ALIAS_LENGTH:
+                matches.add(self._aliases[self._sorted_keys[i]])
+            i += 1
+        return matches.pop() if len(matches) == 1 else None
+
+    def _typo_match(self, key):
+        """Match a key within a small edit distance of exactly one canonical technology"""
+        limit = 1 if len(key) < 8 else 2
+        best = None
+        best_distance = limit + 1
+        ambiguous = False
+        for length in range(max(len(key) - limit, MIN_FUZZY_ALIAS_LENGTH), len(key) + limit + 1):
+            for candidate in self._by_length.get(length, []):
+                distance = edit_distance(key, candidate, limit)
+                if distance < best_distance:
+                    best, best_distance, ambiguous = self._aliases[candidate], distance, False
+                elif distance == best_distance and best is not None and self._aliases[candidate] != best:
+                    ambiguous = True
+        return None if ambiguous else best
+
+    def lookup(self, text):
+        """Return the canonical name for text, or None if it isn't recognised"""
+        key = fold(text)
+        if not key:
+            return None
+        if key in self._aliases:
+            return self._aliases[key]
+        # Version suffixes such as "Python3" or "Vue 3.4"
+        unversioned = re.sub(r'v?[\d]+$', '', key)
+        if unversioned != key and unversioned in self._aliases:
+            return self._aliases[unversioned]
+        # Short keys are too ambiguous for prefix or typo matching
+        if len(key) < 4:
+            return None
+        return self._prefix_match(key) or self._typo_match(key)
+
+    def canonicalize(self, text):
+        """Return the canonical name for text, or a tidied version of it"""
+        return self.lookup(text) or clean_tech(text)
+
+
+def _load_index():
+    """Build the index once, including any extra aliases from TECH_ALIASES_PATH"""
+    technologies = {name: list(aliases) for name, aliases in CANONICAL_TECHNOLOGIES.items()}
+    path = os.getenv("TECH_ALIASES_PATH")
+    if path:
+        try:
+            with open(path, 'r') as f:
+                for name, aliases in json.load(f).items():
+                    technologies.setdefault(name, []).extend(aliases)
+        except (OSError, ValueError):
+            pass
+    return TechIndex(technologies)
+
+tech_index = _load_index()
+
+@lru_cache(maxsize=4096)
+def canonicalize_tech(text):
+    """Return the canonical name for a single technology"""
+    return tech_index.canonicalize(text)
+
+def parse_tech_stack(user_input, max_items=MAX_TECH_STACK):
+    """Split, canonicalize and de-duplicate a comma-separated tech stack
+
+    Returns the stack capped at max_items and the technologies dropped by the cap.
+    """
+    stack = []
+    seen = set()
+    for item in re.split(r'[,;\n]+', user_input):
+        if not clean_tech(item):
+            continue
+        tech = canonicalize_tech(item)
+        if fold(tech) in seen:
+            continue
+        seen.add(fold(tech))
+        stack.append(tech)
+    return stack[:max_items], stack[max_items:]
@@ -0,0 +1,178 @@
+import json
+import types
+import asyncio
+
+import pytest
+
+import api_server
+from candidate_store import CandidateStore
+from engine import ConversationEngine
+from question_generator import QuestionStream
+from session_backend import MemorySessionBackend
+
+
+def stub_source(tech_stack, years_experience='', email=None):
+    return QuestionStream.completed([{'question': f'{tech} question', 'technology': tech} for tech in tech_stack])
+
+
+def make_service(backend):
+    return api_server.ScreeningService(engine=ConversationEngine(question_source=stub_source), backend=backend)
+
+
+@pytest.fixture(autouse=True)
+def store(tmp_path, monkeypatch):
+    """Finished interviews go to a scratch store and are not graded"""
+    store = CandidateStore(str(tmp_path / 'candidates.db'))
+    monkeypatch.setattr(api_server, 'get_candidate_store', lambda: store)
+    monkeypatch.setattr(api_server, 'get_answer_grader', lambda: types.SimpleNamespace(submit=lambda *args: None))
+    return store
+
+
+@pytest.fixture
+def backend():
+    return MemorySessionBackend()
+
+
+@pytest.fixture
+def service(backend):
+    return make_service(backend)
+
+
+def exchange(service, *requests):
+    """Send raw requests over one connection to a fresh server; returns (status, body) per response"""
+
+    async def run():
+        server = await asyncio.start_server(
+            lambda reader, writer: api_server.handle_connection(service, reader, writer), '127.0.0.1', 0
+        )
+        async with server:
+            reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+            responses = []
+            for raw in requests:
+                writer.write(raw)
+                head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), 5)
+                status = int(head.split(b' ', 2)[1])
+                length = int(head.lower().split(b'content-length: ')[1].split(b'\r\n')[0])
+                body = await reader.readexactly(length)
+                responses.append((status, json.loads(body) if b'json' in head else body.decode()))
+            writer.close()
+            return responses
+
+    return asyncio.run(run())
+
+
+def post(path, body):
+    data = body if isinstance(body, bytes) else json.dumps(body).encode()
+    return f"POST {path} HTTP/1.1\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data
+
+
+def request(method, path):
+    return f"{method} {path} HTTP/1.1\r\n\r\n".encode()
+
+
+def start(service):
+    [(status, body)] = exchange(service, post('/sessions', {}))
+    assert status == 201
+    return body['session_id']
+
+
+CANDIDATE_INPUTS = ['Ann Lee', 'ann@example.com', '+1 555 123 4567', '4', 'Backend Developer', 'Paris', 'Python, Go']
+
+
+def test_interview_runs_over_one_keep_alive_connection(service, store):
+    responses = exchange(service, post('/sessions', {}))
+    session_id = responses[0][1]['session_id']
+    inputs = CANDIDATE_INPUTS + ['answer one', 'answer two']
+
+    responses += exchange(service, *[post(f'/sessions/{session_id}/input', {'input': text}) for text in inputs],
+                          request('GET', f'/sessions/{session_id}'))
+
+    assert [status for status, _ in responses] == [201] + [200] * (len(inputs) + 1)
+    assert responses[0][1]['state'] == 'GREETING'
+    asked = responses[len(CANDIDATE_INPUTS)][1]
+    assert asked['state'] == 'GENERATE_QUESTIONS'
+    assert asked['question'] == {'number': 1, 'total': 2, 'technology': 'Python', 'question': 'Python question'}
+    finished = responses[-2][1]
+    assert finished['completed'] and finished['state'] == 'END' and finished['answered'] == 2
+    store.flush()
+    [record] = store.find()
+    assert record['candidate_info']['tech_stack'] == ['Python', 'Go']
+
+
+def test_invalid_field_is_re_prompted(service):
+    session_id = start(service)
+
+    [(status, body)] = exchange(service, post(f'/sessions/{session_id}/input', {'input': 'A'}))
+
+    assert status == 200
+    assert body['state'] == 'GREETING'
+    assert 'valid name' in body['messages'][0]
+
+
+@pytest.mark.parametrize('body, error', [
+    (b'{not json', "Request body must be JSON"),
+    (b'["a list"]', "Request body must be a JSON object"),
+    (b'{"input": "   "}', "'input' must be a non-empty string"),
+    (b'{"input": 42}', "'input' must be a non-empty string"),
+])
+def test_malformed_input_is_rejected(service, body, error):
+    session_id = start(service)
+
+    [(status, payload)] = exchange(service, post(f'/sessions/{session_id}/input', body))
+
+    assert (status, payload) == (400, {'error': error})
+
+
+@pytest.mark.parametrize('raw, status', [
+    (request('GET', '/sessions'), 405),
+    (request('PUT', '/sessions/abc'), 405),
+    (request('GET', '/sessions/abc/input'), 405),
+    (request('GET', '/nowhere'), 404),
+    (request('GET', '/sessions/' + '0' * 32), 404),
+    (post('/sessions/' + '0' * 32 + '/input', {'input': 'hi'}), 404),
+])
+def test_bad_routes_are_reported(service, raw, status):
+    [(got, body)] = exchange(service, raw)
+
+    assert got == status
+    assert 'error' in body
+
+
+def test_oversized_body_is_rejected(service, monkeypatch):
+    monkeypatch.setattr(api_server, 'API_MAX_BODY_BYTES', 16)
+
+    [(status, body)] = exchange(service, post('/sessions', {'padding': 'x' * 32}))
+
+    assert status == 413
+
+
+def test_ended_session_is_forgotten(service, backend):
+    session_id = start(service)
+
+    [(status, body)] = exchange(service, request('DELETE', f'/sessions/{session_id}'))
+
+    assert status == 200 and body['ended']
+    assert not backend.exists(session_id)
+    [(status, _)] = exchange(service, request('GET', f'/sessions/{session_id}'))
+    assert status == 404
+
+
+def test_another_replica_resumes_from_the_checkpoint(service, backend):
+    session_id = start(service)
+    exchange(service, *[post(f'/sessions/{session_id}/input', {'input': text}) for text in CANDIDATE_INPUTS[:3]])
+
+    replica = make_service(backend)
+    [(status, body)] = exchange(replica, request('GET', f'/sessions/{session_id}'))
+
+    assert status == 200
+    assert body['state'] == 'COLLECT_EXPERIENCE'
+    [(status, body)] = exchange(replica, post(f'/sessions/{session_id}/input', {'input': '4'}))
+    assert body['state'] == 'COLLECT_POSITION'
+
+
+@pytest.mark.parametrize('length', ['-5', 'many'])
+def test_bad_content_length_is_rejected(service, length):
+    [(status, body)] = exchange(service, f"POST /sessions HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode())
+
+    assert status == 400
+    assert body == {'error': "Malformed request"}
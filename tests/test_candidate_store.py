@@ -0,0 +1,79 @@
+import sqlite3
+import threading
+
+import pytest
+
+import candidate_store
+from candidate_store import CandidateStore
+
+
+def record(name, email):
+    return {
+        'candidate_info': {'full_name': name, 'email': email, 'tech_stack': ['Python']},
+        'timestamp': '2026-01-01T10:00:00',
+    }
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(candidate_store, 'STORE_RETRY_SECONDS', 0.01)
+    return CandidateStore(str(tmp_path / 'candidates.db'))
+
+
+def queue_together(store, items):
+    """Queue items while the writer is busy, so they are committed as one batch"""
+    gate = threading.Event()
+    store._queue.put((lambda conn, key, payload: gate.wait(5), None, None, candidate_store.Future()))
+    futures = [store.save(r, session_id) for r, session_id in items]
+    gate.set()
+    store.flush()
+    return futures
+
+
+def test_save_resolves_with_the_candidate_id_once_committed(store):
+    saved = store.save(record('Ann Lee', 'ann@example.com'), 'a' * 32)
+
+    candidate_id = saved.result(timeout=5)
+
+    assert store.get(candidate_id)['candidate_info']['full_name'] == 'Ann Lee'
+
+
+def test_bad_record_does_not_roll_back_the_rest_of_its_batch(store):
+    bad = record('Bad Record', 'bad@example.com')
+    bad['candidate_info']['unserializable'] = {1, 2}
+
+    futures = queue_together(store, [(record('Ann Lee', 'ann@example.com'), 'a' * 32), (bad, 'b' * 32),
+                                     (record('Bo Chen', 'bo@example.com'), 'c' * 32)])
+
+    assert futures[0].result() and futures[2].result()
+    assert isinstance(futures[1].exception(), TypeError)
+    assert isinstance(store.last_error, TypeError)
+    assert sorted(r['candidate_info']['full_name'] for r in store.find()) == ['Ann Lee', 'Bo Chen']
+
+
+def test_locked_writes_are_retried(store, monkeypatch):
+    attempts = []
+    write = store._write
+
+    def flaky(conn, session_id, payload):
+        attempts.append(session_id)
+        if len(attempts) < 3:
+            raise sqlite3.OperationalError("database is locked")
+        return write(conn, session_id, payload)
+
+    monkeypatch.setattr(store, '_write', flaky)
+    saved = store.save(record('Ann Lee', 'ann@example.com'), 'a' * 32)
+
+    assert saved.result(timeout=5)
+    assert len(attempts) == 3
+
+
+def test_write_that_keeps_failing_reports_its_error(store, monkeypatch):
+    def locked(conn, session_id, payload):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(store, '_write', locked)
+    saved = store.save(record('Ann Lee', 'ann@example.com'), 'a' * 32)
+
+    assert isinstance(saved.exception(timeout=5), sqlite3.OperationalError)
+    assert store.find() == []
@@ -0,0 +1,91 @@
+import types
+
+import pytest
+
+import llm_client
+from llm_client import CircuitBreaker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controls the breaker's time.monotonic()"""
+    now = [100.0]
+    monkeypatch.setattr(llm_client, 'time', types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def opened_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=30)
+    for _ in range(3):
+        breaker.record_failure()
+    return breaker
+
+
+def test_breaker_opens_after_threshold_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.allow() and not breaker.is_open()
+
+    breaker.record_failure()
+
+    assert breaker.is_open()
+    assert not breaker.allow()
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert not breaker.is_open()
+
+
+def test_half_open_lets_exactly_one_probe_through(clock):
+    breaker = opened_breaker(clock)
+    clock[0] += 29
+    assert not breaker.allow()
+
+    clock[0] += 1
+    assert not breaker.is_open()
+    assert breaker.allow()
+    assert breaker.is_open()
+    assert not breaker.allow()
+
+
+def test_successful_probe_closes_the_breaker(clock):
+    breaker = opened_breaker(clock)
+    clock[0] += 30
+    assert breaker.allow()
+
+    breaker.record_success()
+
+    assert not breaker.is_open()
+    assert breaker.allow() and breaker.allow()
+
+
+def test_failed_probe_reopens_for_another_reset_period(clock):
+    breaker = opened_breaker(clock)
+    clock[0] += 30
+    assert breaker.allow()
+
+    breaker.record_failure()
+
+    assert breaker.is_open()
+    clock[0] += 29
+    assert not breaker.allow()
+    clock[0] += 1
+    assert breaker.allow()
+
+
+def test_cancelled_probe_lets_the_next_call_probe(clock):
+    breaker = opened_breaker(clock)
+    clock[0] += 30
+    assert breaker.allow()
+
+    breaker.cancel_probe()
+
+    assert breaker.allow()
+    assert not breaker.allow()
@@ -0,0 +1,196 @@
+import pytest
+
+from engine import FIELD_STEPS, STATES, ConversationEngine, Session
+from question_generator import QuestionStream
+
+CANDIDATE = {
+    'full_name': 'Ann Lee',
+    'email': 'ann@example.com',
+    'phone': '+1 555 123 4567',
+    'years_experience': '4',
+    'desired_position': 'Backend Developer',
+    'current_location': 'Paris, France',
+}
+
+
+class StubSource:
+    """question_source that records its calls and serves two questions per technology at once"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, tech_stack, years_experience='', email=None):
+        self.calls.append((list(tech_stack), years_experience, email))
+        return QuestionStream.completed([{'question': f'{tech} question {i + 1}', 'technology': tech}
+                                         for tech in tech_stack for i in range(2)])
+
+
+@pytest.fixture
+def source():
+    return StubSource()
+
+
+@pytest.fixture
+def engine(source):
+    return ConversationEngine(question_source=source)
+
+
+def session_at(state, **info):
+    session = Session()
+    session.state = state
+    session.candidate_info.update(info)
+    return session
+
+
+@pytest.mark.parametrize('state, user_input, field, next_state', [
+    ('GREETING', 'Ann Lee', 'full_name', 'COLLECT_EMAIL'),
+    ('COLLECT_NAME', 'Ann Lee', 'full_name', 'COLLECT_EMAIL'),
+    ('COLLECT_EMAIL', 'ann@example.com', 'email', 'COLLECT_PHONE'),
+    ('COLLECT_PHONE', '+1 (555) 123-4567', 'phone', 'COLLECT_EXPERIENCE'),
+    ('COLLECT_EXPERIENCE', '5.5', 'years_experience', 'COLLECT_POSITION'),
+    ('COLLECT_POSITION', 'Backend Developer', 'desired_position', 'COLLECT_LOCATION'),
+    ('COLLECT_LOCATION', 'Paris, France', 'current_location', 'COLLECT_TECH_STACK'),
+])
+def test_valid_field_is_recorded_and_advances(engine, state, user_input, field, next_state):
+    session = session_at(state)
+
+    result = engine.step(session, f'  {user_input} ')
+
+    assert session.candidate_info[field] == user_input
+    assert session.state == result.state == next_state
+    assert not result.completed and result.answer is None
+
+
+def test_field_steps_cover_the_collection_states_in_order():
+    assert [step[2] for step in FIELD_STEPS.values()] == \
+        ['COLLECT_EMAIL', 'COLLECT_EMAIL', 'COLLECT_PHONE', 'COLLECT_EXPERIENCE',
+         'COLLECT_POSITION', 'COLLECT_LOCATION', 'COLLECT_TECH_STACK']
+    assert all(state in STATES for state in FIELD_STEPS)
+
+
+@pytest.mark.parametrize('state, user_input, error', [
+    ('GREETING', 'A', "valid name"),
+    ('COLLECT_EMAIL', 'ann@example', "valid email"),
+    ('COLLECT_PHONE', '555-1234', "at least 10 digits"),
+    ('COLLECT_PHONE', 'call me maybe 1234567890', "at least 10 digits"),
+    ('COLLECT_EXPERIENCE', 'five', "valid number"),
+    ('COLLECT_EXPERIENCE', '51', "0-50"),
+    ('COLLECT_EXPERIENCE', '-1', "0-50"),
+    ('COLLECT_POSITION', 'x', "valid position"),
+    ('COLLECT_LOCATION', 'x', "valid location"),
+    ('COLLECT_TECH_STACK', ' , ', "at least one technology"),
+])
+def test_invalid_input_re_prompts_without_advancing(engine, source, state, user_input, error):
+    session = session_at(state)
+    before = dict(session.candidate_info)
+
+    result = engine.step(session, user_input)
+
+    assert session.state == result.state == state
+    assert error in result.messages[0]
+    assert session.candidate_info == before
+    assert source.calls == []
+
+
+@pytest.mark.parametrize('user_input', ['exit', ' Quit ', 'BYE', 'goodbye', 'stop', 'end'])
+@pytest.mark.parametrize('state', ['GREETING', 'COLLECT_PHONE', 'GENERATE_QUESTIONS'])
+def test_exit_keywords_end_the_conversation_from_any_state(engine, state, user_input):
+    session = session_at(state, full_name='Ann Lee')
+
+    result = engine.step(session, user_input)
+
+    assert session.state == result.state == 'END'
+    assert session.ended and not result.completed
+    assert 'Ann Lee' in result.messages[0]
+
+
+def test_exit_keyword_must_be_the_whole_input(engine):
+    session = session_at('COLLECT_POSITION')
+
+    engine.step(session, 'Stop-motion animator')
+
+    assert session.state == 'COLLECT_LOCATION'
+    assert not session.ended
+
+
+def test_tech_stack_starts_generation_and_asks_the_first_question(engine, source):
+    session = session_at('COLLECT_TECH_STACK', **CANDIDATE)
+
+    result = engine.step(session, 'Python, Go')
+
+    assert source.calls == [(['Python', 'Go'], '4', 'ann@example.com')]
+    assert session.state == result.state == 'GENERATE_QUESTIONS'
+    assert session.candidate_info['tech_stack'] == ['Python', 'Go']
+    assert "I'll ask you 4 questions" in result.messages[0]
+    assert 'Python question 1' in result.messages[1]
+
+
+def test_answers_are_recorded_until_the_interview_completes(engine):
+    session = session_at('COLLECT_TECH_STACK', **CANDIDATE)
+    engine.step(session, 'Python, Go')
+
+    results = [engine.step(session, f'answer {i}') for i in range(4)]
+
+    assert [r.completed for r in results] == [False, False, False, True]
+    assert [a['question'] for a in session.user_answers] == \
+        ['Python question 1', 'Python question 2', 'Go question 1', 'Go question 2']
+    assert results[-1].answer == {'question': 'Go question 2', 'answer': 'answer 3', 'technology': 'Go'}
+    assert session.state == 'END' and session.ended
+    assert 'ann@example.com' in results[-1].messages[0]
+
+
+def test_done_completes_the_interview_early(engine):
+    session = session_at('COLLECT_TECH_STACK', **CANDIDATE)
+    engine.step(session, 'Python')
+    engine.step(session, 'answer 0')
+
+    result = engine.step(session, 'done')
+
+    assert result.completed and result.answer is None
+    assert len(session.user_answers) == 1
+
+
+def test_unknown_state_asks_for_the_requested_details(engine):
+    session = session_at('END')
+
+    result = engine.step(session, 'hello?')
+
+    assert session.state == 'END'
+    assert 'requested details' in result.messages[0]
+
+
+def test_invite_starts_at_the_first_question(engine, source):
+    session = engine.invite(CANDIDATE, ['Rust'], session_id='f' * 32)
+
+    assert session.session_id == 'f' * 32
+    assert session.state == 'GENERATE_QUESTIONS'
+    assert session.current_question == {'question': 'Rust question 1', 'technology': 'Rust'}
+    assert source.calls == [(['Rust'], '4', 'ann@example.com')]
+
+    result = engine.step(session, 'my answer')
+    assert result.answer['question'] == 'Rust question 1'
+
+
+def test_checkpoint_round_trip_resumes_mid_interview(engine, source):
+    session = session_at('COLLECT_TECH_STACK', **CANDIDATE)
+    engine.step(session, 'Python, Go')
+    engine.step(session, 'answer 0')
+
+    resumed = Session.from_dict(session.to_dict(), question_source=source)
+
+    assert resumed.to_dict() == session.to_dict()
+    assert resumed.current_question == {'question': 'Python question 2', 'technology': 'Python'}
+    assert len(source.calls) == 1
+    assert engine.step(resumed, 'answer 1').answer['question'] == 'Python question 2'
+
+
+def test_resume_before_generation_finished_starts_it_again(source):
+    session = session_at('GENERATE_QUESTIONS', **CANDIDATE, tech_stack=['Go'])
+    session.question_stream = QuestionStream(6)
+    data = session.to_dict()
+    assert data['questions_done'] is False
+
+    resumed = Session.from_dict(data, question_source=source)
+
+    assert source.calls == [(['Go'], '4', 'ann@example.com')]
+    assert resumed.total_questions() == 2
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from json_stream import JsonArrayStreamParser
+
+QUESTIONS = [
+    {"question": "What does {} mean in a \"format\" string?", "technology": "Python"},
+    {"question": "Explain [brackets] and the \\ escape", "technology": "Go", "meta": {"tier": "senior"}},
+    {"question": "Why ]? Because }", "technology": "Rust"},
+]
+
+TEXT = 'Here are your questions:\n' + json.dumps(QUESTIONS, indent=2) + '\nGood luck!'
+
+
+def feed_all(chunks):
+    parser = JsonArrayStreamParser()
+    objects = []
+    for chunk in chunks:
+        objects += parser.feed(chunk)
+    return parser, objects
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 64, len(TEXT)])
+def test_objects_survive_any_chunk_boundary(size):
+    parser, objects = feed_all(TEXT[i:i + size] for i in range(0, len(TEXT), size))
+
+    assert objects == QUESTIONS
+    assert parser.finished
+
+
+def test_each_object_is_returned_as_soon_as_it_closes():
+    parser = JsonArrayStreamParser()
+    first = json.dumps(QUESTIONS[0])
+
+    assert parser.feed('[' + first[:-1]) == []
+    assert parser.feed('}, {"question": "Next') == [QUESTIONS[0]]
+    assert not parser.finished
+
+
+def test_input_after_the_array_is_ignored():
+    parser, objects = feed_all(['[{"a": 1}]', ', {"b": 2}]'])
+
+    assert objects == [{"a": 1}]
+    assert parser.finished
+    assert parser.feed('{"c": 3}') == []
+
+
+def test_malformed_objects_are_skipped():
+    _, objects = feed_all(['[{"a": 1}, {"b": tru', 'e}, {"c": }, {"d": 4}]'])
+
+    assert objects == [{"a": 1}, {"b": True}, {"d": 4}]
+
+
+def test_text_without_an_array_yields_nothing():
+    parser, objects = feed_all(['{"a": 1}', ' no array here'])
+
+    assert objects == []
+    assert not parser.finished
+
+
+def test_truncated_stream_yields_only_complete_objects():
+    parser, objects = feed_all(['[{"a": 1}, {"b": "unterminated'])
+
+    assert objects == [{"a": 1}]
+    assert not parser.finished
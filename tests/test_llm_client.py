@@ -0,0 +1,88 @@
+import types
+
+import pytest
+
+pytest.importorskip('httpx')
+pytest.importorskip('openai')
+
+import llm_client
+from llm_client import CircuitBreaker, DeadlineStream
+from llm_scheduler import LLMScheduler
+
+
+class FakeResponse:
+    """Yields chunks, advancing the clock by step seconds before each one"""
+
+    def __init__(self, clock, chunks, step=1.0, error=None):
+        self.clock = clock
+        self.chunks = chunks
+        self.step = step
+        self.error = error
+        self.closed = False
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            self.clock[0] += self.step
+            yield chunk
+        if self.error:
+            raise self.error
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(llm_client, 'time', types.SimpleNamespace(monotonic=lambda: now[0], sleep=lambda s: None))
+    return now
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+    monkeypatch.setattr(llm_client, 'breaker', breaker)
+    return breaker
+
+
+def test_stream_within_the_deadline_is_passed_through(clock, breaker):
+    response = FakeResponse(clock, ['a', 'b', 'c'])
+
+    assert list(DeadlineStream(response, deadline=110)) == ['a', 'b', 'c']
+    assert not breaker.is_open() and not response.closed
+
+
+def test_stream_is_cut_off_at_the_deadline(clock, breaker):
+    from openai import APITimeoutError
+    response = FakeResponse(clock, ['a', 'b', 'c', 'd'], step=4.0)
+    received = []
+
+    with pytest.raises(APITimeoutError):
+        for chunk in DeadlineStream(response, deadline=110):
+            received.append(chunk)
+
+    assert received == ['a', 'b']
+    assert response.closed
+    assert breaker.is_open()
+
+
+def test_mid_stream_failure_counts_against_the_breaker(clock, breaker):
+    response = FakeResponse(clock, ['a'], error=ConnectionResetError("peer went away"))
+
+    with pytest.raises(ConnectionResetError):
+        list(DeadlineStream(response, deadline=110))
+
+    assert response.closed
+    assert breaker.is_open()
+
+
+def test_streamed_chat_completion_carries_the_call_deadline(clock, breaker, monkeypatch):
+    response = FakeResponse(clock, ['a'])
+    create = types.SimpleNamespace(create=lambda **kwargs: response)
+    monkeypatch.setattr(llm_client, 'get_client', lambda: types.SimpleNamespace(chat=types.SimpleNamespace(completions=create)))
+    monkeypatch.setattr(llm_client, 'get_scheduler', lambda: LLMScheduler(rpm=0, tpm=0))
+
+    stream = llm_client.chat_completion(deadline=105, messages=[], stream=True)
+
+    assert isinstance(stream, DeadlineStream) and stream.deadline == 105
+    assert list(stream) == ['a']
@@ -0,0 +1,113 @@
+import time
+import asyncio
+import threading
+
+import pytest
+
+from llm_scheduler import BACKGROUND, INTERACTIVE, LLMScheduler, QueueTimeout
+
+
+def exhausted_scheduler(rpm=600, debt=5):
+    """A scheduler whose request bucket is debt requests short, so calls queue"""
+    scheduler = LLMScheduler(rpm=rpm, tpm=0)
+    scheduler.requests.tokens = -debt
+    scheduler.requests.updated = time.monotonic()
+    return scheduler
+
+
+def wait_for_depth(scheduler, depth, timeout=5):
+    deadline = time.monotonic() + timeout
+    while scheduler.queue_depth() < depth:
+        assert time.monotonic() < deadline, "calls never queued"
+        time.sleep(0.005)
+
+
+def test_interactive_calls_are_admitted_before_queued_background_work():
+    scheduler = exhausted_scheduler()
+    admitted = []
+
+    def call(name, priority):
+        scheduler.acquire(10, priority=priority, deadline=time.monotonic() + 10)
+        admitted.append(name)
+
+    threads = []
+    for name, priority in [('bulk-1', BACKGROUND), ('bulk-2', BACKGROUND), ('live-1', INTERACTIVE), ('live-2', INTERACTIVE)]:
+        thread = threading.Thread(target=call, args=(name, priority))
+        thread.start()
+        threads.append(thread)
+        wait_for_depth(scheduler, len(threads))
+    for thread in threads:
+        thread.join()
+
+    assert admitted == ['live-1', 'live-2', 'bulk-1', 'bulk-2']
+    assert scheduler.queue_depth() == 0
+
+
+def test_call_that_misses_its_deadline_raises_and_leaves_the_queue():
+    scheduler = exhausted_scheduler(debt=100)
+
+    started = time.monotonic()
+    with pytest.raises(QueueTimeout):
+        scheduler.acquire(10, deadline=started + 0.05)
+
+    assert time.monotonic() - started < 1
+    assert scheduler.queue_depth() == 0
+
+
+def test_timed_out_head_does_not_block_the_calls_behind_it():
+    scheduler = exhausted_scheduler(debt=1)
+    errors = []
+
+    def head():
+        try:
+            scheduler.acquire(10, deadline=time.monotonic() + 0.02)
+        except QueueTimeout as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=head)
+    thread.start()
+    wait_for_depth(scheduler, 1)
+    scheduler.acquire(10, priority=BACKGROUND, deadline=time.monotonic() + 5)
+    thread.join()
+
+    assert len(errors) == 1
+    assert scheduler.queue_depth() == 0
+
+
+def test_calls_within_the_limits_are_admitted_immediately():
+    scheduler = LLMScheduler(rpm=600, tpm=100_000)
+
+    started = time.monotonic()
+    for _ in range(5):
+        scheduler.acquire(100, deadline=started + 0.5)
+
+    assert time.monotonic() - started < 0.5
+
+
+def test_disabled_scheduler_never_waits():
+    scheduler = LLMScheduler(rpm=0, tpm=0)
+
+    scheduler.acquire(10**9, deadline=time.monotonic())
+
+    assert scheduler.estimated_wait() == 0.0
+
+
+def test_cancelled_async_call_leaves_the_queue():
+    # About ten seconds before the call could be admitted
+    scheduler = exhausted_scheduler(rpm=600, debt=100)
+
+    async def cancel_while_queued():
+        task = asyncio.create_task(scheduler.acquire_async(10, deadline=time.monotonic() + 60))
+        while scheduler.queue_depth() == 0:
+            await asyncio.sleep(0.005)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        deadline = time.monotonic() + 1
+        while scheduler.queue_depth() and time.monotonic() < deadline:
+            await asyncio.sleep(0.005)
+        return scheduler.queue_depth()
+
+    assert asyncio.run(cancel_while_queued()) == 0
@@ -0,0 +1,85 @@
+import builtins
+import sys
+import threading
+
+import metrics
+
+
+def without_pyinstrument(monkeypatch):
+    real_import = builtins.__import__
+
+    def fake_import(name, *args, **kwargs):
+        if name == 'pyinstrument':
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.delitem(sys.modules, 'pyinstrument', raising=False)
+    monkeypatch.setattr(builtins, '__import__', fake_import)
+
+
+def test_metrics_file_write_failure_keeps_the_writer_running(tmp_path, monkeypatch):
+    attempts = []
+
+    def write_once(path):
+        attempts.append(path)
+        if len(attempts) == 3:
+            raise SystemExit
+        raise OSError('disk full')
+
+    monkeypatch.setattr(metrics, '_write_metrics_once', write_once)
+    monkeypatch.setattr(metrics.time, 'sleep', lambda seconds: None)
+    try:
+        metrics._write_metrics_file(str(tmp_path / 'metrics.prom'), 15)
+    except SystemExit:
+        pass
+
+    assert len(attempts) == 3
+
+
+def test_metrics_file_is_replaced_atomically(tmp_path):
+    path = tmp_path / 'metrics.prom'
+    metrics._write_metrics_once(str(path))
+
+    assert path.read_text() == metrics.registry.render()
+    assert not (tmp_path / 'metrics.prom.tmp').exists()
+
+
+def test_concurrent_profiles_run_one_at_a_time(tmp_path, monkeypatch):
+    without_pyinstrument(monkeypatch)
+    monkeypatch.setenv('PROFILE_DIR', str(tmp_path))
+    inside, release = threading.Event(), threading.Event()
+    errors = []
+
+    def profile_first():
+        try:
+            with metrics.profiled(True, 'first'):
+                inside.set()
+                release.wait(5)
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=profile_first)
+    thread.start()
+    assert inside.wait(5)
+    with metrics.profiled(True, 'second'):
+        total = sum(range(1000))
+    release.set()
+    thread.join()
+
+    assert total == 499500 and errors == []
+    assert [p.name.split('_')[0] for p in tmp_path.iterdir()] == ['first']
+    with metrics.profiled(True, 'third'):
+        pass
+    assert sorted(p.name.split('_')[0] for p in tmp_path.iterdir()) == ['first', 'third']
+
+
+def test_unwritable_profile_does_not_fail_the_block(tmp_path, monkeypatch):
+    without_pyinstrument(monkeypatch)
+    blocker = tmp_path / 'not_a_dir'
+    blocker.write_text('')
+    monkeypatch.setenv('PROFILE_DIR', str(blocker / 'profiles'))
+
+    with metrics.profiled(True, 'render'):
+        pass
+
+    assert not metrics._profile_lock.locked()
@@ -0,0 +1,134 @@
+import json
+import types
+
+import pytest
+
+import question_cache
+from question_cache import CACHE_VERSION, QuestionCache
+
+TOPICS = [
+    "How does reference counting interact with the cycle collector?",
+    "When would you pick a process pool over threads for CPU-bound work?",
+    "Write a decorator that retries a flaky call with exponential backoff.",
+    "Explain how an async generator is closed if its consumer stops early.",
+    "What problem do metaclasses solve that class decorators cannot?",
+    "Describe how a descriptor's __get__ is found during attribute lookup.",
+]
+
+
+def questions(tech, *topics):
+    return [{'question': f"{topic} ({tech})", 'technology': tech} for topic in topics]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controls the cache's time.time()"""
+    now = [1_000_000.0]
+    monkeypatch.setattr(question_cache, 'time', types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'question_cache.json')
+
+
+def test_least_recently_used_pool_is_evicted(path, clock):
+    cache = QuestionCache(path, max_entries=2)
+    cache.add('Python', 'mid', questions('Python', *TOPICS[:3]))
+    cache.add('Go', 'mid', questions('Go', *TOPICS[:3]))
+    assert cache.get('Python', 'mid')
+
+    cache.add('Rust', 'mid', questions('Rust', *TOPICS[:3]))
+
+    assert cache.get('Go', 'mid') is None
+    assert cache.get('Python', 'mid')
+    assert cache.get('Rust', 'mid')
+
+
+def test_pools_are_keyed_by_normalized_tech_and_band(path, clock):
+    cache = QuestionCache(path)
+    cache.add('  Python ', 'mid', questions('Python', *TOPICS[:3]))
+
+    assert len(cache.get('python', 'mid')) == 3
+    assert cache.get('Python', 'senior') is None
+
+
+def test_pool_keeps_the_newest_pool_size_questions(path, clock):
+    cache = QuestionCache(path, pool_size=4)
+    cache.add('Python', 'mid', questions('Python', *TOPICS[:3]))
+    cache.add('Python', 'mid', questions('Python', *TOPICS[3:6]))
+
+    assert cache.get('Python', 'mid') == questions('Python', *TOPICS[2:6])
+
+
+def test_expired_pool_is_a_miss(path, clock):
+    cache = QuestionCache(path, ttl_seconds=60)
+    cache.add('Python', 'mid', questions('Python', *TOPICS[:3]))
+
+    clock[0] += 59
+    assert cache.get('Python', 'mid')
+    clock[0] += 1
+    assert cache.get('Python', 'mid') is None
+    assert cache.sample('Python', 'mid', 3) is None
+
+
+def test_pools_persist_across_instances(path, clock):
+    QuestionCache(path).add('Python', 'mid', questions('Python', *TOPICS[:3]))
+
+    assert QuestionCache(path).get('Python', 'mid') == questions('Python', *TOPICS[:3])
+
+
+def test_load_drops_expired_pools_and_keeps_the_most_recent(path, clock):
+    cache = QuestionCache(path, ttl_seconds=60)
+    cache.add('Python', 'mid', questions('Python', *TOPICS[:3]))
+    clock[0] += 30
+    cache.add('Go', 'mid', questions('Go', *TOPICS[:3]))
+    cache.add('Rust', 'mid', questions('Rust', *TOPICS[:3]))
+    clock[0] += 31
+
+    reloaded = QuestionCache(path, ttl_seconds=60, max_entries=1)
+
+    assert reloaded.get('Python', 'mid') is None
+    assert reloaded.get('Go', 'mid') is None
+    assert reloaded.get('Rust', 'mid')
+
+
+@pytest.mark.parametrize('content', ['not json', json.dumps({'version': CACHE_VERSION + 1, 'entries': []})])
+def test_unreadable_or_other_version_file_starts_empty(path, clock, content):
+    with open(path, 'w') as f:
+        f.write(content)
+
+    assert QuestionCache(path).get('Python', 'mid') is None
+
+
+def test_save_replaces_the_file_through_a_tmp_file(path, clock, tmp_path, monkeypatch):
+    replaced = []
+    real_replace = question_cache.os.replace
+
+    def replace(src, dst):
+        replaced.append((src, dst))
+        real_replace(src, dst)
+
+    monkeypatch.setattr(question_cache.os, 'replace', replace)
+    QuestionCache(path).add('Python', 'mid', questions('Python', *TOPICS[:3]))
+
+    assert replaced == [(f"{path}.tmp", path)]
+    assert [p.name for p in tmp_path.iterdir()] == ['question_cache.json']
+
+
+def test_failed_save_leaves_the_previous_file_intact(path, clock, monkeypatch):
+    QuestionCache(path).add('Python', 'mid', questions('Python', *TOPICS[:3]))
+    with open(path) as f:
+        before = f.read()
+
+    def replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(question_cache.os, 'replace', replace)
+    cache = QuestionCache(path)
+    cache.add('Go', 'mid', questions('Go', *TOPICS[:3]))
+
+    assert cache.get('Go', 'mid')
+    with open(path) as f:
+        assert f.read() == before
@@ -0,0 +1,163 @@
+import pytest
+import question_generator
+from llm_scheduler import BACKGROUND, INTERACTIVE
+from question_cache import QuestionCache
+from question_generator import QUESTIONS_PER_TECH, QuestionStream
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = QuestionCache(str(tmp_path / 'cache.json'))
+    monkeypatch.setattr(question_generator, 'get_question_cache', lambda: cache)
+    monkeypatch.setattr(question_generator, 'get_question_bank', lambda: None)
+    return cache
+
+def test_under_filled_cached_pool_is_a_miss(cache, monkeypatch):
+    monkeypatch.setattr(question_generator, 'USE_LIVE_QUESTIONS', False)
+    cache.add('Python', 'mid', [{'question': 'How does the GIL affect CPU-bound threads?', 'technology': 'Python'}])
+
+    stream = question_generator._start_stream(['Python'], 'mid', INTERACTIVE)
+
+    assert stream.done
+    assert stream.total() == QUESTIONS_PER_TECH
+
+def test_full_cached_pool_is_served(cache, monkeypatch):
+    monkeypatch.setattr(question_generator, 'USE_LIVE_QUESTIONS', False)
+    pooled = [{'question': text, 'technology': 'Go'} for text in (
+        'How would you find a goroutine leak in production?',
+        'When would you choose a buffered channel over an unbuffered one?',
+        'How does the Go scheduler decide which goroutine runs next?',
+    )]
+    cache.add('Go', 'mid', pooled)
+
+    stream = question_generator._start_stream(['Go'], 'mid', INTERACTIVE)
+
+    assert sorted(q['question'] for q in stream.questions) == sorted(q['question'] for q in pooled)
+
+def test_partial_generation_is_topped_up_but_not_cached(cache, monkeypatch):
+    def cut_off(tech_stack, band, on_question, priority):
+        on_question('Rust', {'question': 'How does the borrow checker prevent data races?', 'technology': 'Rust'})
+        raise TimeoutError("stream cut off")
+
+    monkeypatch.setattr(question_generator, 'QUESTION_GENERATION_MODE', 'batch')
+    monkeypatch.setattr(question_generator, 'stream_ai_questions', cut_off)
+    stream = QuestionStream(QUESTIONS_PER_TECH)
+
+    question_generator._generate_missing(stream, question_generator._StackOrder(stream, ['Rust']), ['Rust'], 'mid', INTERACTIVE)
+
+    assert stream.done and stream.error
+    assert len(stream.questions) == QUESTIONS_PER_TECH
+    assert cache.get('Rust', 'mid') is None
+
+def test_complete_generation_is_cached(cache, monkeypatch):
+    texts = [
+        'How would you design an error type for a library crate?',
+        'When is it worth reaching for unsafe code?',
+        'How do lifetimes interact with async functions?',
+    ]
+
+    def complete(tech_stack, band, on_question, priority):
+        for text in texts:
+            on_question('Rust', {'question': text, 'technology': 'Rust'})
+
+    monkeypatch.setattr(question_generator, 'QUESTION_GENERATION_MODE', 'batch')
+    monkeypatch.setattr(question_generator, 'stream_ai_questions', complete)
+    stream = QuestionStream(QUESTIONS_PER_TECH)
+
+    question_generator._generate_missing(stream, question_generator._StackOrder(stream, ['Rust']), ['Rust'], 'mid', INTERACTIVE)
+
+    assert stream.error is None
+    assert sorted(q['question'] for q in cache.get('Rust', 'mid')) == sorted(texts)
+
+def test_offline_questions_fill_a_full_share():
+    questions = question_generator.get_offline_questions('Elixir', 'mid')
+    assert len(questions) == QUESTIONS_PER_TECH
+
+STACK_QUESTIONS = {
+    'Python': ['How does the GIL affect CPU-bound threads?',
+               'When would you reach for a dataclass over a namedtuple?',
+               'How do you profile a slow Django view?'],
+    'Django': ['How does the ORM avoid N+1 queries with select_related?',
+               'When would you write a custom middleware?',
+               'How do Django migrations handle a renamed column?'],
+    'Go': ['How would you find a goroutine leak in production?',
+           'When would you choose a buffered channel over an unbuffered one?',
+           'How does the Go scheduler decide which goroutine runs next?'],
+}
+
+def stack_question(tech, i):
+    return {'question': STACK_QUESTIONS[tech][i], 'technology': tech}
+
+def test_questions_follow_stack_order_around_cache_hits(cache, monkeypatch):
+    cache.add('Django', 'mid', [stack_question('Django', i) for i in range(3)])
+
+    def interleaved(tech_stack, band, on_question, priority):
+        assert tech_stack == ['Python', 'Go']
+        for i in range(3):
+            on_question('Go', stack_question('Go', i))
+            on_question('Python', stack_question('Python', i))
+
+    monkeypatch.setattr(question_generator, 'USE_LIVE_QUESTIONS', True)
+    monkeypatch.setattr(question_generator, 'QUESTION_GENERATION_MODE', 'batch')
+    monkeypatch.setattr(question_generator, 'stream_ai_questions', interleaved)
+
+    stream = question_generator._start_stream(['Python', 'Django', 'Go'], 'mid', INTERACTIVE)
+
+    assert stream.wait(5) and stream.error is None
+    assert [q['technology'] for q in stream.questions] == ['Python'] * 3 + ['Django'] * 3 + ['Go'] * 3
+
+def test_leading_cache_hit_is_served_before_generation_finishes(cache, monkeypatch):
+    cache.add('Django', 'mid', [stack_question('Django', i) for i in range(3)])
+    started = question_generator.threading.Event()
+    release = question_generator.threading.Event()
+
+    def slow(tech_stack, band, on_question, priority):
+        started.set()
+        release.wait(5)
+        for i in range(3):
+            on_question('Go', stack_question('Go', i))
+
+    monkeypatch.setattr(question_generator, 'USE_LIVE_QUESTIONS', True)
+    monkeypatch.setattr(question_generator, 'QUESTION_GENERATION_MODE', 'batch')
+    monkeypatch.setattr(question_generator, 'stream_ai_questions', slow)
+
+    stream = question_generator._start_stream(['Django', 'Go'], 'mid', INTERACTIVE)
+    started.wait(5)
+    try:
+        assert [q['technology'] for q in stream.questions] == ['Django'] * 3
+        assert not stream.done
+    finally:
+        release.set()
+    assert stream.wait(5)
+    assert [q['technology'] for q in stream.questions] == ['Django'] * 3 + ['Go'] * 3
+
+def test_seen_questions_are_replaced_in_stack_order(cache, monkeypatch):
+    source = QuestionStream.completed([stack_question(tech, i) for tech in ('Python', 'Go') for i in range(3)])
+    monkeypatch.setattr(question_generator, 'get_local_pool',
+                        lambda tech, band: [{'question': f'A fresh question about {tech} internals and tooling',
+                                             'technology': tech}])
+    filters = {key: question_generator.QuestionFilter(texts) for key, texts in
+               {'python': [STACK_QUESTIONS['Python'][0]], 'go': []}.items()}
+    stream = QuestionStream(6)
+
+    question_generator._forward_unseen(source, stream, ['Python', 'Go'], 'mid', filters)
+
+    assert [q['technology'] for q in stream.questions] == ['Python'] * 3 + ['Go'] * 3
+    assert stream.questions[2]['question'] == 'A fresh question about Python internals and tooling'
+
+def test_live_candidate_does_not_join_a_background_generation(monkeypatch):
+    started = []
+
+    def start_stream(tech_stack, band, priority):
+        started.append(priority)
+        return QuestionStream(QUESTIONS_PER_TECH)
+
+    monkeypatch.setattr(question_generator, '_start_stream', start_stream)
+    monkeypatch.setattr(question_generator, '_inflight_generations', question_generator.SingleFlight())
+
+    bulk = question_generator.start_question_generation(['Go'], '4', priority=BACKGROUND)
+    live = question_generator.start_question_generation(['go'], '4', priority=INTERACTIVE)
+    again = question_generator.start_question_generation(['Go'], '3', priority=INTERACTIVE)
+
+    assert live is not bulk and again is live
+    assert started == [BACKGROUND, INTERACTIVE]
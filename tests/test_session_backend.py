@@ -0,0 +1,72 @@
+from engine import ChatMessage, Session
+from question_generator import QuestionStream
+from session_backend import MemorySessionBackend, SqliteSessionBackend, checkpoint_session, load_session
+
+
+def interviewed_session():
+    session = Session()
+    session.state = 'GENERATE_QUESTIONS'
+    session.candidate_info.update(full_name='Ann Lee', tech_stack=['Python'])
+    session.history = [ChatMessage('bot', 'Hello!', 1), ChatMessage('user', 'Ann Lee', 2)]
+    session.has_bot_message = True
+    return session
+
+
+def test_checkpoint_after_eviction_keeps_the_flushed_checkpoint():
+    backend = MemorySessionBackend()
+    session = interviewed_session()
+    checkpoint_session(session, backend)
+
+    session.release()
+    checkpoint_session(session, backend)
+
+    assert backend.load(session.session_id)['candidate_info']['full_name'] == 'Ann Lee'
+    assert len(backend.messages(session.session_id)) == 2
+
+
+def test_ended_or_saved_sessions_are_not_checkpointed():
+    backend = MemorySessionBackend()
+    ended, saved = interviewed_session(), interviewed_session()
+    ended.ended = True
+    saved.record_saved = True
+
+    checkpoint_session(ended, backend)
+    checkpoint_session(saved, backend)
+
+    assert not backend.exists(ended.session_id)
+    assert not backend.exists(saved.session_id)
+
+
+def test_sqlite_checkpoint_resumes_in_another_process(tmp_path):
+    path = str(tmp_path / 'sessions.db')
+    session = interviewed_session()
+    session.question_stream = QuestionStream.completed([{'question': 'What is the GIL?', 'technology': 'Python'},
+                                                        {'question': 'What is a wheel?', 'technology': 'Python'}])
+    session.current_question_num = 1
+    session.user_answers = [{'question': 'What is the GIL?', 'answer': 'A lock', 'technology': 'Python'}]
+    checkpoint_session(session, SqliteSessionBackend(path))
+    session.history.append(ChatMessage('bot', 'What is a wheel?', 3))
+    checkpoint_session(session, SqliteSessionBackend(path))
+
+    # A fresh connection, as another replica would open
+    resumed = load_session(session.session_id, 2, SqliteSessionBackend(path))
+
+    assert resumed.to_dict() == session.to_dict()
+    assert resumed.current_question == {'question': 'What is a wheel?', 'technology': 'Python'}
+    assert resumed.history == session.history[-2:]
+    assert resumed.history_offset == 1 and resumed.checkpointed == 3
+
+
+def test_repeated_checkpoint_does_not_duplicate_messages(tmp_path):
+    backend = SqliteSessionBackend(str(tmp_path / 'sessions.db'))
+    session = interviewed_session()
+    checkpoint_session(session, backend)
+    session.checkpointed = 0
+
+    checkpoint_session(session, backend)
+
+    assert [m[1] for m in backend.messages(session.session_id)] == ['Hello!', 'Ann Lee']
+
+
+def test_unknown_session_is_not_resumed(tmp_path):
+    assert load_session('0' * 32, 10, SqliteSessionBackend(str(tmp_path / 'sessions.db'))) is None
@@ -0,0 +1,82 @@
+import os
+import time
+
+import pytest
+
+from answer_journal import AnswerJournal
+from engine import Session
+from session_backend import MemorySessionBackend, SqliteSessionBackend
+from session_registry import SessionRegistry
+
+OLD = 'a' * 32
+NEW = 'b' * 32
+
+
+def checkpoint(state):
+    session = Session()
+    session.state = state
+    return session.to_dict()
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def backend(request, tmp_path):
+    if request.param == 'memory':
+        return MemorySessionBackend()
+    return SqliteSessionBackend(str(tmp_path / 'sessions.db'))
+
+
+def test_backend_expire_deletes_only_sessions_saved_before_cutoff(backend):
+    backend.save(OLD, checkpoint('GENERATE_QUESTIONS'), [(0, 'bot', 'Hello', 0)])
+    cutoff = time.time()
+    time.sleep(0.01)
+    backend.save(NEW, checkpoint('GENERATE_QUESTIONS'), [(0, 'bot', 'Hello', 0)])
+
+    assert backend.expire(cutoff) == 1
+    assert not backend.exists(OLD)
+    assert backend.messages(OLD) == []
+    assert backend.exists(NEW)
+    assert backend.expire(cutoff) == 0
+
+
+def test_backend_expire_keeps_sessions_saved_again(backend):
+    backend.save(OLD, checkpoint('GENERATE_QUESTIONS'))
+    backend.save(NEW, checkpoint('GENERATE_QUESTIONS'))
+    time.sleep(0.01)
+    backend.save(OLD, checkpoint('END'))
+
+    assert backend.expire(time.time() - 0.005) == 1
+    assert backend.load(OLD)['state'] == 'END'
+    assert not backend.exists(NEW)
+
+
+def test_journal_expire_deletes_stale_journals(tmp_path):
+    journal = AnswerJournal(str(tmp_path))
+    journal.append(OLD, 'answer', answer='x')
+    journal.append(NEW, 'answer', answer='y')
+    journal.flush()
+    old_path = tmp_path / f'{OLD}.jsonl'
+    os.utime(old_path, (time.time() - 100, time.time() - 100))
+    (tmp_path / 'notes.txt').write_text('left alone')
+
+    assert journal.expire(time.time() - 50) == 1
+    assert not old_path.exists()
+    assert journal.exists(NEW)
+    assert (tmp_path / 'notes.txt').exists()
+
+
+def test_registry_expire_stored_passes_ttl_cutoff():
+    cutoffs = []
+    registry = SessionRegistry(on_expire=lambda cutoff: cutoffs.append(cutoff) or 3,
+                               ttl_seconds=100, sweep_seconds=3600)
+
+    assert registry.expire_stored(now=1000) == 3
+    assert cutoffs == [900]
+
+
+def test_registry_expire_stored_survives_failures():
+    def fail(cutoff):
+        raise OSError("disk gone")
+
+    registry = SessionRegistry(on_expire=fail, sweep_seconds=3600)
+
+    assert registry.expire_stored() == 0
@@ -0,0 +1,69 @@
+import threading
+
+from engine import Session
+from session_registry import SessionRegistry
+
+
+def idle_registry(*sessions, on_evict=None):
+    registry = SessionRegistry(on_evict=on_evict, idle_seconds=60, sweep_seconds=3600)
+    for session in sessions:
+        session.last_active = 1000
+        registry.add(session)
+    return registry
+
+
+def test_idle_sessions_are_flushed_and_released():
+    flushed = []
+    session = Session()
+    session.candidate_info['full_name'] = 'Ann Lee'
+    registry = idle_registry(session, on_evict=lambda s: flushed.append(s.candidate_info['full_name']))
+
+    assert registry.evict_idle(now=1059) == 0
+    assert registry.evict_idle(now=1061) == 1
+
+    assert flushed == ['Ann Lee']
+    assert session.evicted and session.candidate_info == {}
+    assert registry.get(session.session_id) is None
+    assert not session.touch()
+
+
+def test_session_being_stepped_is_not_evicted():
+    session = Session()
+    registry = idle_registry(session)
+    stepping = threading.Event()
+    done = threading.Event()
+
+    def step():
+        with session.lock:
+            stepping.set()
+            done.wait(5)
+
+    thread = threading.Thread(target=step)
+    thread.start()
+    stepping.wait(5)
+    try:
+        assert registry.evict_idle(now=2000) == 0
+    finally:
+        done.set()
+        thread.join()
+
+    assert not session.evicted
+    assert registry.get(session.session_id) is session
+
+
+def test_session_touched_after_the_scan_is_kept():
+    session = Session()
+    registry = idle_registry(session, on_evict=lambda s: None)
+    real_acquire = session.lock.acquire
+
+    class Lock:
+        """The candidate comes back between the idle scan and the eviction"""
+        def acquire(self, blocking=True):
+            session.last_active = 2000
+            return real_acquire(blocking)
+        release = session.lock.release
+
+    session.lock = Lock()
+    assert registry.evict_idle(now=1061) == 0
+    assert not session.evicted
+    assert registry.get(session.session_id) is session
@@ -0,0 +1,89 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+def concurrent_joins(flight, key, start, callers=16):
+    """Have callers join key at once; returns what each got back"""
+    barrier = threading.Barrier(callers)
+
+    def call():
+        barrier.wait()
+        return flight.join(key, start)
+
+    with ThreadPoolExecutor(callers) as pool:
+        return list(pool.map(lambda _: call(), range(callers)))
+
+
+def counting_start(starts):
+    def start():
+        future = Future()
+        starts.append(future)
+        return future
+    return start
+
+
+def test_concurrent_callers_share_one_result():
+    flight = SingleFlight()
+    starts = []
+
+    results = concurrent_joins(flight, 'python', counting_start(starts))
+
+    assert len(starts) == 1
+    assert all(result is starts[0] for result in results)
+    assert flight.inflight_count() == 1
+    starts[0].set_result(['q1', 'q2'])
+    assert [result.result() for result in results] == [['q1', 'q2']] * len(results)
+    assert flight.inflight_count() == 0
+
+
+def test_concurrent_callers_share_one_exception():
+    flight = SingleFlight()
+    starts = []
+
+    results = concurrent_joins(flight, 'python', counting_start(starts))
+    error = RuntimeError("rate limited")
+    starts[0].set_exception(error)
+
+    assert len(starts) == 1
+    for result in results:
+        with pytest.raises(RuntimeError) as raised:
+            result.result()
+        assert raised.value is error
+    assert flight.inflight_count() == 0
+
+
+def test_finished_work_is_started_again():
+    flight = SingleFlight()
+    starts = []
+    start = counting_start(starts)
+
+    first = flight.join('python', start)
+    first.set_result('old')
+    second = flight.join('python', start)
+
+    assert second is not first
+    assert len(starts) == 2
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+    starts = []
+    start = counting_start(starts)
+
+    assert flight.join('python', start) is not flight.join('go', start)
+    assert flight.inflight_count() == 2
+
+
+def test_a_failing_start_does_not_hold_the_key():
+    flight = SingleFlight()
+
+    def start():
+        raise ValueError("no client")
+
+    with pytest.raises(ValueError):
+        flight.join('python', start)
+    assert flight.inflight_count() == 0
@@ -0,0 +1,54 @@
+import pytest
+from tech_canon import canonicalize_tech, parse_tech_stack
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('Erlang', 'Erlang'),
+    ('NestJS', 'NestJS'),
+    ('Nuxt', 'Nuxt.js'),
+    ('Jest', 'Jest'),
+    ('Sails', 'Sails.js'),
+    ('Dash', 'Dash'),
+])
+def test_names_one_edit_from_another_technology_keep_their_meaning(name, expected):
+    assert canonicalize_tech(name) == expected
+
+@pytest.mark.parametrize('name', ['Bash', 'Unix', 'GitHub', 'GitLab', 'TF', 'ELK'])
+def test_lossy_aliases_are_not_collapsed(name):
+    assert canonicalize_tech(name) == name
+
+@pytest.mark.parametrize('name', ['Lest', 'Rast', 'Bails', 'Nexd', 'Rusk'])
+def test_no_typo_match_into_short_aliases(name):
+    assert canonicalize_tech(name) == name
+
+@pytest.mark.parametrize('name, expected', [
+    ('Pyhton', 'Python'),
+    ('Kubernets', 'Kubernetes'),
+    ('Djnago', 'Django'),
+    ('Postgress', 'PostgreSQL'),
+    ('Javascrpit', 'JavaScript'),
+    ('Typescirpt', 'TypeScript'),
+    ('Dockr', 'Docker'),
+])
+def test_typos_of_long_names_are_still_corrected(name, expected):
+    assert canonicalize_tech(name) == expected
+
+@pytest.mark.parametrize('name, expected', [
+    ('reactjs', 'React'),
+    ('golang', 'Go'),
+    ('k8s', 'Kubernetes'),
+    ('Python3', 'Python'),
+    ('Vue 3', 'Vue.js'),
+])
+def test_aliases_and_versions(name, expected):
+    assert canonicalize_tech(name) == expected
+
+def test_parse_tech_stack_keeps_distinct_technologies_apart():
+    stack, skipped = parse_tech_stack("NestJS, Next.js, Jest, REST, Erlang, R")
+    assert stack == ['NestJS', 'Next.js', 'Jest', 'REST APIs', 'Erlang', 'R']
+    assert skipped == []
+
+def test_parse_tech_stack_dedupes_and_caps():
+    stack, skipped = parse_tech_stack("python, Python3, py; Go\nRust", max_items=2)
+    assert stack == ['Python', 'Go']
+    assert skipped == ['Rust']